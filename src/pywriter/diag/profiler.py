@@ -0,0 +1,351 @@
+"""Provide a class for timing and memory profiling the processing phases of a PyWriter application.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import re
+import sys
+import tracemalloc
+from bisect import bisect_right
+from time import perf_counter
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None
+
+
+class _Phase:
+    """Context manager adding the elapsed time to a profiler's phase timer."""
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        if self._profiler.memoryTracing:
+            self._profiler.start_memory_phase()
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._profiler.add_time(self._name, perf_counter() - self._start)
+        if self._profiler.memoryTracing:
+            self._profiler.stop_memory_phase(self._name)
+        return False
+
+
+class _NoPhase:
+    """Context manager doing nothing, used while profiling is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class Profiler:
+    """Named phase timers and counters.
+
+    Public methods:
+        enable() -- start collecting timings and counts.
+        disable() -- stop collecting timings and counts.
+        enable_memory() -- start collecting timings, counts, and memory usage.
+        disable_memory() -- stop tracing memory allocations.
+        reset() -- discard all timings and counts.
+        phase(name) -- return a context manager timing a processing phase.
+        add_time(name, seconds) -- add a duration to a phase timer.
+        count(name, number) -- add number to a counter.
+        start_memory_phase() -- take a memory snapshot at the beginning of a phase.
+        stop_memory_phase(name) -- record the memory usage of a phase.
+        get_summary() -- return a one-line summary of timings and counts.
+        get_memory_report(top) -- return a report of memory usage and allocation sites per phase.
+        start_session() -- start profiling function calls with cProfile.
+        stop_session(filePath) -- stop profiling function calls and write a pstats dump.
+
+    Public instance variables:
+        enabled -- bool: True, if timings and counts are collected.
+        timings -- dict: total duration in seconds by phase name, in the order of the first call.
+        counters -- dict: number by counter name, in the order of the first call.
+        memoryTracing -- bool: True, if memory allocations are traced.
+        memory -- dict: memory usage by phase name (see stop_memory_phase).
+
+    While disabled, phase() returns a context manager doing nothing,
+    so instrumented code runs at nearly full speed.
+    In memory mode, tracemalloc snapshots are taken before and after each phase. 
+    This slows down processing considerably, so the timings are not representative.
+    Memory phases should not be nested, because the peak is reset at the beginning of each phase.
+    """
+    ENVIRONMENT_VARIABLE = 'PYWRITER_PROFILE'
+    # If set to a non-empty value, profiling is enabled at startup.
+    # If set to "memory", memory allocations are traced as well.
+
+    MEMORY_MODE = 'memory'
+
+    def __init__(self, enabled=False):
+        """Initialize instance variables.
+
+        Optional arguments:
+            enabled: bool -- if True, timings and counts are collected from the start.
+        """
+        self.enabled = enabled
+        self.timings = {}
+        self.counters = {}
+        self.memoryTracing = False
+        self.memory = {}
+        self._noPhase = _NoPhase()
+        self._cProfile = None
+        self._snapshot = None
+        self._topLevelNames = None
+        # Tuple (list of first line numbers, list of names) of the top-level classes and functions of this file.
+
+    def enable(self):
+        """Start collecting timings and counts."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop collecting timings and counts."""
+        self.enabled = False
+
+    def enable_memory(self):
+        """Start collecting timings, counts, and memory usage."""
+        self.enabled = True
+        self.memoryTracing = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable_memory(self):
+        """Stop tracing memory allocations. Timings and counts are still collected."""
+        self.memoryTracing = False
+        self._snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset(self):
+        """Discard all timings, counts, and memory records."""
+        self.timings = {}
+        self.counters = {}
+        self.memory = {}
+
+    def phase(self, name):
+        """Return a context manager timing a processing phase.
+
+        Positional arguments:
+            name: str -- phase name. Repeated phases add up.
+        """
+        if not self.enabled:
+            return self._noPhase
+
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds):
+        """Add a duration to a phase timer.
+
+        Positional arguments:
+            name: str -- phase name.
+            seconds: float -- duration to add.
+        """
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name, number=1):
+        """Add number to a counter, if profiling is enabled.
+
+        Positional arguments:
+            name: str -- counter name.
+
+        Optional arguments:
+            number: int -- number to add.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + number
+
+    def start_memory_phase(self):
+        """Take a memory snapshot at the beginning of a phase."""
+        if hasattr(tracemalloc, 'reset_peak'):
+            # Python 3.9+; otherwise the peak is the maximum since tracing began.
+            tracemalloc.reset_peak()
+        self._snapshot = self._take_snapshot()
+
+    def stop_memory_phase(self, name):
+        """Record the memory usage of a phase.
+
+        Positional arguments:
+            name: str -- phase name.
+
+        The record is a dict with the following entries:
+            current -- int: traced memory in bytes after the phase.
+            peak -- int: peak of traced memory in bytes during the phase.
+            rss -- int: peak resident set size of the process in bytes (None if unknown).
+            sites -- list of (site name, size difference in bytes) tuples, largest first.
+                     These are the allocations made by the phase and still alive at its end.
+                     A site is a module, or a top-level class or function of an inlined application.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._take_snapshot()
+        sites = {}
+        if self._snapshot is not None:
+            for stat in snapshot.compare_to(self._snapshot, 'lineno'):
+                if stat.size_diff:
+                    site = self._get_site_name(stat.traceback[0].filename, stat.traceback[0].lineno)
+                    if site is not None:
+                        sites[site] = sites.get(site, 0) + stat.size_diff
+        self._snapshot = None
+        record = self.memory.get(name, None)
+        if record is not None:
+            # Repeated phase: keep the maximum peak and sum up the allocations.
+            peak = max(peak, record['peak'])
+            for module, size in record['sites']:
+                sites[module] = sites.get(module, 0) + size
+        self.memory[name] = {
+            'current': current,
+            'peak': peak,
+            'rss': self._get_peak_rss(),
+            'sites': sorted(sites.items(), key=lambda site: site[1], reverse=True),
+            }
+
+    def get_summary(self):
+        """Return a one-line summary of timings and counts.
+        
+        In memory mode, the peak of traced memory is added to each phase's timing.
+        """
+        items = []
+        for name, seconds in self.timings.items():
+            item = f'{name} {seconds * 1000:.0f} ms'
+            if name in self.memory:
+                item = f'{item} (peak {self.memory[name]["peak"] / 1e6:.0f} MB)'
+            items.append(item)
+        items.extend(f'{name}: {number}' for name, number in self.counters.items())
+        if self.memory:
+            rss = list(self.memory.values())[-1]['rss']
+            if rss is not None:
+                items.append(f'peak RSS {rss / 1e6:.0f} MB')
+        return ', '.join(items)
+
+    def get_memory_report(self, top=5):
+        """Return a report of memory usage and allocation sites per phase.
+
+        Optional arguments:
+            top: int -- number of allocation sites to be listed per phase.
+        """
+        lines = []
+        for name, record in self.memory.items():
+            line = f'{name}: current {record["current"] / 1e6:.1f} MB, peak {record["peak"] / 1e6:.1f} MB'
+            if record['rss'] is not None:
+                line = f'{line}, peak RSS {record["rss"] / 1e6:.1f} MB'
+            lines.append(line)
+            for module, size in record['sites'][:top]:
+                if size <= 0:
+                    break
+
+                lines.append(f'    {size / 1e6:+10.2f} MB  {module}')
+        return '\n'.join(lines)
+
+    def _get_site_name(self, filePath, lineNumber):
+        """Return the name of an allocation site, or None for the profiler's own allocations.
+
+        Positional arguments:
+            filePath: str -- source file of the allocating frame.
+            lineNumber: int -- line number of the allocating frame.
+
+        If the application is a single script with all modules inlined, the profiler
+        is not part of a package, and the top-level class or function is added to the name.
+        """
+        if filePath != __file__:
+            return self._get_module_name(filePath)
+
+        if __package__:
+            return None
+
+        firstLines, names = self._get_top_level_names()
+        i = bisect_right(firstLines, lineNumber) - 1
+        if i < 0:
+            return self._get_module_name(filePath)
+
+        if names[i] in (_Phase.__name__, _NoPhase.__name__, Profiler.__name__):
+            return None
+
+        return f'{self._get_module_name(filePath)}.{names[i]}'
+
+    def _get_top_level_names(self):
+        """Return a tuple (list of first line numbers, list of names) of the top-level classes and functions."""
+        if self._topLevelNames is None:
+            firstLines = []
+            names = []
+            try:
+                with open(__file__, 'r', encoding='utf-8') as f:
+                    for lineNumber, line in enumerate(f, 1):
+                        match = re.match(r'(?:class|def) (\w+)', line)
+                        if match:
+                            firstLines.append(lineNumber)
+                            names.append(match.group(1))
+            except OSError:
+                pass
+            self._topLevelNames = (firstLines, names)
+        return self._topLevelNames
+
+    def _get_module_name(self, filePath):
+        """Return the dotted module name of a source file, if it is on the module search path."""
+        filePath = os.path.normpath(filePath)
+        modulePath = None
+        for directory in sys.path:
+            directory = os.path.normpath(os.path.abspath(directory or '.'))
+            if filePath.startswith(f'{directory}{os.sep}'):
+                candidate = filePath[len(directory) + 1:]
+                if modulePath is None or len(candidate) < len(modulePath):
+                    modulePath = candidate
+        if modulePath is None:
+            return filePath
+
+        return os.path.splitext(modulePath)[0].replace(os.sep, '.')
+
+    def _take_snapshot(self):
+        """Return a tracemalloc snapshot without the allocations of tracemalloc itself.
+
+        The profiler's own allocations are skipped by _get_site_name(),
+        because in an inlined application, __file__ is the whole application.
+        """
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            ))
+
+    def _get_peak_rss(self):
+        """Return the peak resident set size of the process in bytes, or None if not available."""
+        if resource is None:
+            return None
+
+        maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            return maxRss
+
+        # Linux reports kilobytes.
+        return maxRss * 1024
+
+    def start_session(self):
+        """Start profiling function calls with cProfile."""
+        from cProfile import Profile
+        # Imported here, because it is rarely needed.
+        self._cProfile = Profile()
+        self._cProfile.enable()
+
+    def stop_session(self, filePath):
+        """Stop profiling function calls and write a pstats dump.
+
+        Positional arguments:
+            filePath: str -- path of the dump file. It can be read with the pstats module.
+        """
+        if self._cProfile is None:
+            return
+
+        self._cProfile.disable()
+        self._cProfile.dump_stats(filePath)
+        self._cProfile = None
+
+
+PROFILER = Profiler(enabled=bool(os.environ.get(Profiler.ENVIRONMENT_VARIABLE, '')))
+# Profiler instance shared by all instrumented modules.
+if os.environ.get(Profiler.ENVIRONMENT_VARIABLE, '') == Profiler.MEMORY_MODE:
+    PROFILER.enable_memory()
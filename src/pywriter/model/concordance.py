@@ -0,0 +1,231 @@
+"""Provide a class for word frequencies and key words in context of a novel.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from heapq import nlargest
+from math import log
+from pywriter.model.scene import ADDITIONAL_WORD_LIMITS
+
+NO_WORDS = re.compile(r'\[.+?\]|\/\*.+?\*\/|^\>', re.MULTILINE)
+# Markup and comments, to be replaced by empty strings like with word counting.
+# Unlike with word counting, hyphens are kept, so the words can be shown as written.
+
+WORD_MARGINS = re.compile(r'^\W+|\W+$')
+# Punctuation to be stripped off a word, for getting the term.
+
+
+def get_words(text):
+    """Return a list of the words of a scene content, split like by the word counter.
+
+    Positional arguments:
+        text: str -- scene content with yWriter markup.
+
+    The number of words is the word count of the scene content.
+    """
+    words = NO_WORDS.sub('', ADDITIONAL_WORD_LIMITS.sub(' ', text)).split()
+    # Words consisting of hyphens only are no words for the word counter.
+    return [word for word in words if word.strip('-')]
+
+
+def get_term(word):
+    """Return the term of a word, i.e. the word in lower case, without leading or trailing punctuation."""
+    return WORD_MARGINS.sub('', word).casefold()
+
+
+class Concordance:
+    """Word frequency and key word in context index of a novel's scene contents.
+
+    Public methods:
+        get_frequencies(count) -- return the most frequent terms of the novel.
+        get_count(word) -- return the number of occurrences of a term.
+        get_overused_terms(chId, count) -- return the terms a chapter uses most often, compared with the novel.
+        get_kwic(word, width, limit) -- return the occurrences of a term with their context.
+        get_text(start, stop) -- return the words between two positions as written.
+        get_location(position) -- return the scene ID and the word position in the scene.
+
+    Public instance variables:
+        terms: list -- the vocabulary, i.e. the terms by term ID. Term 0 is the empty term of punctuation-only words.
+        termIds: dict -- term ID (key: term).
+        tokens: array -- term ID of each word of the novel, in reading order.
+        counts: list -- number of occurrences per term ID.
+        sceneIds: list -- IDs of the indexed scenes, in reading order.
+        sceneOffsets: array -- position in tokens of each scene's first word, with the number of words appended.
+        chapterRanges: dict -- (start, stop) of the chapter's scenes in sceneIds (key: chapter ID).
+
+    Like with the reading progress, "Normal" scenes in "Normal" chapters are indexed.
+    A term is a word in lower case, without leading or trailing punctuation.
+    The index is built with a single pass over the words. The positions of each term
+    are stored as well, so the queries take time proportional to the size of the result.
+    """
+
+    def __init__(self, novel):
+        """Build the index of the novel's words.
+
+        Positional arguments:
+            novel -- Novel instance.
+        """
+        self.terms = ['']
+        self.termIds = {'': 0}
+        self.tokens = array('I')
+        self.counts = [0]
+        self.sceneIds = []
+        self.sceneOffsets = array('I')
+        self.chapterRanges = {}
+        self._words = []
+        # The words as written, by word ID.
+        self._wordTokens = array('I')
+        # Word ID of each word of the novel, in reading order.
+        self._positions = [array('I')]
+        # Positions in tokens of each term, by term ID.
+        wordIds = {}
+        # key: word as written, value: tuple (term ID, word ID).
+        readingOrder = novel.get_reading_order()
+        for chId, (start, stop) in readingOrder.chapterRanges.items():
+            chapter = novel.chapters[chId]
+            if chapter.chType != 0:
+                continue
+
+            firstScene = len(self.sceneIds)
+            for scId in readingOrder.sceneIds[start:stop]:
+                scene = novel.scenes[scId]
+                if scene.scType != 0 or not scene.sceneContent:
+                    continue
+
+                self.sceneIds.append(scId)
+                self.sceneOffsets.append(len(self.tokens))
+                for word in get_words(scene.sceneContent):
+                    ids = wordIds.get(word, None)
+                    if ids is None:
+                        term = get_term(word)
+                        termId = self.termIds.get(term, None)
+                        if termId is None:
+                            termId = len(self.terms)
+                            self.termIds[term] = termId
+                            self.terms.append(term)
+                            self.counts.append(0)
+                            self._positions.append(array('I'))
+                        ids = (termId, len(self._words))
+                        wordIds[word] = ids
+                        self._words.append(word)
+                    termId, wordId = ids
+                    self._positions[termId].append(len(self.tokens))
+                    self.counts[termId] += 1
+                    self.tokens.append(termId)
+                    self._wordTokens.append(wordId)
+            self.chapterRanges[chId] = (firstScene, len(self.sceneIds))
+        self.sceneOffsets.append(len(self.tokens))
+
+    def get_frequencies(self, count):
+        """Return the most frequent terms of the novel.
+
+        Positional arguments:
+            count: int -- maximum number of terms to return.
+
+        Return a list of (term, number of occurrences) tuples, the most frequent first.
+        """
+        termIds = nlargest(count + 1, range(len(self.terms)), key=self.counts.__getitem__)
+        return [(self.terms[termId], self.counts[termId]) for termId in termIds if termId != 0][:count]
+
+    def get_overused_terms(self, chId, count):
+        """Return the terms a chapter uses most often, compared with the whole novel.
+
+        Positional arguments:
+            chId: str -- chapter ID.
+            count: int -- maximum number of terms to return.
+
+        Return a list of (term, number of occurrences in the chapter) tuples, the most overused first.
+        The terms are ranked by the log-likelihood of occurring more often in the chapter
+        than in the rest of the novel, so rare terms need more occurrences to rank high.
+        """
+        if not chId in self.chapterRanges:
+            return []
+
+        firstScene, stopScene = self.chapterRanges[chId]
+        start = self.sceneOffsets[firstScene]
+        stop = self.sceneOffsets[stopScene]
+        chapterWords = stop - start
+        otherWords = len(self.tokens) - chapterWords
+        if not chapterWords or not otherWords:
+            return []
+
+        scores = []
+        for termId, chapterCount in Counter(self.tokens[start:stop]).items():
+            if termId == 0:
+                continue
+
+            otherCount = self.counts[termId] - chapterCount
+            expected = chapterWords * self.counts[termId] / len(self.tokens)
+            if chapterCount <= expected:
+                continue
+
+            # Log-likelihood (G2) of the observed chapter count against the rest of the novel.
+            score = chapterCount * log(chapterCount / expected)
+            if otherCount:
+                score += otherCount * log(otherCount / (otherWords * self.counts[termId] / len(self.tokens)))
+            scores.append((2 * score, termId, chapterCount))
+        return [(self.terms[termId], chapterCount) for __, termId, chapterCount in nlargest(count, scores)]
+
+    def get_count(self, word):
+        """Return the number of occurrences of a term.
+
+        Positional arguments:
+            word: str -- word to look up, regardless of case and punctuation.
+        """
+        termId = self.termIds.get(get_term(word), None)
+        if not termId:
+            return 0
+
+        return self.counts[termId]
+
+    def get_kwic(self, word, width, limit=None):
+        """Return the occurrences of a term with their context.
+
+        Positional arguments:
+            word: str -- word to look up, regardless of case and punctuation.
+            width: int -- maximum number of words of context before and after the occurrence.
+
+        Optional arguments:
+            limit: int -- maximum number of occurrences to return. If None, return all.
+
+        Return a list of (scene ID, word position in the scene, words before, word, words after) tuples,
+        in reading order. The context does not exceed the scene.
+        """
+        termId = self.termIds.get(get_term(word), None)
+        if not termId:
+            return []
+
+        words = self._words
+        wordTokens = self._wordTokens
+        sceneOffsets = self.sceneOffsets
+        lines = []
+        for position in self._positions[termId][:limit]:
+            i = bisect_right(sceneOffsets, position) - 1
+            sceneStart = sceneOffsets[i]
+            before = ' '.join(words[wordId] for wordId in wordTokens[max(position - width, sceneStart):position])
+            after = ' '.join(words[wordId] for wordId in wordTokens[position + 1:min(position + 1 + width, sceneOffsets[i + 1])])
+            lines.append((self.sceneIds[i], position - sceneStart, before, words[wordTokens[position]], after))
+        return lines
+
+    def get_text(self, start, stop):
+        """Return the words between two positions as written.
+
+        Positional arguments:
+            start: int -- position in tokens of the first word.
+            stop: int -- position in tokens after the last word.
+        """
+        return ' '.join(self._words[wordId] for wordId in self._wordTokens[start:stop])
+
+    def get_location(self, position):
+        """Return a tuple (scene ID, word position in the scene) for a position in tokens.
+
+        Positional arguments:
+            position: int -- position in tokens.
+        """
+        i = bisect_right(self.sceneOffsets, position) - 1
+        return self.sceneIds[i], position - self.sceneOffsets[i]
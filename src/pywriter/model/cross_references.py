@@ -0,0 +1,160 @@
+"""Provide a class for a novel's reverse cross reference index.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+
+NO_IDS = []
+# Compared with the registered references of scenes without characters, locations, or items.
+
+
+class CrossReferences:
+    """Reverse index of the scenes referring to characters, locations, and items.
+
+    Public methods:
+        add_scene(scId, scene) -- register the references of a scene.
+        remove_scene(scId) -- unregister the references of a scene.
+        update_scene(scId, scene) -- register the changed references of a scene.
+        refresh(novel) -- register the changes of the novel's scenes since the last call.
+        get_character_scenes(crId, readingOrder) -- return the IDs of the scenes referring to a character.
+        get_location_scenes(lcId, readingOrder) -- return the IDs of the scenes referring to a location.
+        get_item_scenes(itId, readingOrder) -- return the IDs of the scenes referring to an item.
+
+    Public instance variables:
+        characters: dict -- IDs of the scenes referring to a character, as dict keys (key: character ID).
+        locations: dict -- IDs of the scenes referring to a location, as dict keys (key: location ID).
+        items: dict -- IDs of the scenes referring to an item, as dict keys (key: item ID).
+
+    The scene IDs are stored in insertion order. The get methods return them
+    in reading order; the sorted lists are cached until the references
+    or the reading order change, so repeated lookups take constant time.
+    """
+
+    def __init__(self, novel=None):
+        """Build the index with a single pass over the novel's scenes.
+
+        Optional arguments:
+            novel -- Novel instance. If None, start with an empty index to be filled with add_scene().
+        """
+        self.characters = {}
+        self.locations = {}
+        self.items = {}
+        self._sceneReferences = {}
+        # key: scene ID, value: (characters, locations, items) tuple of ID list copies.
+        self._sorted = {}
+        # key: (index dict ID, element ID), value: list of scene IDs in reading order.
+        self._readingOrder = None
+        # ReadingOrder instance the sorted lists refer to.
+        if novel is not None:
+            for scId in novel.scenes:
+                self.add_scene(scId, novel.scenes[scId])
+
+    def add_scene(self, scId, scene):
+        """Register the references of a scene.
+
+        Positional arguments:
+            scId: str -- scene ID.
+            scene -- Scene instance.
+        """
+        references = (list(scene.characters or ()), list(scene.locations or ()), list(scene.items or ()))
+        self._sceneReferences[scId] = references
+        for index, elemIds in zip((self.characters, self.locations, self.items), references):
+            for elemId in elemIds:
+                index.setdefault(elemId, {})[scId] = None
+                self._sorted.pop((id(index), elemId), None)
+
+    def remove_scene(self, scId):
+        """Unregister the references of a scene.
+
+        Positional arguments:
+            scId: str -- scene ID.
+        """
+        references = self._sceneReferences.pop(scId, None)
+        if references is None:
+            return
+
+        for index, elemIds in zip((self.characters, self.locations, self.items), references):
+            for elemId in elemIds:
+                sceneIds = index.get(elemId, None)
+                if sceneIds is not None:
+                    sceneIds.pop(scId, None)
+                    if not sceneIds:
+                        del index[elemId]
+                self._sorted.pop((id(index), elemId), None)
+
+    def update_scene(self, scId, scene):
+        """Register the changed references of a scene.
+
+        Positional arguments:
+            scId: str -- scene ID.
+            scene -- Scene instance.
+        """
+        self.remove_scene(scId)
+        self.add_scene(scId, scene)
+
+    def refresh(self, novel):
+        """Register the changes of the novel's scenes since the index was built or last refreshed.
+
+        Positional arguments:
+            novel -- Novel instance the index was built from.
+
+        Added and removed scenes, and scenes whose characters, locations, or items
+        have changed, also by changing the lists in place, are found with one pass
+        comparing the scenes' references with the registered copies.
+        Only the changed scenes are registered anew.
+        """
+        sceneReferences = self._sceneReferences
+        for scId, scene in novel.scenes.items():
+            references = sceneReferences.get(scId, None)
+            if references is None:
+                self.add_scene(scId, scene)
+            elif references != (scene.characters or NO_IDS, scene.locations or NO_IDS, scene.items or NO_IDS):
+                self.update_scene(scId, scene)
+        if len(sceneReferences) > len(novel.scenes):
+            # Scenes have been removed.
+            for scId in [scId for scId in sceneReferences if scId not in novel.scenes]:
+                self.remove_scene(scId)
+
+    def get_character_scenes(self, crId, readingOrder):
+        """Return a list with the IDs of the scenes referring to a character, in reading order.
+
+        Positional arguments:
+            crId: str -- character ID.
+            readingOrder -- ReadingOrder instance of the novel.
+        """
+        return self._get_scenes(self.characters, crId, readingOrder)
+
+    def get_location_scenes(self, lcId, readingOrder):
+        """Return a list with the IDs of the scenes referring to a location, in reading order.
+
+        Positional arguments:
+            lcId: str -- location ID.
+            readingOrder -- ReadingOrder instance of the novel.
+        """
+        return self._get_scenes(self.locations, lcId, readingOrder)
+
+    def get_item_scenes(self, itId, readingOrder):
+        """Return a list with the IDs of the scenes referring to an item, in reading order.
+
+        Positional arguments:
+            itId: str -- item ID.
+            readingOrder -- ReadingOrder instance of the novel.
+        """
+        return self._get_scenes(self.items, itId, readingOrder)
+
+    def _get_scenes(self, index, elemId, readingOrder):
+        """Return the IDs of the scenes referring to an element, sorted by reading order.
+
+        Scenes not assigned to a chapter are omitted.
+        """
+        if readingOrder is not self._readingOrder:
+            self._sorted = {}
+            self._readingOrder = readingOrder
+        key = (id(index), elemId)
+        sceneIds = self._sorted.get(key, None)
+        if sceneIds is None:
+            positions = readingOrder.positions
+            sceneIds = sorted((scId for scId in index.get(elemId, ()) if scId in positions), key=positions.__getitem__)
+            self._sorted[key] = sceneIds
+        return sceneIds
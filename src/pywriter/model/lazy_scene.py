@@ -0,0 +1,57 @@
+"""Provide a class for yWriter scene representation with deferred notes decoding.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.model.scene import Scene
+
+
+class LazyScene(Scene):
+    """yWriter scene representation with deferred notes decoding.
+
+    Public methods:
+        set_notes_source(loader) -- defer reading the scene notes.
+        has_pending_sources() -- return True if the notes are not read yet.
+
+    Public instance variables:
+        notes: str -- scene notes (property with getter and setter).
+
+    The notes are read on first access by calling a loader,
+    e.g. reading a section of the project file.
+    """
+
+    def __init__(self):
+        """Initialize instance variables.
+
+        Extends the superclass constructor.
+        """
+        self._loaders = {}
+        # key: 'notes', value: callable returning the text.
+        self._notes = None
+        super().__init__()
+
+    @property
+    def notes(self):
+        loader = self._loaders.pop('notes', None)
+        if loader is not None:
+            self._notes = loader()
+        return self._notes
+
+    @notes.setter
+    def notes(self, text: str):
+        self._loaders.pop('notes', None)
+        self._notes = text
+
+    def set_notes_source(self, loader):
+        """Defer reading the scene notes.
+
+        Positional arguments:
+            loader -- callable returning the scene notes as str.
+        """
+        self._loaders['notes'] = loader
+        self._notes = None
+
+    def has_pending_sources(self):
+        """Return True if the scene notes are not read yet."""
+        return bool(self._loaders)
@@ -0,0 +1,101 @@
+"""Provide functions for processing yWriter inline markup.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+
+YW_TAG = re.compile(r'\[(/?)(lang=[^\]]*|h\d|[ibcrsu])\]')
+# yWriter inline tags:
+# - italic, bold, centered, right-aligned, strikethrough, and underlined text,
+# - headings [h1] ... [h9],
+# - language tags [lang=xx-YY] ... [/lang=xx-YY].
+# Group 1 is the closing slash, group 2 is the markup name.
+
+YW_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+# yWriter comments, which may span several lines.
+
+YW_TOKEN = re.compile(f'{YW_TAG.pattern}|{YW_COMMENT.pattern}', re.DOTALL)
+# Inline tags and comments, for texts containing comments.
+
+
+def strip_markup(text):
+    """Return text with all yWriter inline tags and comments removed.
+
+    Positional arguments:
+        text: str -- text with yWriter markup.
+
+    Each pattern starts with a literal character, so the regular expression 
+    engine can skip ahead to the next candidate. This is why tags and comments 
+    are not combined in one alternation. The comment pattern is only applied,
+    if the text contains a comment at all.
+    """
+    if not text:
+        return ''
+
+    if '/*' in text:
+        text = YW_COMMENT.sub('', text)
+    return YW_TAG.sub('', text)
+
+
+def tokenize(text, tagNames=None):
+    """Generate the formatted runs of a text with yWriter inline markup.
+
+    Positional arguments:
+        text: str -- text with yWriter markup.
+
+    Optional arguments:
+        tagNames: dict -- output tag name by yWriter markup name ('i', 'b', 'c', 'h1', ...).
+                  Markup without an output tag name is discarded. 
+                  By default, the yWriter markup names are used.
+
+    Yield tuples (text, tags), where tags is a tuple of the output tag names 
+    applying to the text, in the order of their opening. Adjacent text 
+    with the same tags is yielded as one run. Comments and language tags are discarded.
+    The text is scanned once, and only the current run is buffered.
+    """
+    if not text:
+        return
+
+    if '/*' in text:
+        pattern = YW_TOKEN
+    else:
+        pattern = YW_TAG
+    active = []
+    tags = ()
+    pending = []
+    position = 0
+    for match in pattern.finditer(text):
+        start = match.start()
+        if start > position:
+            pending.append(text[position:start])
+        position = match.end()
+        name = match.group(2)
+        if name is None or name.startswith('lang='):
+            # Comment or language tag.
+            continue
+
+        if tagNames is not None:
+            name = tagNames.get(name, None)
+            if name is None:
+                continue
+
+        if match.group(1):
+            if not name in active:
+                continue
+
+            active.remove(name)
+        else:
+            if name in active:
+                continue
+
+            active.append(name)
+        if pending:
+            yield ''.join(pending), tags
+            pending = []
+        tags = tuple(active)
+    if position < len(text):
+        pending.append(text[position:])
+    if pending:
+        yield ''.join(pending), tags
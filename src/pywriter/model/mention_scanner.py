@@ -0,0 +1,148 @@
+"""Provide a class for finding the names of characters, locations, and items in the scene contents.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from collections import deque
+from pywriter.model.markup import YW_COMMENT
+
+ELEMENT_TYPES = ('characters', 'locations', 'items')
+# Names of the Novel and Scene instance variables referring to the elements.
+
+
+class MentionScanner:
+    """Aho-Corasick automaton finding the names of a novel's characters, locations, and items.
+
+    Public methods:
+        scan(text) -- return the number of mentions of each element in a text.
+        scan_novel(novel) -- return the mention matrix of the novel's scenes.
+
+    The names are the elements' titles, the characters' full names, and the alternate names.
+    All names are searched with a single pass over the text, regardless of their number.
+    Names are found as whole words, ignoring case. Overlapping names are resolved
+    by taking the leftmost longest one, so "Anna Smith" is not counted for "Smith".
+    Names in yWriter comments are not counted.
+
+    The mentions are counted with keys (element type, element ID),
+    where the element type is one of ELEMENT_TYPES, e.g. ('characters', '1').
+    """
+
+    def __init__(self, novel):
+        """Build the automaton from the names of the novel's elements.
+
+        Positional arguments:
+            novel -- Novel instance.
+        """
+        self._goto = [{}]
+        # Transitions of each state (key: character, value: next state).
+        self._fail = [0]
+        # Failure transition of each state.
+        self._output = [()]
+        # Tuple of (name length, element keys) tuples of the names ending in each state.
+        names = {}
+        # key: name in lower case, value: list of element keys.
+        for elemType, srtIds in zip(ELEMENT_TYPES, (novel.srtCharacters, novel.srtLocations, novel.srtItems)):
+            elements = getattr(novel, elemType)
+            for elemId in srtIds:
+                element = elements[elemId]
+                for name in (element.title, getattr(element, 'fullName', None), element.aka):
+                    if name:
+                        name = name.strip().lower()
+                        if name:
+                            keys = names.setdefault(name, [])
+                            if not (elemType, elemId) in keys:
+                                keys.append((elemType, elemId))
+        for name, keys in names.items():
+            self._add_name(name, tuple(keys))
+        self._set_failure_transitions()
+
+    def _add_name(self, name, keys):
+        """Add the states for a name."""
+        state = 0
+        for char in name:
+            nextState = self._goto[state].get(char, None)
+            if nextState is None:
+                nextState = len(self._goto)
+                self._goto[state][char] = nextState
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = nextState
+        self._output[state] = ((len(name), keys),)
+
+    def _set_failure_transitions(self):
+        """Link each state to the state of its longest proper suffix, breadth first."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nextState in self._goto[state].items():
+                queue.append(nextState)
+                fallback = self._fail[state]
+                while fallback and not char in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fallback = self._goto[fallback].get(char, 0)
+                self._fail[nextState] = fallback
+                self._output[nextState] += self._output[fallback]
+
+    def scan(self, text):
+        """Return the number of mentions of each element in a text.
+
+        Positional arguments:
+            text: str -- scene content.
+
+        Return a dict (key: (element type, element ID), value: number of mentions).
+        """
+        mentions = {}
+        if not text or len(self._goto) == 1:
+            return mentions
+
+        if '/*' in text:
+            # Replace the comments with a space, so the words around them are not joined.
+            text = YW_COMMENT.sub(' ', text)
+        text = text.lower()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        textLength = len(text)
+        matches = []
+        state = 0
+        end = 0
+        for char in text:
+            end += 1
+            while state and not char in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for nameLength, keys in output[state]:
+                    start = end - nameLength
+                    if ((start == 0 or not text[start - 1].isalnum())
+                            and (end == textLength or not text[end].isalnum())):
+                        matches.append((start, -nameLength, keys))
+        matches.sort()
+        position = 0
+        for start, negativeLength, keys in matches:
+            if start < position:
+                # Overlapping a longer name found before.
+                continue
+
+            position = start - negativeLength
+            for key in keys:
+                mentions[key] = mentions.get(key, 0) + 1
+        return mentions
+
+    def scan_novel(self, novel):
+        """Return the mention matrix of the novel's scenes.
+
+        Positional arguments:
+            novel -- Novel instance the automaton was built from.
+
+        Return a dict (key: scene ID, value: dict of the scene's mentions as returned by scan()).
+        Scenes without mentions are omitted.
+        """
+        matrix = {}
+        for scId, scene in novel.scenes.items():
+            mentions = self.scan(scene.sceneContent)
+            if mentions:
+                matrix[scId] = mentions
+        return matrix
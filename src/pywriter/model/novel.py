@@ -8,6 +8,8 @@ import locale
 import re
 from pywriter.pywriter_globals import *
 from pywriter.model.basic_element import BasicElement
+from pywriter.model.reading_order import ReadingOrder
+from pywriter.model.cross_references import CrossReferences
 
 LANGUAGE_TAG = re.compile(r'\[lang=(.*?)\]')
 
@@ -22,6 +24,10 @@ class Novel(BasicElement):
     Public methods:
         get_languages() -- Determine the languages used in the document.
         check_locale() -- Check the document's locale (language code and country code).
+        get_reading_order() -- Return the flattened reading order of chapters and scenes.
+        invalidate_reading_order() -- Discard the reading order after structural changes.
+        get_cross_references() -- Return the reverse index of the scenes referring to characters, locations, and items.
+        set_cross_references(crossReferences) -- Use a reverse index built while reading the scenes.
 
     Public instance variables:
         authorName -- author's name.
@@ -135,6 +141,12 @@ class Novel(BasicElement):
         self.countryCode = None
         # Country code acc. to ISO 3166-2.
 
+        self._readingOrder = None
+        # Cached ReadingOrder instance.
+
+        self._crossReferences = None
+        # Cached CrossReferences instance.
+
     def get_languages(self):
         """Determine the languages used in the document.
         
@@ -166,6 +178,45 @@ class Novel(BasicElement):
                     if not language in self.languages:
                         self.languages.append(language)
 
+    def get_reading_order(self):
+        """Return the flattened reading order of chapters and scenes.
+        
+        The ReadingOrder instance is cached until invalidate_reading_order() is called,
+        or the number of chapters or scenes changes.
+        """
+        if self._readingOrder is None or not self._readingOrder.is_valid(self):
+            self._readingOrder = ReadingOrder(self)
+        return self._readingOrder
+
+    def invalidate_reading_order(self):
+        """Discard the reading order after structural changes.
+        
+        Call this after changing the order of chapters or scenes, 
+        chapter or scene types, or scene contents.
+        """
+        self._readingOrder = None
+
+    def get_cross_references(self):
+        """Return the reverse index of the scenes referring to characters, locations, and items.
+        
+        The CrossReferences instance is cached. Scenes added or removed since,
+        and changes of the scenes' characters, locations, and items are registered
+        on each call, so the index always fits the scenes.
+        """
+        if self._crossReferences is None:
+            self._crossReferences = CrossReferences(self)
+        else:
+            self._crossReferences.refresh(self)
+        return self._crossReferences
+
+    def set_cross_references(self, crossReferences):
+        """Use a reverse index built while reading the scenes.
+        
+        Positional arguments:
+            crossReferences -- CrossReferences instance covering all scenes.
+        """
+        self._crossReferences = crossReferences
+
     def check_locale(self):
         """Check the document's locale (language code and country code).
         
@@ -0,0 +1,208 @@
+"""Provide a function for finding repeated phrases in a novel.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from bisect import bisect_right
+
+HASH_BASE = 1000003
+HASH_MODULUS = (1 << 31) - 1
+# Polynomial rolling hash of a sequence of term IDs.
+# Small hash values are faster to compute; colliding phrases are separated by verification.
+
+TABLE_BITS = 22
+# The first pass marks the hash values in a table of 2**TABLE_BITS bytes.
+
+
+def find_repeated_phrases(concordance, length, tableBits=TABLE_BITS):
+    """Return the phrases occurring more than once in the novel.
+
+    Positional arguments:
+        concordance -- Concordance instance of the novel.
+        length: int -- minimum number of words of a phrase.
+
+    Optional arguments:
+        tableBits: int -- size of the hash table of the first pass, as a power of two.
+
+    Return a list of (number of words, [position of each occurrence]) tuples,
+    where the positions refer to Concordance.tokens. The longest phrases come first.
+    Phrases are compared by their terms, i.e. regardless of case and punctuation,
+    and do not exceed the scenes. Repeated phrases are extended to their full length,
+    so a repeated sentence is reported once. A part of it occurring more often
+    is reported separately, with all of its occurrences.
+    Occurrences overlapping the previous one, e.g. in "go go go", are omitted.
+    So a phrase is also reported if a longer one containing it has fewer
+    occurrences only because they overlap.
+
+    The phrases are found with a rolling (Rabin-Karp) hash in two passes over the words.
+    The first pass marks the hash values in a table of fixed size.
+    The second pass collects only the phrases whose hash value was marked twice,
+    and the candidates are verified by comparing their terms.
+    So runtime is linear in the number of words, and memory is bounded
+    by the table size and the number of repetitions.
+    """
+    if length < 1:
+        return []
+
+    mask = (1 << tableBits) - 1
+    table = bytearray(mask + 1)
+    candidates = {}
+    # key: hash value of a phrase marked twice, value: list of phrase positions.
+    for secondPass in (False, True):
+        for stop, hashValue in _get_hashes(concordance, length):
+            bucket = hashValue & mask
+            if not secondPass:
+                if table[bucket] < 2:
+                    table[bucket] += 1
+            elif table[bucket] == 2:
+                candidates.setdefault(hashValue, []).append(stop - length)
+    del table
+
+    # Verify the candidates, separating phrases with colliding hash values.
+    tokens = concordance.tokens
+    groups = []
+    # Lists of the positions of equal phrases.
+    for positions in candidates.values():
+        if len(positions) < 2:
+            continue
+
+        phrases = {}
+        for position in positions:
+            phrases.setdefault(tokens[position:position + length].tobytes(), []).append(position)
+        for group in phrases.values():
+            if len(group) > 1:
+                groups.append(group)
+    del candidates
+    groupIds = {}
+    # key: phrase position, value: index of the phrase's group.
+    for groupId, group in enumerate(groups):
+        for position in group:
+            groupIds[position] = groupId
+
+    # Extend the phrases word by word, as long as the phrases starting a word later are equal.
+    # Where they differ, the occurrences are split, and each part is extended separately.
+    # A phrase is reported if no phrase a word longer has as many separate occurrences.
+    if length == 1:
+        sceneStarts = set(concordance.sceneOffsets)
+        # Longer phrases are within the scenes, because their groups are.
+    else:
+        sceneStarts = set()
+    repetitions = []
+    for group in groups:
+        if _continues_left(group, length, groupIds, concordance, sceneStarts):
+            # The phrase is part of a longer one starting a word before.
+            continue
+
+        stack = [(length, group)]
+        while stack:
+            words, positions = stack.pop()
+            longerParts = _get_parts(positions, -1, groupIds, sceneStarts, 0)
+            # Positions of the phrases starting a word before, split by their first word.
+            while True:
+                parts = _get_parts(positions, words - length + 1, groupIds, sceneStarts, words)
+                # Positions of the phrases ending a word later, split by their last word.
+                occurrences = _get_separate_occurrences(positions, words)
+                if len(occurrences) > 1 and all(len(part) < len(occurrences)
+                                                or len(_get_separate_occurrences(part, words + 1)) < len(occurrences)
+                                                for part in longerParts + parts):
+                    repetitions.append((words, occurrences))
+                if len(parts) != 1 or len(parts[0]) != len(positions):
+                    break
+
+                words += 1
+            for part in parts:
+                if part[-1] - part[0] > words and not _continues_left(part, words + 1, groupIds, concordance,
+                                                                       sceneStarts):
+                    stack.append((words + 1, part))
+    repetitions.sort(key=lambda repetition: (-repetition[0], repetition[1][0]))
+    return repetitions
+
+
+def _get_parts(positions, offset, groupIds, sceneStarts, boundary):
+    """Return lists of the positions whose phrases starting offset words later are equal.
+
+    Positions are omitted if a scene starts boundary words after them.
+    """
+    parts = {}
+    # key: group index of the phrases starting offset words later, value: list of positions.
+    for position in positions:
+        groupId = groupIds.get(position + offset, None)
+        if groupId is not None and not (sceneStarts and position + boundary in sceneStarts):
+            parts.setdefault(groupId, []).append(position)
+    return list(parts.values())
+
+
+def _continues_left(positions, words, groupIds, concordance, sceneStarts):
+    """Return True if the phrases at positions and all their extensions are parts of longer ones.
+
+    The phrases starting a word before must be equal and within the scenes.
+    If a phrase is repeated right after itself, the longer phrases may overlap where the
+    phrases do not, so their extensions are not covered by the longer ones.
+    """
+    groupId = groupIds.get(positions[0] - 1, None)
+    if groupId is None:
+        return False
+
+    for position in positions:
+        if groupIds.get(position - 1, None) != groupId or position in sceneStarts:
+            return False
+
+    return not _repeats_adjacently(positions, words, concordance)
+
+
+def _repeats_adjacently(positions, words, concordance):
+    """Return True if a phrase starting at one of the positions is repeated right after it.
+
+    The phrase has at least words words, and its repetition starts at one of the positions,
+    e.g. "go no" in "go no go no".
+    """
+    tokens = concordance.tokens
+    sceneOffsets = concordance.sceneOffsets
+    for i, start in enumerate(positions):
+        sceneEnd = sceneOffsets[bisect_right(sceneOffsets, start)]
+        for position in positions[i + 1:bisect_right(positions, (start + sceneEnd) // 2, i + 1)]:
+            if position - start >= words and tokens[start:position] == tokens[position:2 * position - start]:
+                return True
+
+    return False
+
+
+def _get_separate_occurrences(positions, words):
+    """Return the ascending positions of phrases with words words, omitting the ones overlapping the previous one."""
+    occurrences = []
+    end = 0
+    for position in positions:
+        if position >= end:
+            occurrences.append(position)
+            end = position + words
+    return occurrences
+
+
+def _get_hashes(concordance, length):
+    """Generate (stop, hash value) of each phrase with length words within the scenes.
+
+    stop is the position in Concordance.tokens after the phrase's last word.
+
+    Phrases containing punctuation-only words are skipped.
+    """
+    tokens = concordance.tokens
+    sceneOffsets = concordance.sceneOffsets
+    highestPower = pow(HASH_BASE, length - 1, HASH_MODULUS)
+    for i in range(len(sceneOffsets) - 1):
+        start = sceneOffsets[i]
+        hashValue = 0
+        phraseStart = start
+        # Position after the last punctuation-only word.
+        for stop in range(start + 1, sceneOffsets[i + 1] + 1):
+            termId = tokens[stop - 1]
+            if termId == 0:
+                hashValue = 0
+                phraseStart = stop
+                continue
+
+            if stop - phraseStart > length:
+                hashValue = (hashValue - tokens[stop - 1 - length] * highestPower) % HASH_MODULUS
+            hashValue = (hashValue * HASH_BASE + termId) % HASH_MODULUS
+            if stop - phraseStart >= length:
+                yield stop, hashValue
@@ -0,0 +1,348 @@
+"""Provide a class for per-scene prose statistics of a novel.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import csv
+from pywriter.pywriter_globals import *
+from pywriter.model.scene import ADDITIONAL_WORD_LIMITS
+from pywriter.model.scene import NO_WORD_LIMITS
+
+#--- Character classes.
+SPACE = 1
+# Word limits, like with str.split().
+VOWEL = 2
+# Letters counted as syllables, if not following another vowel.
+TERMINAL = 4
+# Sentence end punctuation.
+QUOTE = 8
+# Double quotation marks, delimiting dialogue.
+CLOSER = 16
+# Characters that may follow sentence end punctuation, besides spaces and quotation marks.
+
+VOWELS = 'aeiouyäöüàáâãåæèéêëìíîïòóôõøùúûýÿœ'
+TERMINALS = '.!?…'
+QUOTES = '"“”„«»'
+CLOSERS = ")]'’"
+
+STATISTICS_FIELDS = ('words', 'sentences', 'syllables', 'meanSentenceLength', 'dialogueRatio', 'readingEase')
+# Keys of the statistics dictionaries.
+
+_classes = None
+# Character class by code point, for the Basic Multilingual Plane; built on first use.
+
+_numpy = None
+# NumPy module, or False if it is not installed; imported on first use.
+
+
+def get_numpy():
+    """Return the NumPy module, or None if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            # Imported here, because this takes longer than importing the rest of the viewer.
+            _numpy = numpy
+        except ImportError:
+            # The statistics are computed without vectorization.
+            _numpy = False
+    return _numpy or None
+
+
+def get_character_classes():
+    """Return a bytes object with the character class flags by code point, up to 0xFFFF.
+
+    Code points above are of no class.
+    """
+    global _classes
+    if _classes is None:
+        classes = bytearray(0x10000)
+        for codePoint in range(0x10000):
+            char = chr(codePoint)
+            if char.isspace():
+                classes[codePoint] |= SPACE
+            lower = char.lower()
+            if len(lower) == 1 and lower in VOWELS:
+                classes[codePoint] |= VOWEL
+            if char in TERMINALS:
+                classes[codePoint] |= TERMINAL
+            if char in QUOTES:
+                classes[codePoint] |= QUOTE
+            if char in CLOSERS:
+                classes[codePoint] |= CLOSER
+        _classes = bytes(classes)
+    return _classes
+
+
+def get_word_text(text):
+    """Return a scene content prepared like for word counting.
+
+    Markup and comments are removed, dashes become word limits, and hyphens join words,
+    so the number of words separated by spaces is the scene's word count.
+    """
+    return NO_WORD_LIMITS.sub('', ADDITIONAL_WORD_LIMITS.sub(' ', text))
+
+
+class ProseStatistics:
+    """Per-scene prose statistics of a novel.
+
+    Public methods:
+        get_statistics(words, sentences, syllables, dialogueLetters, letters) -- return a statistics dictionary.
+        write_csv(filePath) -- write the scene statistics to a CSV file.
+
+    Public instance variables:
+        sceneIds: list -- IDs of the scenes with statistics, in reading order.
+        scenes: dict -- statistics dictionary (key: scene ID).
+        totals: dict -- statistics dictionary of the whole novel.
+        vectorized: bool -- True if the statistics were computed with NumPy.
+
+    A statistics dictionary has the keys listed in STATISTICS_FIELDS:
+        words: int -- number of words, consistent with the scene's word count.
+        sentences: int -- number of sentences.
+        syllables: int -- estimated number of syllables.
+        meanSentenceLength: float -- words per sentence.
+        dialogueRatio: float -- share of the non-space characters within double quotation marks.
+        readingEase: float -- Flesch reading ease, or None if there are no words.
+
+    Like with the reading progress, "Normal" scenes in "Normal" chapters are evaluated.
+    Sentences end with sentence end punctuation followed by a space, a quotation mark,
+    or a closing bracket; a text after the last one is a sentence as well.
+    Syllables are estimated by groups of vowels, at least one per word.
+    Dialogue is delimited by double quotation marks; an opening quotation mark
+    is valid until the end of the paragraph.
+    """
+    BATCH_SIZE = 1 << 16
+    # Number of characters evaluated with one set of NumPy arrays, bounding the memory needed.
+
+    def __init__(self, novel, vectorized=None):
+        """Compute the statistics of all scenes in one batch.
+
+        Positional arguments:
+            novel -- Novel instance.
+
+        Optional arguments:
+            vectorized: bool -- if True, use NumPy; if False, use Python loops;
+                                if None, use NumPy if it is installed.
+        """
+        if vectorized is None:
+            vectorized = get_numpy() is not None
+        self.vectorized = vectorized
+        self.sceneIds = []
+        self.scenes = {}
+        self._chapterIds = []
+        # Chapter ID for each entry of sceneIds.
+        texts = []
+        readingOrder = novel.get_reading_order()
+        for chId, (start, stop) in readingOrder.chapterRanges.items():
+            if novel.chapters[chId].chType != 0:
+                continue
+
+            for scId in readingOrder.sceneIds[start:stop]:
+                scene = novel.scenes[scId]
+                if scene.scType != 0 or not scene.sceneContent:
+                    continue
+
+                self.sceneIds.append(scId)
+                self._chapterIds.append(chId)
+                texts.append(get_word_text(scene.sceneContent))
+        self._titles = [novel.scenes[scId].title for scId in self.sceneIds]
+        if vectorized:
+            counts = self._count_vectorized(texts)
+        else:
+            counts = [self._count(text) for text in texts]
+        totals = [0, 0, 0, 0, 0]
+        for scId, sceneCounts in zip(self.sceneIds, counts):
+            self.scenes[scId] = self.get_statistics(*sceneCounts)
+            for i, count in enumerate(sceneCounts):
+                totals[i] += count
+        self.totals = self.get_statistics(*totals)
+
+    def get_statistics(self, words, sentences, syllables, dialogueLetters, letters):
+        """Return a statistics dictionary.
+
+        Positional arguments:
+            words: int -- number of words.
+            sentences: int -- number of sentences.
+            syllables: int -- number of syllables.
+            dialogueLetters: int -- number of non-space characters within quotation marks.
+            letters: int -- number of non-space characters except quotation marks.
+        """
+        statistics = dict(
+            words=words,
+            sentences=sentences,
+            syllables=syllables,
+            meanSentenceLength=0.0,
+            dialogueRatio=0.0,
+            readingEase=None,
+            )
+        if sentences:
+            statistics['meanSentenceLength'] = words / sentences
+        if letters:
+            statistics['dialogueRatio'] = dialogueLetters / letters
+        if words and sentences:
+            statistics['readingEase'] = 206.835 - 1.015 * words / sentences - 84.6 * syllables / words
+        return statistics
+
+    def write_csv(self, filePath):
+        """Write the scene statistics to a CSV file.
+
+        Positional arguments:
+            filePath: str -- path of the CSV file.
+
+        There is a row per scene, and a last row with the totals.
+        Raise the "Error" exception in case of error.
+        """
+        try:
+            with open(filePath, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('chapterId', 'sceneId', 'title') + STATISTICS_FIELDS)
+                for chId, scId, title in zip(self._chapterIds, self.sceneIds, self._titles):
+                    writer.writerow([chId, scId, title] + self._format_row(self.scenes[scId]))
+                writer.writerow(['', '', ''] + self._format_row(self.totals))
+        except Exception:
+            raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
+
+    def _format_row(self, statistics):
+        """Return a list of CSV values of a statistics dictionary."""
+        row = []
+        for field in STATISTICS_FIELDS:
+            value = statistics[field]
+            if isinstance(value, float):
+                value = round(value, 3)
+            elif value is None:
+                value = ''
+            row.append(value)
+        return row
+
+    def _count(self, text):
+        """Return a tuple (words, sentences, syllables, dialogue letters, letters) of a word text."""
+        classes = get_character_classes()
+        words = sentences = syllables = dialogueLetters = letters = 0
+        wordSyllables = 0
+        inWord = False
+        previousClass = SPACE
+        quotes = 0
+        # Number of quotation marks in the paragraph so far.
+        lastWordStart = -1
+        lastSentenceEnd = -1
+        text = f'{text}\n'
+        for i, char in enumerate(text):
+            codePoint = ord(char)
+            charClass = classes[codePoint] if codePoint < 0x10000 else 0
+            if charClass & SPACE:
+                if inWord:
+                    syllables += max(wordSyllables, 1)
+                    inWord = False
+                if char == '\n':
+                    quotes = 0
+            else:
+                if not inWord:
+                    inWord = True
+                    words += 1
+                    wordSyllables = 0
+                    lastWordStart = i
+                if charClass & VOWEL and not previousClass & VOWEL:
+                    wordSyllables += 1
+                if charClass & QUOTE:
+                    quotes += 1
+                else:
+                    letters += 1
+                    dialogueLetters += quotes & 1
+                if charClass & TERMINAL:
+                    nextCodePoint = ord(text[i + 1])
+                    nextClass = classes[nextCodePoint] if nextCodePoint < 0x10000 else 0
+                    if not nextClass & TERMINAL and nextClass & (SPACE | QUOTE | CLOSER):
+                        sentences += 1
+                        lastSentenceEnd = i
+            previousClass = charClass
+        if lastWordStart > lastSentenceEnd:
+            sentences += 1
+        return words, sentences, syllables, dialogueLetters, letters
+
+    def _count_vectorized(self, texts):
+        """Return a list of (words, sentences, syllables, dialogue letters, letters) tuples of the word texts.
+
+        The texts are evaluated in batches of about BATCH_SIZE characters;
+        a longer text is a batch of its own.
+        """
+        counts = []
+        batch = []
+        batchSize = 0
+        for text in texts:
+            if batch and batchSize + len(text) >= self.BATCH_SIZE:
+                counts.extend(self._count_batch(batch))
+                batch = []
+                batchSize = 0
+            batch.append(text)
+            batchSize += len(text) + 1
+        if batch:
+            counts.extend(self._count_batch(batch))
+        return counts
+
+    def _count_batch(self, texts):
+        """Return a list of (words, sentences, syllables, dialogue letters, letters) tuples of the word texts.
+
+        The texts are encoded into one buffer of code points, and each character class
+        is determined for the whole buffer with NumPy array operations.
+        The counts per text are sums between the text boundaries. Only the positions
+        of word starts, sentence ends, and syllables are listed, not of all characters.
+        """
+        numpy = get_numpy()
+
+        # Each text is terminated by a newline, so words, sentences, and quotations end with the text.
+        codePoints = numpy.frombuffer(''.join(f'{text}\n' for text in texts).encode('utf-32-le'), dtype=numpy.uint32)
+        classes = numpy.frombuffer(get_character_classes(), dtype=numpy.uint8)[numpy.minimum(codePoints, 0xFFFF)]
+        classes[codePoints > 0xFFFF] = 0
+        newline = codePoints == 10
+        del codePoints
+        lengths = numpy.fromiter((len(text) + 1 for text in texts), dtype=numpy.int64, count=len(texts))
+        starts = numpy.cumsum(lengths) - lengths
+
+        space = (classes & SPACE) != 0
+        wordStart = ~space
+        wordStart[1:] &= space[:-1]
+
+        vowelGroup = (classes & VOWEL) != 0
+        vowelGroup[1:] &= ~vowelGroup[:-1]
+
+        nextClasses = numpy.empty_like(classes)
+        nextClasses[:-1] = classes[1:]
+        nextClasses[-1] = SPACE
+        sentenceEnd = (classes & TERMINAL) != 0
+        sentenceEnd &= (nextClasses & TERMINAL) == 0
+        sentenceEnd &= (nextClasses & (SPACE | QUOTE | CLOSER)) != 0
+        del nextClasses
+
+        quote = (classes & QUOTE) != 0
+        del classes
+        quoteCount = numpy.cumsum(quote, dtype=numpy.int32)
+        # The quotation marks counted up to the last newline; the counts never decrease.
+        quoteCount -= numpy.maximum.accumulate(numpy.where(newline, quoteCount, 0))
+        letter = ~space & ~quote
+        dialogue = letter & ((quoteCount & 1) == 1)
+        del space, quote, quoteCount, newline
+
+        def sums(values):
+            return numpy.add.reduceat(values, starts, dtype=numpy.int64)
+
+        words = sums(wordStart)
+        sentences = sums(sentenceEnd)
+        dialogueLetters = sums(dialogue)
+        letters = sums(letter)
+
+        # Syllables per word, at least one. Each vowel group belongs to the last word started before.
+        wordPositions = numpy.flatnonzero(wordStart)
+        wordIndices = numpy.searchsorted(wordPositions, numpy.flatnonzero(vowelGroup), side='right') - 1
+        wordSyllables = numpy.maximum(numpy.bincount(wordIndices, minlength=len(wordPositions)), 1)
+        syllableSums = numpy.concatenate(([0], numpy.cumsum(wordSyllables)))
+        wordEnds = numpy.cumsum(words)
+        syllables = syllableSums[wordEnds] - syllableSums[wordEnds - words]
+
+        # A text after the last sentence end punctuation is a sentence.
+        sentencePositions = numpy.flatnonzero(sentenceEnd)
+        lastWordStart = numpy.where(words > 0, numpy.append(wordPositions, -1)[wordEnds - 1], -1)
+        lastSentenceEnd = numpy.where(sentences > 0, numpy.append(sentencePositions, -1)[numpy.cumsum(sentences) - 1], -1)
+        sentences += lastWordStart > lastSentenceEnd
+        return [tuple(int(value) for value in counts)
+                for counts in zip(words, sentences, syllables, dialogueLetters, letters)]
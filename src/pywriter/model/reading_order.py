@@ -0,0 +1,100 @@
+"""Provide a class for a novel's flattened reading order.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from bisect import bisect_right
+
+
+class ReadingOrder:
+    """Flattened reading order of a novel's chapters and scenes.
+
+    Public methods:
+        is_valid(novel) -- check whether the index still fits the novel's structure.
+        get_chapter_id(position) -- return the ID of the chapter containing the scene at a position.
+        get_scene_at_word(wordOffset) -- return the ID of the scene containing a word offset.
+
+    Public instance variables:
+        sceneIds: list -- IDs of all scenes in reading order.
+        chapterIds: list -- ID of the chapter of each scene in sceneIds.
+        positions: dict -- position in sceneIds (key: scene ID).
+        chapterRanges: dict -- (start, stop) of the chapter's scenes in sceneIds (key: chapter ID), in reading order.
+        wordOffsets: list -- number of words before each scene in sceneIds.
+        totalWords: int -- number of words of the novel.
+        sceneCount: int -- number of the novel's scenes.
+
+    Only "Normal" scenes in "Normal" chapters are counted as the novel's scenes and words.
+    Other scenes have a word offset, but no words.
+    """
+
+    def __init__(self, novel):
+        """Build the index with a single pass over the novel's chapters and scenes.
+
+        Positional arguments:
+            novel -- Novel instance.
+        """
+        self.sceneIds = []
+        self.chapterIds = []
+        self.positions = {}
+        self.chapterRanges = {}
+        self.wordOffsets = []
+        self.totalWords = 0
+        self.sceneCount = 0
+        self._countedOffsets = []
+        self._countedIds = []
+        # Word offsets and IDs of the scenes containing words, for bisection.
+        self._chapterList = novel.srtChapters
+        self._numberOfScenes = len(novel.scenes)
+        scenes = novel.scenes
+        for chId in novel.srtChapters:
+            chapter = novel.chapters[chId]
+            start = len(self.sceneIds)
+            for scId in chapter.srtScenes:
+                self.positions[scId] = len(self.sceneIds)
+                self.sceneIds.append(scId)
+                self.chapterIds.append(chId)
+                self.wordOffsets.append(self.totalWords)
+                scene = scenes[scId]
+                if chapter.chType == 0 and scene.scType == 0:
+                    self.sceneCount += 1
+                    if scene.wordCount:
+                        self._countedOffsets.append(self.totalWords)
+                        self._countedIds.append(scId)
+                        self.totalWords += scene.wordCount
+            self.chapterRanges[chId] = (start, len(self.sceneIds))
+
+    def is_valid(self, novel):
+        """Check whether the index still fits the novel's structure.
+
+        Positional arguments:
+            novel -- Novel instance the index was built from.
+
+        This is a quick plausibility check, detecting replaced chapter lists
+        and added or removed chapters and scenes. Other changes must be
+        reported by calling Novel.invalidate_reading_order().
+        """
+        return (novel.srtChapters is self._chapterList
+                and len(novel.srtChapters) == len(self.chapterRanges)
+                and len(novel.scenes) == self._numberOfScenes)
+
+    def get_chapter_id(self, position):
+        """Return the ID of the chapter containing the scene at a position.
+
+        Positional arguments:
+            position: int -- index in sceneIds.
+        """
+        return self.chapterIds[position]
+
+    def get_scene_at_word(self, wordOffset):
+        """Return the ID of the scene containing a word offset.
+
+        Positional arguments:
+            wordOffset: int -- number of words before the word looked for.
+
+        Return None if the offset is out of range.
+        """
+        if wordOffset < 0 or wordOffset >= self.totalWords:
+            return None
+
+        return self._countedIds[bisect_right(self._countedOffsets, wordOffset) - 1]
@@ -23,9 +23,20 @@ NON_LETTERS = re.compile(r'\[.+?\]|\/\*.+?\*\/|\n|\r')
 # from letter counting
 
 
+def get_counts(text):
+    """Return a tuple (word count, letter count) of a scene content."""
+    words = ADDITIONAL_WORD_LIMITS.sub(' ', text)
+    words = NO_WORD_LIMITS.sub('', words)
+    letters = NON_LETTERS.sub('', text)
+    return len(words.split()), len(letters)
+
+
 class Scene(BasicElement):
     """yWriter scene representation.
     
+    Public methods:
+        set_content(text, wordCount, letterCount) -- set sceneContent with precomputed counts.
+
     Public instance variables:
         sceneContent: str -- scene content (property with getter and setter).
         wordCount: int -- word count (derived; updated by the sceneContent setter).
@@ -222,9 +233,16 @@ class Scene(BasicElement):
     def sceneContent(self, text: str):
         """Set sceneContent updating word count and letter count."""
         self._sceneContent = text
-        text = ADDITIONAL_WORD_LIMITS.sub(' ', text)
-        text = NO_WORD_LIMITS.sub('', text)
-        wordList = text.split()
-        self.wordCount = len(wordList)
-        text = NON_LETTERS.sub('', self._sceneContent)
-        self.letterCount = len(text)
+        self.wordCount, self.letterCount = get_counts(text)
+
+    def set_content(self, text, wordCount, letterCount):
+        """Set sceneContent with precomputed counts.
+        
+        Positional arguments:
+            text: str -- scene content.
+            wordCount: int -- word count, as returned by get_counts(text).
+            letterCount: int -- letter count, as returned by get_counts(text).
+        """
+        self._sceneContent = text
+        self.wordCount = wordCount
+        self.letterCount = letterCount
@@ -0,0 +1,38 @@
+"""Provide functions for analyzing scene contents in worker processes.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.model.markup import tokenize
+from pywriter.model.novel import LANGUAGE_TAG
+from pywriter.model.scene import get_counts
+
+
+def analyze_text(text):
+    """Return the analysis of a scene content.
+
+    Positional arguments:
+        text: str -- scene content with yWriter markup.
+
+    Return a tuple (word count, letter count, languages, runs), where
+    languages is a list of the language codes in the order of their first appearance,
+    and runs is a list of formatted runs as generated by markup.tokenize().
+    """
+    wordCount, letterCount = get_counts(text)
+    languages = []
+    for language in LANGUAGE_TAG.findall(text):
+        if not language in languages:
+            languages.append(language)
+    return wordCount, letterCount, languages, list(tokenize(text))
+
+
+def analyze_texts(texts):
+    """Return a list with the analysis of each scene content in texts.
+
+    Positional arguments:
+        texts -- list of scene contents.
+
+    This is the unit of work sent to a worker process. 
+    """
+    return [analyze_text(text) for text in texts]
@@ -164,11 +164,12 @@ class MainTk(Ui):
         if self.prjFile is not None:
             self.close_project()
         self.kwargs['yw_last_open'] = fileName
-        self.prjFile = self._YW_CLASS(fileName)
+        self.prjFile = self._YW_CLASS(fileName, **self.kwargs)
         self.novel = Novel()
         self.prjFile.novel = self.novel
         try:
-            self.prjFile.read()
+            self._read_project()
+            # Hook for subclasses
         except Error as ex:
             self.close_project()
             self.set_info_how(f'!{str(ex)}')
@@ -179,6 +180,14 @@ class MainTk(Ui):
         self.enable_menu()
         return True
 
+    def _read_project(self):
+        """Read the project file.
+        
+        Raise the "Error" exception in case of error.
+        To be overridden by subclasses.
+        """
+        self.prjFile.read()
+
     def restore_status(self, event=None):
         """Overwrite error message with the status before."""
         self.show_status(self._statusText)
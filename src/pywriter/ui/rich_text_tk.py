@@ -31,6 +31,9 @@ class RichTextTk(tk.Text):
     H3_SPACING = 1.5
     CENTER_SPACING = 1.5
 
+    _fonts = {}
+    # Fonts and measures shared by all instances (key: default font name).
+
     def __init__(self, master=None, **kw):
         """Define tags for headings and bold/italic.
         
@@ -58,8 +61,32 @@ class RichTextTk(tk.Text):
                 setattr(self, m, getattr(self.frame, m))
 
         # This part is "rich text" specific:
-        defaultFont = tkFont.nametofont(self.cget('font'))
+        boldFont, italicFont, h1Font, h2Font, h3Font, em, bulletWidth, defaultSize = self._get_fonts()
+        self.tag_configure(self.BOLD_TAG, font=boldFont)
+        self.tag_configure(self.ITALIC_TAG, font=italicFont)
+        self.tag_configure(self.H1_TAG, font=h1Font, spacing3=defaultSize,
+                           justify='center', spacing1=defaultSize * self.H1_SPACING)
+        self.tag_configure(self.H2_TAG, font=h2Font, spacing3=defaultSize,
+                           justify='center', spacing1=defaultSize * self.H2_SPACING)
+        self.tag_configure(self.H3_TAG, font=h3Font, spacing3=defaultSize,
+                           justify='center', spacing1=defaultSize * self.H3_SPACING)
+        self.tag_configure(self.CENTER_TAG, justify='center', spacing1=defaultSize * self.CENTER_SPACING)
+
+        lmargin2 = em + bulletWidth
+        self.tag_configure(self.BULLET_TAG, lmargin1=em, lmargin2=lmargin2)
+
+    def _get_fonts(self):
+        """Return the fonts for the formatting tags, the em and bullet widths, and the default font size.
+        
+        The fonts are created and measured only once per default font, 
+        and shared by all text boxes.
+        """
+        fontName = self.cget('font')
+        fonts = self._fonts.get(fontName, None)
+        if fonts is not None:
+            return fonts
 
+        defaultFont = tkFont.nametofont(fontName)
         em = defaultFont.measure('m')
         defaultSize = defaultFont.cget('size')
         boldFont = tkFont.Font(**defaultFont.configure())
@@ -73,19 +100,24 @@ class RichTextTk(tk.Text):
         h1Font.configure(size=int(defaultSize * self.H1_SIZE), weight='bold')
         h2Font.configure(size=int(defaultSize * self.H2_SIZE), weight='bold')
         h3Font.configure(size=int(defaultSize * self.H3_SIZE), slant='italic')
-
-        self.tag_configure(self.BOLD_TAG, font=boldFont)
-        self.tag_configure(self.ITALIC_TAG, font=italicFont)
-        self.tag_configure(self.H1_TAG, font=h1Font, spacing3=defaultSize,
-                           justify='center', spacing1=defaultSize * self.H1_SPACING)
-        self.tag_configure(self.H2_TAG, font=h2Font, spacing3=defaultSize,
-                           justify='center', spacing1=defaultSize * self.H2_SPACING)
-        self.tag_configure(self.H3_TAG, font=h3Font, spacing3=defaultSize,
-                           justify='center', spacing1=defaultSize * self.H3_SPACING)
-        self.tag_configure(self.CENTER_TAG, justify='center', spacing1=defaultSize * self.CENTER_SPACING)
-
-        lmargin2 = em + defaultFont.measure('\u2022 ')
-        self.tag_configure(self.BULLET_TAG, lmargin1=em, lmargin2=lmargin2)
+        bulletWidth = defaultFont.measure('\u2022 ')
+        fonts = (boldFont, italicFont, h1Font, h2Font, h3Font, em, bulletWidth, defaultSize)
+        self._fonts[fontName] = fonts
+        return fonts
 
     def insert_bullet(self, index, text):
         self.insert(index, f'\u2022 {text}', self.BULLET_TAG)
+
+    def insert_runs(self, index, runs):
+        """Insert formatted text with a single Tk call.
+        
+        Positional arguments:
+            index -- position of the inserted text.
+            runs -- iterable of (text, tags) tuples, where tags is a tag name or a tuple of tag names.
+        """
+        args = []
+        for text, tags in runs:
+            args.append(text)
+            args.append(tags)
+        if args:
+            self.insert(index, *args)
@@ -8,18 +8,112 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import os
 import re
+import mmap
+from functools import partial
+from hashlib import blake2b
 from html import unescape
 from datetime import datetime
 import xml.etree.ElementTree as ET
 from pywriter.pywriter_globals import *
+from pywriter.diag.profiler import PROFILER
 from pywriter.model.chapter import Chapter
 from pywriter.model.scene import Scene
+from pywriter.model.lazy_scene import LazyScene
+from pywriter.model.cross_references import CrossReferences
+from pywriter.model.scene_analysis import analyze_texts
 from pywriter.model.character import Character
 from pywriter.model.world_element import WorldElement
 from pywriter.model.basic_element import BasicElement
 from pywriter.file.file import File
 from pywriter.model.id_generator import create_id
 from pywriter.yw.xml_indent import indent
+from pywriter.yw.yw7_record_parser import get_records
+
+SCENE_START = re.compile(rb'<SCENE>\s*<ID>([^<]*)</ID>')
+# Beginning of a scene's raw UTF-8 encoded XML, including the scene ID.
+
+CONTROL_CHARS = bytes(range(0x00, 0x09)) + b'\x0b\x0c' + bytes(range(0x0e, 0x20))
+# Control characters not allowed in XML 1.0; they cannot be part of a UTF-8 multibyte sequence.
+
+CONTROL_CHAR = re.compile(b'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+ENCODING_SAMPLE_SIZE = 4096
+# Number of bytes at the beginning of a file examined for encoding detection.
+
+LAZY_ELEMENT = re.compile(rb'<(SceneContent|Notes)><!\[CDATA\[(.*?)\]\]></\1>', re.DOTALL)
+# Scene content or notes in a CDATA section, read separately when parsing memory-mapped files.
+
+PEEK_ELEMENT = re.compile(rb'<(SceneContent|Notes|Goal|Conflict|Outcome|LOCATIONS|ITEMS|CHARACTERS|PROJECTNOTES)>|</CHAPTERS>')
+# Beginning of an element skipped when peeking, or the end of the last section needed.
+
+PARSER_CHUNK_SIZE = 1024 * 1024
+# Number of bytes fed to the parser at once when reading a memory-mapped file.
+
+BATCH_SIZE = 1000000
+# Number of characters of scene contents sent to a worker process at once.
+
+
+def decode_cdata(data):
+    """Return the text of a CDATA section read from a yw7 file.
+    
+    Positional argument:
+        data: bytes -- UTF-8 encoded text.
+    
+    Remove illegal control characters and normalize line breaks like the XML parser.
+    """
+    if CONTROL_CHAR.search(data) is not None:
+        data = data.translate(None, CONTROL_CHARS)
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+class LazySourceFile:
+    """Read access to the scene texts of a yw7 file after parsing.
+
+    Public methods:
+        read_text(start, end) -- return the text of a CDATA section.
+
+    The texts are read with os.pread() from a duplicate of the file descriptor,
+    so they can be read after the file and its memory mapping are closed.
+    If the file is replaced, e.g. by yWriter saving the project, the texts are read
+    from the former file, which is kept by the file descriptor.
+    If the file is changed in place, the texts are not read, because they may have moved.
+    Unlike accessing a memory mapping of a truncated file, this does not crash the process.
+    """
+
+    def __init__(self, file):
+        """Duplicate the file descriptor, and note the file's size and modification time.
+
+        Positional arguments:
+            file -- binary file object opened for reading.
+        """
+        self._filePath = file.name
+        self._fd = os.dup(file.fileno())
+        status = os.fstat(self._fd)
+        self._signature = (status.st_size, status.st_mtime_ns)
+
+    def __del__(self):
+        """Close the file descriptor when no scene refers to the file anymore."""
+        fd = getattr(self, '_fd', None)
+        if fd is not None:
+            os.close(fd)
+
+    def read_text(self, start, end):
+        """Return the text of a CDATA section.
+
+        Positional arguments:
+            start: int -- position of the first byte of the text in the file.
+            end: int -- position after the last byte of the text.
+
+        Like the XML parser, return None for an empty section.
+        Raise the "Error" exception if the file was changed in place since reading.
+        """
+        status = os.fstat(self._fd)
+        if (status.st_size, status.st_mtime_ns) == self._signature:
+            data = os.pread(self._fd, end - start, start)
+            if len(data) == end - start:
+                return decode_cdata(data) or None
+
+        raise Error(f'{_("The project file was changed while reading")}: "{norm_path(self._filePath)}".')
 
 
 class Yw7File(File):
@@ -29,10 +123,14 @@ class Yw7File(File):
         adjust_scene_types() -- Make sure that scenes in non-"Normal" chapters inherit the chapter's type.
         is_locked() -- check whether the yw7 file is locked by yWriter.
         read() -- parse the yWriter xml file and get the instance variables.
+        peek() -- read the project's metadata, chapters and scenes, without the scene texts.
         write() -- write instance variables to the yWriter xml file.
 
     Public instance variables:
         tree -- xml element tree of the yWriter project
+        workers -- int: number of worker processes analyzing the scene contents when reading.
+        sceneRuns -- dict: formatted runs of the scene contents analyzed by worker processes (key: scene ID).
+                     The viewer takes the runs and resets sceneRuns to an empty dict.
         
     Public class constants:
         PRJ_KWVAR -- List of the names of the project keyword variables.
@@ -96,6 +194,8 @@ class Yw7File(File):
     ITM_KWVAR = [
         'Field_Link',
         ]
+    MMAP_THRESHOLD = 64 * 1024 * 1024
+    # Files larger than this number of bytes are memory-mapped, if the platform allows.
 
     def __init__(self, filePath, **kwargs):
         """Initialize instance variables.
@@ -104,19 +204,36 @@ class Yw7File(File):
             filePath: str -- path to the yw7 file.
             
         Optional arguments:
-            kwargs -- keyword arguments (not used here).            
-        
+            workers: int -- number of worker processes analyzing the scene contents when reading.
+                            With less than 2 workers, the scenes are analyzed in the calling process.
+            
         Extends the superclass constructor.
         """
         super().__init__(filePath)
         self.tree = None
+        try:
+            self.workers = int(kwargs.get('workers', 1))
+        except ValueError:
+            self.workers = 1
+        self.sceneRuns = {}
+        self._sceneDigests = {}
+        # key: scene ID, value: digest of the scene's raw XML.
+        self._sceneCache = {}
+        # key: scene ID, value: tuple (digest, Scene instance, scene type as read).
+        # Scenes with unchanged XML are reused when the file is read again.
+        self._worldIds = None
+        self._lazySources = None
+        # While reading a memory-mapped file: list of loaders of scene contents and notes.
+        self._peeking = False
 
     def adjust_scene_types(self):
         """Make sure that scenes in non-"Normal" chapters inherit the chapter's type."""
-        for chId in self.novel.srtChapters:
-            if self.novel.chapters[chId].chType != 0:
-                for scId in self.novel.chapters[chId].srtScenes:
-                    self.novel.scenes[scId].scType = self.novel.chapters[chId].chType
+        readingOrder = self.novel.get_reading_order()
+        for chId, (start, stop) in readingOrder.chapterRanges.items():
+            chType = self.novel.chapters[chId].chType
+            if chType != 0:
+                for scId in readingOrder.sceneIds[start:stop]:
+                    self.novel.scenes[scId].scType = chType
 
     def is_locked(self):
         """Check whether the yw7 file is locked by yWriter.
@@ -138,34 +255,160 @@ class Yw7File(File):
 
         if self.is_locked():
             raise Error(f'{_("yWriter seems to be open. Please close first")}.')
-        try:
+        mappedData = None
+        with PROFILER.phase('read file'):
             try:
-                with open(self.filePath, 'r', encoding='utf-8') as f:
-                    xmlText = f.read()
-            except:
-                # yw7 file may be UTF-16 encoded, with a wrong XML header (yWriter for iOS)
-                with open(self.filePath, 'r', encoding='utf-16') as f:
-                    xmlText = f.read()
-        except:
+                with open(self.filePath, 'rb') as f:
+                    if self._is_mappable(f):
+                        mappedData = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        sourceFile = LazySourceFile(f)
+                    else:
+                        xmlData = f.read()
+            except Exception as ex:
+                raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        if mappedData is not None:
+            try:
+                if self._detect_encoding(mappedData[:ENCODING_SAMPLE_SIZE]) == 'utf-8':
+                    self._read_mapped(mappedData, sourceFile)
+                    return
+
+                # Only UTF-8 encoded files can be parsed from the mapping.
+                xmlData = mappedData[:]
+            finally:
+                # The mapping is not kept, because accessing a mapping
+                # of a file truncated in place crashes the process.
+                self._lazySources = None
+                mappedData.close()
+
+        with PROFILER.phase('decode'):
+            encoding = self._detect_encoding(xmlData[:ENCODING_SAMPLE_SIZE])
+            if encoding != 'utf-8':
+                # yw7 file may be UTF-16 encoded, with a wrong XML header (yWriter for iOS).
+                try:
+                    xmlData = xmlData.decode(encoding).encode('utf-8')
+                except Exception as ex:
+                    raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        with PROFILER.phase('strip control chars'):
+            if CONTROL_CHAR.search(xmlData) is not None:
+                # Copy the data only if there is something to remove.
+                xmlData = xmlData.translate(None, CONTROL_CHARS)
+        with PROFILER.phase('digest scenes'):
+            self._sceneDigests = self._get_scene_digests(xmlData)
+        with PROFILER.phase('parse'):
             try:
-                self.tree = ET.parse(self.filePath)
+                parser = self._get_parser()
+                parser.feed(xmlData)
+                root = parser.close()
             except Exception as ex:
                 raise Error(f'{_("Can not process file")} - {str(ex)}')
 
-        xmlText = re.sub('[\x00-\x08|\x0b-\x0c|\x0e-\x1f]', '', xmlText)
-        root = ET.fromstring(xmlText)
-        xmlText = None
+        xmlData = None
         # saving memory
+        self._read_tree(root)
+
+    def peek(self):
+        """Read the project's metadata, chapters and scenes, without the scene texts.
+        
+        This is for summaries, e.g. titles and word counts, of big projects.
+        Scene contents, notes, goals, conflicts and outcomes are skipped before parsing,
+        as well as the characters, locations, items and project notes.
+        The scenes' word and letter counts are taken from the file.
+        Parsing stops after the chapters. The novel is incomplete,
+        so it must not be written back.
+        Raise the "Error" exception in case of error. 
+        """
+        for field in self.PRJ_KWVAR:
+            self.novel.kwVar[field] = None
+
+        if self.is_locked():
+            raise Error(f'{_("yWriter seems to be open. Please close first")}.')
+        with PROFILER.phase('read file'):
+            try:
+                with open(self.filePath, 'rb') as f:
+                    try:
+                        mappedData = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:
+                        # Empty files cannot be mapped.
+                        mappedData = None
+            except Exception as ex:
+                raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        try:
+            xmlData = mappedData or b''
+            encoding = self._detect_encoding(xmlData[:ENCODING_SAMPLE_SIZE])
+            if encoding != 'utf-8':
+                # Only UTF-8 encoded data can be searched for the skipped elements.
+                try:
+                    xmlData = xmlData[:].decode(encoding).encode('utf-8')
+                except Exception as ex:
+                    raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+            with PROFILER.phase('parse'):
+                parser = self._get_parser()
+                try:
+                    position = 0
+                    while True:
+                        match = PEEK_ELEMENT.search(xmlData, position)
+                        if match is None:
+                            self._feed_chunks(parser, xmlData, position, len(xmlData))
+                            break
+
+                        self._feed_chunks(parser, xmlData, position, match.end())
+                        if match.group(1) is None:
+                            # The chapters are the last section needed.
+                            parser.feed(b'</YWRITER7>')
+                            break
+
+                        # Continue with the end tag of the skipped element.
+                        position = xmlData.find(b'</%s>' % match.group(1), match.end())
+                        if position < 0:
+                            position = match.end()
+                    root = parser.close()
+                except Exception as ex:
+                    raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        finally:
+            if mappedData is not None:
+                mappedData.close()
+        self._sceneDigests = {}
+        self._peeking = True
+        try:
+            self._read_tree(root)
+        finally:
+            self._peeking = False
+        self.tree = None
+
+    def _read_tree(self, root):
+        """Get the instance variables from the xml element tree.
+
+        The tree is converted to the records the streaming reader collects,
+        so both readers share the mapping of the XML elements to the novel.
+        """
         self.tree = ET.ElementTree(root)
-        self._read_project(root)
-        self._read_locations(root)
-        self._read_items(root)
-        self._read_characters(root)
-        self._read_projectvars(root)
-        self._read_projectnotes(root)
-        self._read_scenes(root)
-        self._read_chapters(root)
-        self.adjust_scene_types()
+        self._read_records(get_records(root))
+
+    def _read_records(self, records):
+        """Get the instance variables from the records of the parsed file.
+
+        Positional arguments:
+            records: dict -- list of Yw7Record instances per section, as returned by Yw7RecordParser.close().
+        """
+        self.novel.invalidate_reading_order()
+        with PROFILER.phase('read project'):
+            self._read_project(records)
+            self._read_locations(records)
+            self._read_items(records)
+            self._read_characters(records)
+            self._read_projectvars(records)
+            self._read_projectnotes(records)
+        with PROFILER.phase('read scenes'):
+            self._read_scenes(records)
+        with PROFILER.phase('read chapters'):
+            self._read_chapters(records)
+        with PROFILER.phase('adjust scene types'):
+            self.adjust_scene_types()
 
         #--- Set custom instance variables.
         for scId in self.novel.scenes:
@@ -1069,9 +1312,9 @@ class Yw7File(File):
 
         # Modify the scene contents of an existing xml element tree.
         for xmlScene in root.find('SCENES'):
-            scId = xmlScene.find('ID').text
-            if self.novel.scenes[scId].sceneContent is not None:
-                xmlScene.find('SceneContent').text = self.novel.scenes[scId].sceneContent
+            sceneContent = self.novel.scenes[xmlScene.find('ID').text].sceneContent
+            if sceneContent is not None:
+                xmlScene.find('SceneContent').text = sceneContent
             try:
                 xmlScene.remove(xmlScene.find('WordCount'))
             except:
@@ -1118,6 +1361,140 @@ class Yw7File(File):
             text = ''
         return text
 
+    def _is_mappable(self, file):
+        """Return True if the open file is to be memory-mapped.
+        
+        Positional argument:
+            file -- binary file object.
+        
+        Memory mapping is not used on Windows, because yWriter could not 
+        replace the file as long as the mapping exists.
+        """
+        if os.name == 'nt':
+            return False
+
+        return os.fstat(file.fileno()).st_size > self.MMAP_THRESHOLD
+
+    def _read_mapped(self, mappedData, sourceFile):
+        """Parse a memory-mapped UTF-8 encoded yw7 file and get the instance variables.
+        
+        Positional arguments:
+            mappedData: mmap -- the whole yw7 XML document.
+            sourceFile: LazySourceFile -- the file the scene texts are read from.
+        
+        The scenes' contents and notes in CDATA sections are not passed to the parser,
+        so no string for the whole document is created. They are replaced with
+        empty elements with a "ref" attribute, indexing self._lazySources.
+        The scene contents are read from sourceFile with the scenes, because the word and
+        letter counts are determined from the text. The scenes keep loaders reading their
+        notes from sourceFile on first access, not from the mapping, so the mapping can be
+        closed after reading.
+        Raise the "Error" exception in case of error. 
+        """
+        with PROFILER.phase('digest scenes'):
+            self._sceneDigests = self._get_scene_digests(mappedData)
+        with PROFILER.phase('parse'):
+            parser = self._get_parser()
+            self._lazySources = []
+            try:
+                position = 0
+                start = mappedData.find(b'<SCENES>')
+                end = mappedData.find(b'</SCENES>', start)
+                if start >= 0 and end >= 0:
+                    for match in LAZY_ELEMENT.finditer(mappedData, start, end):
+                        self._feed_chunks(parser, mappedData, position, match.start())
+                        parser.feed(b'<%s ref="%d"/>' % (match.group(1), len(self._lazySources)))
+                        self._lazySources.append(partial(sourceFile.read_text, match.start(2), match.end(2)))
+                        position = match.end()
+                self._feed_chunks(parser, mappedData, position, len(mappedData))
+                root = parser.close()
+            except Exception as ex:
+                raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        self._read_tree(root)
+
+    def _feed_chunks(self, parser, xmlData, start, end):
+        """Pass a part of the XML data to the parser in chunks, removing illegal control characters.
+        
+        Positional arguments:
+            parser -- parser returned by _get_parser().
+            xmlData: bytes or mmap -- UTF-8 encoded XML document.
+            start: int -- index of the first byte to be passed.
+            end: int -- index after the last byte to be passed.
+        """
+        for chunkStart in range(start, end, PARSER_CHUNK_SIZE):
+            chunk = xmlData[chunkStart:min(end, chunkStart + PARSER_CHUNK_SIZE)]
+            if CONTROL_CHAR.search(chunk) is not None:
+                chunk = chunk.translate(None, CONTROL_CHARS)
+            parser.feed(chunk)
+
+    def _detect_encoding(self, sample):
+        """Return the encoding of a yw7 file.
+        
+        Positional argument:
+            sample: bytes -- the first bytes of the file.
+        
+        Look for a byte order mark first. Without one, recognize UTF-16 by
+        the zero bytes of the ASCII characters that begin an XML document.
+        The encoding declared in the XML header is ignored, because
+        yWriter for iOS writes UTF-16 files with a UTF-8 header.
+        """
+        if sample.startswith(b'\xef\xbb\xbf'):
+            return 'utf-8'
+
+        if sample.startswith((b'\xff\xfe', b'\xfe\xff')):
+            return 'utf-16'
+
+        if sample.startswith(b'<\x00'):
+            return 'utf-16-le'
+
+        if sample.startswith(b'\x00<'):
+            return 'utf-16-be'
+
+        return 'utf-8'
+
+    def _get_parser(self):
+        """Return a parser for the UTF-8 encoded XML data, with feed() and close() methods.
+        
+        The encoding declared in the XML header is overridden, because it may be wrong.
+        close() returns the root element of the project.
+        """
+        return ET.XMLParser(encoding='utf-8')
+
+    def _get_scene_digests(self, xmlData):
+        """Return a dictionary with a digest of each scene's raw XML.
+        
+        Positional argument:
+            xmlData: bytes -- the whole UTF-8 encoded yw7 XML document.
+        
+        The SCENES section is split at the scene starts, so each part of it
+        is assigned to exactly one scene ID.
+        If a scene ID occurs twice, return an empty dictionary.
+        """
+        digests = {}
+        view = memoryview(xmlData)
+        start = xmlData.find(b'<SCENES>')
+        if start < 0:
+            return digests
+
+        end = xmlData.find(b'</SCENES>', start)
+        if end < 0:
+            return digests
+
+        scId = None
+        sceneStart = None
+        for match in SCENE_START.finditer(xmlData, start, end):
+            if scId is not None:
+                digests[scId] = blake2b(view[sceneStart:match.start()], digest_size=16).digest()
+            scId = match.group(1).decode('utf-8')
+            if scId in digests:
+                return {}
+
+            sceneStart = match.start()
+        if scId is not None:
+            digests[scId] = blake2b(view[sceneStart:end], digest_size=16).digest()
+        return digests
+
     def _postprocess_xml_file(self, filePath):
         """Postprocess an xml file created by ElementTree.
         
@@ -1153,43 +1530,44 @@ class Yw7File(File):
         except:
             raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
 
-    def _read_project(self, root):
-        """Read attributes at project level from the xml element tree."""
-        xmlProject = root.find('PROJECT')
+    def _read_project(self, records):
+        """Read attributes at project level from the records."""
+        xmlProject = records['PROJECT'][0].texts
+        xmlProjectFields = records['PROJECT'][0].children.get('Fields', [])
 
-        if xmlProject.find('Title') is not None:
-            self.novel.title = xmlProject.find('Title').text
+        if 'Title' in xmlProject:
+            self.novel.title = xmlProject['Title']
 
-        if xmlProject.find('AuthorName') is not None:
-            self.novel.authorName = xmlProject.find('AuthorName').text
+        if 'AuthorName' in xmlProject:
+            self.novel.authorName = xmlProject['AuthorName']
 
-        if xmlProject.find('Bio') is not None:
-            self.novel.authorBio = xmlProject.find('Bio').text
+        if 'Bio' in xmlProject:
+            self.novel.authorBio = xmlProject['Bio']
 
-        if xmlProject.find('Desc') is not None:
-            self.novel.desc = xmlProject.find('Desc').text
+        if 'Desc' in xmlProject:
+            self.novel.desc = xmlProject['Desc']
 
-        if xmlProject.find('FieldTitle1') is not None:
-            self.novel.fieldTitle1 = xmlProject.find('FieldTitle1').text
+        if 'FieldTitle1' in xmlProject:
+            self.novel.fieldTitle1 = xmlProject['FieldTitle1']
 
-        if xmlProject.find('FieldTitle2') is not None:
-            self.novel.fieldTitle2 = xmlProject.find('FieldTitle2').text
+        if 'FieldTitle2' in xmlProject:
+            self.novel.fieldTitle2 = xmlProject['FieldTitle2']
 
-        if xmlProject.find('FieldTitle3') is not None:
-            self.novel.fieldTitle3 = xmlProject.find('FieldTitle3').text
+        if 'FieldTitle3' in xmlProject:
+            self.novel.fieldTitle3 = xmlProject['FieldTitle3']
 
-        if xmlProject.find('FieldTitle4') is not None:
-            self.novel.fieldTitle4 = xmlProject.find('FieldTitle4').text
+        if 'FieldTitle4' in xmlProject:
+            self.novel.fieldTitle4 = xmlProject['FieldTitle4']
 
         #--- Read word target data.
-        if xmlProject.find('WordCountStart') is not None:
+        if 'WordCountStart' in xmlProject:
             try:
-                self.novel.wordCountStart = int(xmlProject.find('WordCountStart').text)
+                self.novel.wordCountStart = int(xmlProject['WordCountStart'])
             except:
                 self.novel.wordCountStart = 0
-        if xmlProject.find('WordTarget') is not None:
+        if 'WordTarget' in xmlProject:
             try:
-                self.novel.wordTarget = int(xmlProject.find('WordTarget').text)
+                self.novel.wordTarget = int(xmlProject['WordTarget'])
             except:
                 self.novel.wordTarget = 0
 
@@ -1198,11 +1576,10 @@ class Yw7File(File):
             self.novel.kwVar[fieldName] = None
 
         #--- Read project custom fields.
-        for xmlProjectFields in xmlProject.findall('Fields'):
+        for fields in self._get_fields(xmlProjectFields):
             for fieldName in self.PRJ_KWVAR:
-                field = xmlProjectFields.find(fieldName)
-                if field is not None:
-                    self.novel.kwVar[fieldName] = field.text
+                if fieldName in fields:
+                    self.novel.kwVar[fieldName] = fields[fieldName]
 
         # This is for projects written with v7.6 - v7.10:
         if self.novel.kwVar['Field_LanguageCode']:
@@ -1210,175 +1587,170 @@ class Yw7File(File):
         if self.novel.kwVar['Field_CountryCode']:
             self.novel.countryCode = self.novel.kwVar['Field_CountryCode']
 
-    def _read_locations(self, root):
-        """Read locations from the xml element tree."""
+    def _read_locations(self, records):
+        """Read locations from the records."""
         self.novel.srtLocations = []
         # This is necessary for re-reading.
-        for xmlLocation in root.find('LOCATIONS'):
-            lcId = xmlLocation.find('ID').text
+        for record in records.get('LOCATIONS', []):
+            xmlLocation = record.texts
+            lcId = xmlLocation['ID']
             self.novel.srtLocations.append(lcId)
             self.novel.locations[lcId] = WorldElement()
 
-            if xmlLocation.find('Title') is not None:
-                self.novel.locations[lcId].title = xmlLocation.find('Title').text
+            if 'Title' in xmlLocation:
+                self.novel.locations[lcId].title = xmlLocation['Title']
 
-            if xmlLocation.find('ImageFile') is not None:
-                self.novel.locations[lcId].image = xmlLocation.find('ImageFile').text
+            if 'ImageFile' in xmlLocation:
+                self.novel.locations[lcId].image = xmlLocation['ImageFile']
 
-            if xmlLocation.find('Desc') is not None:
-                self.novel.locations[lcId].desc = xmlLocation.find('Desc').text
+            if 'Desc' in xmlLocation:
+                self.novel.locations[lcId].desc = xmlLocation['Desc']
 
-            if xmlLocation.find('AKA') is not None:
-                self.novel.locations[lcId].aka = xmlLocation.find('AKA').text
+            if 'AKA' in xmlLocation:
+                self.novel.locations[lcId].aka = xmlLocation['AKA']
 
-            if xmlLocation.find('Tags') is not None:
-                if xmlLocation.find('Tags').text is not None:
-                    tags = string_to_list(xmlLocation.find('Tags').text)
-                    self.novel.locations[lcId].tags = self._strip_spaces(tags)
+            if xmlLocation.get('Tags', None) is not None:
+                tags = string_to_list(xmlLocation['Tags'])
+                self.novel.locations[lcId].tags = self._strip_spaces(tags)
 
             #--- Initialize custom keyword variables.
             for fieldName in self.LOC_KWVAR:
                 self.novel.locations[lcId].kwVar[fieldName] = None
 
             #--- Read location custom fields.
-            for xmlLocationFields in xmlLocation.findall('Fields'):
+            for fields in self._get_fields(record.children.get('Fields', [])):
                 for fieldName in self.LOC_KWVAR:
-                    field = xmlLocationFields.find(fieldName)
-                    if field is not None:
-                        self.novel.locations[lcId].kwVar[fieldName] = field.text
+                    if fieldName in fields:
+                        self.novel.locations[lcId].kwVar[fieldName] = fields[fieldName]
 
-    def _read_items(self, root):
-        """Read items from the xml element tree."""
+    def _read_items(self, records):
+        """Read items from the records."""
         self.novel.srtItems = []
         # This is necessary for re-reading.
-        for xmlItem in root.find('ITEMS'):
-            itId = xmlItem.find('ID').text
+        for record in records.get('ITEMS', []):
+            xmlItem = record.texts
+            itId = xmlItem['ID']
             self.novel.srtItems.append(itId)
             self.novel.items[itId] = WorldElement()
 
-            if xmlItem.find('Title') is not None:
-                self.novel.items[itId].title = xmlItem.find('Title').text
+            if 'Title' in xmlItem:
+                self.novel.items[itId].title = xmlItem['Title']
 
-            if xmlItem.find('ImageFile') is not None:
-                self.novel.items[itId].image = xmlItem.find('ImageFile').text
+            if 'ImageFile' in xmlItem:
+                self.novel.items[itId].image = xmlItem['ImageFile']
 
-            if xmlItem.find('Desc') is not None:
-                self.novel.items[itId].desc = xmlItem.find('Desc').text
+            if 'Desc' in xmlItem:
+                self.novel.items[itId].desc = xmlItem['Desc']
 
-            if xmlItem.find('AKA') is not None:
-                self.novel.items[itId].aka = xmlItem.find('AKA').text
+            if 'AKA' in xmlItem:
+                self.novel.items[itId].aka = xmlItem['AKA']
 
-            if xmlItem.find('Tags') is not None:
-                if xmlItem.find('Tags').text is not None:
-                    tags = string_to_list(xmlItem.find('Tags').text)
-                    self.novel.items[itId].tags = self._strip_spaces(tags)
+            if xmlItem.get('Tags', None) is not None:
+                tags = string_to_list(xmlItem['Tags'])
+                self.novel.items[itId].tags = self._strip_spaces(tags)
 
             #--- Initialize custom keyword variables.
             for fieldName in self.ITM_KWVAR:
                 self.novel.items[itId].kwVar[fieldName] = None
 
             #--- Read item custom fields.
-            for xmlItemFields in xmlItem.findall('Fields'):
+            for fields in self._get_fields(record.children.get('Fields', [])):
                 for fieldName in self.ITM_KWVAR:
-                    field = xmlItemFields.find(fieldName)
-                    if field is not None:
-                        self.novel.items[itId].kwVar[fieldName] = field.text
+                    if fieldName in fields:
+                        self.novel.items[itId].kwVar[fieldName] = fields[fieldName]
 
-    def _read_characters(self, root):
-        """Read characters from the xml element tree."""
+    def _read_characters(self, records):
+        """Read characters from the records."""
         self.novel.srtCharacters = []
         # This is necessary for re-reading.
-        for xmlCharacter in root.find('CHARACTERS'):
-            crId = xmlCharacter.find('ID').text
+        for record in records.get('CHARACTERS', []):
+            xmlCharacter = record.texts
+            crId = xmlCharacter['ID']
             self.novel.srtCharacters.append(crId)
             self.novel.characters[crId] = Character()
 
-            if xmlCharacter.find('Title') is not None:
-                self.novel.characters[crId].title = xmlCharacter.find('Title').text
+            if 'Title' in xmlCharacter:
+                self.novel.characters[crId].title = xmlCharacter['Title']
 
-            if xmlCharacter.find('ImageFile') is not None:
-                self.novel.characters[crId].image = xmlCharacter.find('ImageFile').text
+            if 'ImageFile' in xmlCharacter:
+                self.novel.characters[crId].image = xmlCharacter['ImageFile']
 
-            if xmlCharacter.find('Desc') is not None:
-                self.novel.characters[crId].desc = xmlCharacter.find('Desc').text
+            if 'Desc' in xmlCharacter:
+                self.novel.characters[crId].desc = xmlCharacter['Desc']
 
-            if xmlCharacter.find('AKA') is not None:
-                self.novel.characters[crId].aka = xmlCharacter.find('AKA').text
+            if 'AKA' in xmlCharacter:
+                self.novel.characters[crId].aka = xmlCharacter['AKA']
 
-            if xmlCharacter.find('Tags') is not None:
-                if xmlCharacter.find('Tags').text is not None:
-                    tags = string_to_list(xmlCharacter.find('Tags').text)
-                    self.novel.characters[crId].tags = self._strip_spaces(tags)
+            if xmlCharacter.get('Tags', None) is not None:
+                tags = string_to_list(xmlCharacter['Tags'])
+                self.novel.characters[crId].tags = self._strip_spaces(tags)
 
-            if xmlCharacter.find('Notes') is not None:
-                self.novel.characters[crId].notes = xmlCharacter.find('Notes').text
+            if 'Notes' in xmlCharacter:
+                self.novel.characters[crId].notes = xmlCharacter['Notes']
 
-            if xmlCharacter.find('Bio') is not None:
-                self.novel.characters[crId].bio = xmlCharacter.find('Bio').text
+            if 'Bio' in xmlCharacter:
+                self.novel.characters[crId].bio = xmlCharacter['Bio']
 
-            if xmlCharacter.find('Goals') is not None:
-                self.novel.characters[crId].goals = xmlCharacter.find('Goals').text
+            if 'Goals' in xmlCharacter:
+                self.novel.characters[crId].goals = xmlCharacter['Goals']
 
-            if xmlCharacter.find('FullName') is not None:
-                self.novel.characters[crId].fullName = xmlCharacter.find('FullName').text
+            if 'FullName' in xmlCharacter:
+                self.novel.characters[crId].fullName = xmlCharacter['FullName']
 
-            if xmlCharacter.find('Major') is not None:
-                self.novel.characters[crId].isMajor = True
-            else:
-                self.novel.characters[crId].isMajor = False
+            self.novel.characters[crId].isMajor = 'Major' in xmlCharacter
 
             #--- Initialize custom keyword variables.
             for fieldName in self.CRT_KWVAR:
                 self.novel.characters[crId].kwVar[fieldName] = None
 
             #--- Read character custom fields.
-            for xmlCharacterFields in xmlCharacter.findall('Fields'):
+            for fields in self._get_fields(record.children.get('Fields', [])):
                 for fieldName in self.CRT_KWVAR:
-                    field = xmlCharacterFields.find(fieldName)
-                    if field is not None:
-                        self.novel.characters[crId].kwVar[fieldName] = field.text
+                    if fieldName in fields:
+                        self.novel.characters[crId].kwVar[fieldName] = fields[fieldName]
 
-    def _read_projectnotes(self, root):
-        """Read project notes from the xml element tree."""
+    def _read_projectnotes(self, records):
+        """Read project notes from the records."""
         self.novel.srtPrjNotes = []
         # This is necessary for re-reading.
 
         try:
-            for xmlProjectnote in root.find('PROJECTNOTES'):
-                if xmlProjectnote.find('ID') is not None:
-                    pnId = xmlProjectnote.find('ID').text
+            for record in records.get('PROJECTNOTES', []):
+                xmlProjectnote = record.texts
+                if 'ID' in xmlProjectnote:
+                    pnId = xmlProjectnote['ID']
                     self.novel.srtPrjNotes.append(pnId)
                     self.novel.projectNotes[pnId] = BasicElement()
-                    if xmlProjectnote.find('Title') is not None:
-                        self.novel.projectNotes[pnId].title = xmlProjectnote.find('Title').text
-                    if xmlProjectnote.find('Desc') is not None:
-                        self.novel.projectNotes[pnId].desc = xmlProjectnote.find('Desc').text
+                    if 'Title' in xmlProjectnote:
+                        self.novel.projectNotes[pnId].title = xmlProjectnote['Title']
+                    if 'Desc' in xmlProjectnote:
+                        self.novel.projectNotes[pnId].desc = xmlProjectnote['Desc']
 
                 #--- Initialize project note custom fields.
                 for fieldName in self.PNT_KWVAR:
                     self.novel.projectNotes[pnId].kwVar[fieldName] = None
 
                 #--- Read project note custom fields.
-                for pnFields in xmlProjectnote.findall('Fields'):
-                    field = pnFields.find(fieldName)
-                    if field is not None:
-                        self.novel.projectNotes[pnId].kwVar[fieldName] = field.text
+                for fields in self._get_fields(record.children.get('Fields', [])):
+                    if fieldName in fields:
+                        self.novel.projectNotes[pnId].kwVar[fieldName] = fields[fieldName]
         except:
             pass
 
-    def _read_projectvars(self, root):
-        """Read relevant project variables from the xml element tree."""
+    def _read_projectvars(self, records):
+        """Read relevant project variables from the records."""
         try:
-            for xmlProjectvar in root.find('PROJECTVARS'):
-                if xmlProjectvar.find('Title') is not None:
-                    title = xmlProjectvar.find('Title').text
+            for record in records.get('PROJECTVARS', []):
+                xmlProjectvar = record.texts
+                if 'Title' in xmlProjectvar:
+                    title = xmlProjectvar['Title']
                     if title == 'Language':
-                        if xmlProjectvar.find('Desc') is not None:
-                            self.novel.languageCode = xmlProjectvar.find('Desc').text
+                        if 'Desc' in xmlProjectvar:
+                            self.novel.languageCode = xmlProjectvar['Desc']
 
                     elif title == 'Country':
-                        if xmlProjectvar.find('Desc') is not None:
-                            self.novel.countryCode = xmlProjectvar.find('Desc').text
+                        if 'Desc' in xmlProjectvar:
+                            self.novel.countryCode = xmlProjectvar['Desc']
 
                     elif title.startswith('lang='):
                         try:
@@ -1391,22 +1763,84 @@ class Yw7File(File):
         except:
             pass
 
-    def _read_scenes(self, root):
-        """ Read attributes at scene level from the xml element tree."""
-        for xmlScene in root.find('SCENES'):
-            scId = xmlScene.find('ID').text
-            self.novel.scenes[scId] = Scene()
+    def _read_scenes(self, records):
+        """ Read attributes at scene level from the records.
 
-            if xmlScene.find('Title') is not None:
-                self.novel.scenes[scId].title = xmlScene.find('Title').text
+        Scenes whose raw XML is unchanged since the last reading are not parsed again.
+        The reverse index of the scenes' cross references is built on the way.
+        """
+        xmlScenes = records.get('SCENES', [])
+        worldIds = (self.novel.srtCharacters.copy(), self.novel.srtLocations.copy(), self.novel.srtItems.copy())
+        if worldIds != self._worldIds or len(self._sceneDigests) != len(xmlScenes):
+            # The scene's cross references may have become invalid, or the digests are not reliable.
+            self._sceneCache = {}
+        self._worldIds = worldIds
+        sceneCache = {}
+        crossReferences = CrossReferences()
+        self.sceneRuns = {}
+        if self.workers > 1:
+            sceneTexts = []
+            # List of (scene ID, scene content) tuples to be analyzed by worker processes.
+        else:
+            sceneTexts = None
+        analyzedAll = True
+        # False if scenes are reused, so not all scene contents are analyzed.
+        srtCharacters = set(self.novel.srtCharacters)
+        srtLocations = set(self.novel.srtLocations)
+        srtItems = set(self.novel.srtItems)
+        for record in xmlScenes:
+            xmlScene = record.texts
+            scId = xmlScene['ID']
+            digest = self._sceneDigests.get(scId, None)
+            cached = self._sceneCache.get(scId, None)
+            if (digest is not None and cached is not None and cached[0] == digest
+                    and not (isinstance(cached[1], LazyScene) and cached[1].has_pending_sources())):
+                # Scenes with text not yet read from the former file are not reused,
+                # because the file may have been overwritten in place.
+                __, scene, scType = cached
+                scene.scType = scType
+                # Reset the scene type that may have been adjusted to the chapter type.
+                self.novel.scenes[scId] = scene
+                sceneCache[scId] = cached
+                crossReferences.add_scene(scId, scene)
+                analyzedAll = False
+                PROFILER.count('scenes reused')
+                continue
+
+            PROFILER.count('scenes parsed')
+            if self._lazySources is None:
+                scene = Scene()
+            else:
+                scene = LazyScene()
+            self.novel.scenes[scId] = scene
 
-            if xmlScene.find('Desc') is not None:
-                self.novel.scenes[scId].desc = xmlScene.find('Desc').text
+            if 'Title' in xmlScene:
+                scene.title = xmlScene['Title']
 
-            if xmlScene.find('SceneContent') is not None:
-                sceneContent = xmlScene.find('SceneContent').text
+            if 'Desc' in xmlScene:
+                scene.desc = xmlScene['Desc']
+
+            if 'SceneContent' in xmlScene:
+                loader = self._get_lazy_source(record, 'SceneContent')
+                if loader is not None:
+                    # The counts are determined from the text, not taken from the file.
+                    sceneContent = loader()
+                else:
+                    sceneContent = xmlScene['SceneContent']
                 if sceneContent is not None:
-                    self.novel.scenes[scId].sceneContent = sceneContent
+                    if sceneTexts is not None:
+                        sceneTexts.append((scId, sceneContent))
+                    else:
+                        scene.sceneContent = sceneContent
+            if self._peeking:
+                # The scene content is skipped, but the counts are stored in the file.
+                counts = []
+                for tag in ('WordCount', 'LetterCount'):
+                    try:
+                        counts.append(int(xmlScene[tag]))
+                    except:
+                        counts.append(0)
+                scene.set_content(None, *counts)
 
             #--- Read scene type.
 
@@ -1421,179 +1855,175 @@ class Yw7File(File):
             # Normal | N/A    | N/A            | 0
             # Normal | N/A    | 0              | 0
 
-            self.novel.scenes[scId].scType = 0
+            scene.scType = 0
 
             #--- Initialize custom keyword variables.
             for fieldName in self.SCN_KWVAR:
-                self.novel.scenes[scId].kwVar[fieldName] = None
+                scene.kwVar[fieldName] = None
 
-            for xmlSceneFields in xmlScene.findall('Fields'):
+            for fields in self._get_fields(record.children.get('Fields', [])):
                 #--- Read scene custom fields.
                 for fieldName in self.SCN_KWVAR:
-                    field = xmlSceneFields.find(fieldName)
-                    if field is not None:
-                        self.novel.scenes[scId].kwVar[fieldName] = field.text
+                    if fieldName in fields:
+                        scene.kwVar[fieldName] = fields[fieldName]
 
                 # Read scene type, if any.
-                if xmlSceneFields.find('Field_SceneType') is not None:
-                    if xmlSceneFields.find('Field_SceneType').text == '1':
-                        self.novel.scenes[scId].scType = 1
-                    elif xmlSceneFields.find('Field_SceneType').text == '2':
-                        self.novel.scenes[scId].scType = 2
-            if xmlScene.find('Unused') is not None:
-                if self.novel.scenes[scId].scType == 0:
-                    self.novel.scenes[scId].scType = 3
+                if 'Field_SceneType' in fields:
+                    if fields['Field_SceneType'] == '1':
+                        scene.scType = 1
+                    elif fields['Field_SceneType'] == '2':
+                        scene.scType = 2
+            if 'Unused' in xmlScene:
+                if scene.scType == 0:
+                    scene.scType = 3
 
             # Export when RTF.
-            if xmlScene.find('ExportCondSpecific') is None:
-                self.novel.scenes[scId].doNotExport = False
-            elif xmlScene.find('ExportWhenRTF') is not None:
-                self.novel.scenes[scId].doNotExport = False
+            if not 'ExportCondSpecific' in xmlScene:
+                scene.doNotExport = False
+            elif 'ExportWhenRTF' in xmlScene:
+                scene.doNotExport = False
             else:
-                self.novel.scenes[scId].doNotExport = True
+                scene.doNotExport = True
 
-            if xmlScene.find('Status') is not None:
-                self.novel.scenes[scId].status = int(xmlScene.find('Status').text)
+            if 'Status' in xmlScene:
+                scene.status = int(xmlScene['Status'])
 
-            if xmlScene.find('Notes') is not None:
-                self.novel.scenes[scId].notes = xmlScene.find('Notes').text
+            if 'Notes' in xmlScene:
+                loader = self._get_lazy_source(record, 'Notes')
+                if loader is not None:
+                    scene.set_notes_source(loader)
+                else:
+                    scene.notes = xmlScene['Notes']
 
-            if xmlScene.find('Tags') is not None:
-                if xmlScene.find('Tags').text is not None:
-                    tags = string_to_list(xmlScene.find('Tags').text)
-                    self.novel.scenes[scId].tags = self._strip_spaces(tags)
+            if xmlScene.get('Tags', None) is not None:
+                tags = string_to_list(xmlScene['Tags'])
+                scene.tags = self._strip_spaces(tags)
 
-            if xmlScene.find('Field1') is not None:
-                self.novel.scenes[scId].field1 = xmlScene.find('Field1').text
+            if 'Field1' in xmlScene:
+                scene.field1 = xmlScene['Field1']
 
-            if xmlScene.find('Field2') is not None:
-                self.novel.scenes[scId].field2 = xmlScene.find('Field2').text
+            if 'Field2' in xmlScene:
+                scene.field2 = xmlScene['Field2']
 
-            if xmlScene.find('Field3') is not None:
-                self.novel.scenes[scId].field3 = xmlScene.find('Field3').text
+            if 'Field3' in xmlScene:
+                scene.field3 = xmlScene['Field3']
 
-            if xmlScene.find('Field4') is not None:
-                self.novel.scenes[scId].field4 = xmlScene.find('Field4').text
+            if 'Field4' in xmlScene:
+                scene.field4 = xmlScene['Field4']
 
-            if xmlScene.find('AppendToPrev') is not None:
-                self.novel.scenes[scId].appendToPrev = True
-            else:
-                self.novel.scenes[scId].appendToPrev = False
+            scene.appendToPrev = 'AppendToPrev' in xmlScene
 
             #--- Scene start.
-            if xmlScene.find('SpecificDateTime') is not None:
-                dateTimeStr = xmlScene.find('SpecificDateTime').text
+            if 'SpecificDateTime' in xmlScene:
+                dateTimeStr = xmlScene['SpecificDateTime']
 
                 # Check SpecificDateTime for ISO compliance.
                 try:
                     dateTime = datetime.fromisoformat(dateTimeStr)
                 except:
-                    self.novel.scenes[scId].date = ''
-                    self.novel.scenes[scId].time = ''
+                    scene.date = ''
+                    scene.time = ''
                 else:
                     startDateTime = dateTime.isoformat().split('T')
-                    self.novel.scenes[scId].date = startDateTime[0]
-                    self.novel.scenes[scId].time = startDateTime[1]
+                    scene.date = startDateTime[0]
+                    scene.time = startDateTime[1]
             else:
-                if xmlScene.find('Day') is not None:
-                    day = xmlScene.find('Day').text
+                if 'Day' in xmlScene:
+                    day = xmlScene['Day']
 
                     # Check if Day represents an integer.
                     try:
                         int(day)
                     except ValueError:
                         day = ''
-                    self.novel.scenes[scId].day = day
+                    scene.day = day
 
                 hasUnspecificTime = False
-                if xmlScene.find('Hour') is not None:
-                    hour = xmlScene.find('Hour').text.zfill(2)
+                if 'Hour' in xmlScene:
+                    hour = xmlScene['Hour'].zfill(2)
                     hasUnspecificTime = True
                 else:
                     hour = '00'
-                if xmlScene.find('Minute') is not None:
-                    minute = xmlScene.find('Minute').text.zfill(2)
+                if 'Minute' in xmlScene:
+                    minute = xmlScene['Minute'].zfill(2)
                     hasUnspecificTime = True
                 else:
                     minute = '00'
                 if hasUnspecificTime:
-                    self.novel.scenes[scId].time = f'{hour}:{minute}:00'
+                    scene.time = f'{hour}:{minute}:00'
 
             #--- Scene duration.
-            if xmlScene.find('LastsDays') is not None:
-                self.novel.scenes[scId].lastsDays = xmlScene.find('LastsDays').text
-
-            if xmlScene.find('LastsHours') is not None:
-                self.novel.scenes[scId].lastsHours = xmlScene.find('LastsHours').text
-
-            if xmlScene.find('LastsMinutes') is not None:
-                self.novel.scenes[scId].lastsMinutes = xmlScene.find('LastsMinutes').text
-
-            if xmlScene.find('ReactionScene') is not None:
-                self.novel.scenes[scId].isReactionScene = True
-            else:
-                self.novel.scenes[scId].isReactionScene = False
-
-            if xmlScene.find('SubPlot') is not None:
-                self.novel.scenes[scId].isSubPlot = True
-            else:
-                self.novel.scenes[scId].isSubPlot = False
-
-            if xmlScene.find('Goal') is not None:
-                self.novel.scenes[scId].goal = xmlScene.find('Goal').text
-
-            if xmlScene.find('Conflict') is not None:
-                self.novel.scenes[scId].conflict = xmlScene.find('Conflict').text
-
-            if xmlScene.find('Outcome') is not None:
-                self.novel.scenes[scId].outcome = xmlScene.find('Outcome').text
-
-            if xmlScene.find('ImageFile') is not None:
-                self.novel.scenes[scId].image = xmlScene.find('ImageFile').text
-
-            if xmlScene.find('Characters') is not None:
-                for characters in xmlScene.find('Characters').iter('CharID'):
-                    crId = characters.text
-                    if crId in self.novel.srtCharacters:
-                        if self.novel.scenes[scId].characters is None:
-                            self.novel.scenes[scId].characters = []
-                        self.novel.scenes[scId].characters.append(crId)
-
-            if xmlScene.find('Locations') is not None:
-                for locations in xmlScene.find('Locations').iter('LocID'):
-                    lcId = locations.text
-                    if lcId in self.novel.srtLocations:
-                        if self.novel.scenes[scId].locations is None:
-                            self.novel.scenes[scId].locations = []
-                        self.novel.scenes[scId].locations.append(lcId)
-
-            if xmlScene.find('Items') is not None:
-                for items in xmlScene.find('Items').iter('ItemID'):
-                    itId = items.text
-                    if itId in self.novel.srtItems:
-                        if self.novel.scenes[scId].items is None:
-                            self.novel.scenes[scId].items = []
-                        self.novel.scenes[scId].items.append(itId)
-
-    def _read_chapters(self, root):
-        """Read attributes at chapter level from the xml element tree."""
+            if 'LastsDays' in xmlScene:
+                scene.lastsDays = xmlScene['LastsDays']
+
+            if 'LastsHours' in xmlScene:
+                scene.lastsHours = xmlScene['LastsHours']
+
+            if 'LastsMinutes' in xmlScene:
+                scene.lastsMinutes = xmlScene['LastsMinutes']
+
+            scene.isReactionScene = 'ReactionScene' in xmlScene
+            scene.isSubPlot = 'SubPlot' in xmlScene
+
+            if 'Goal' in xmlScene:
+                scene.goal = xmlScene['Goal']
+
+            if 'Conflict' in xmlScene:
+                scene.conflict = xmlScene['Conflict']
+
+            if 'Outcome' in xmlScene:
+                scene.outcome = xmlScene['Outcome']
+
+            if 'ImageFile' in xmlScene:
+                scene.image = xmlScene['ImageFile']
+
+            if 'Characters' in xmlScene:
+                for crId in self._get_ids(record, 'Characters', 'CharID', srtCharacters):
+                    if scene.characters is None:
+                        scene.characters = []
+                    scene.characters.append(crId)
+
+            if 'Locations' in xmlScene:
+                for lcId in self._get_ids(record, 'Locations', 'LocID', srtLocations):
+                    if scene.locations is None:
+                        scene.locations = []
+                    scene.locations.append(lcId)
+
+            if 'Items' in xmlScene:
+                for itId in self._get_ids(record, 'Items', 'ItemID', srtItems):
+                    if scene.items is None:
+                        scene.items = []
+                    scene.items.append(itId)
+
+            sceneCache[scId] = (digest, scene, scene.scType)
+            crossReferences.add_scene(scId, scene)
+        self._sceneCache = sceneCache
+        self.novel.set_cross_references(crossReferences)
+        if sceneTexts:
+            with PROFILER.phase('analyze scenes'):
+                self._analyze_scenes(sceneTexts, analyzedAll)
+
+    def _read_chapters(self, records):
+        """Read attributes at chapter level from the records."""
         self.novel.srtChapters = []
         # This is necessary for re-reading.
-        for xmlChapter in root.find('CHAPTERS'):
-            chId = xmlChapter.find('ID').text
-            self.novel.chapters[chId] = Chapter()
+        for record in records.get('CHAPTERS', []):
+            xmlChapter = record.texts
+            chId = xmlChapter['ID']
+            chapter = Chapter()
+            self.novel.chapters[chId] = chapter
             self.novel.srtChapters.append(chId)
 
-            if xmlChapter.find('Title') is not None:
-                self.novel.chapters[chId].title = xmlChapter.find('Title').text
+            if 'Title' in xmlChapter:
+                chapter.title = xmlChapter['Title']
 
-            if xmlChapter.find('Desc') is not None:
-                self.novel.chapters[chId].desc = xmlChapter.find('Desc').text
+            if 'Desc' in xmlChapter:
+                chapter.desc = xmlChapter['Desc']
 
-            if xmlChapter.find('SectionStart') is not None:
-                self.novel.chapters[chId].chLevel = 1
+            if 'SectionStart' in xmlChapter:
+                chapter.chLevel = 1
             else:
-                self.novel.chapters[chId].chLevel = 0
+                chapter.chLevel = 0
 
             # This is how yWriter 7.1.3.0 reads the chapter type:
             #
@@ -1608,65 +2038,142 @@ class Yw7File(File):
             # Todo   | x      | x    | 2           | 2
             # Unused | -1     | x    | x           | 3
 
-            self.novel.chapters[chId].chType = 0
-            if xmlChapter.find('Unused') is not None:
-                yUnused = True
-            else:
-                yUnused = False
-            if xmlChapter.find('ChapterType') is not None:
+            chapter.chType = 0
+            yUnused = 'Unused' in xmlChapter
+            if 'ChapterType' in xmlChapter:
                 # The file may be created with yWriter version 7.0.7.2+
-                yChapterType = xmlChapter.find('ChapterType').text
+                yChapterType = xmlChapter['ChapterType']
                 if yChapterType == '2':
-                    self.novel.chapters[chId].chType = 2
+                    chapter.chType = 2
                 elif yChapterType == '1':
-                    self.novel.chapters[chId].chType = 1
+                    chapter.chType = 1
                 elif yUnused:
-                    self.novel.chapters[chId].chType = 3
+                    chapter.chType = 3
             else:
                 # The file may be created with a yWriter version prior to 7.0.7.2
-                if xmlChapter.find('Type') is not None:
-                    yType = xmlChapter.find('Type').text
+                if 'Type' in xmlChapter:
+                    yType = xmlChapter['Type']
                     if yType == '1':
-                        self.novel.chapters[chId].chType = 1
+                        chapter.chType = 1
                     elif yUnused:
-                        self.novel.chapters[chId].chType = 3
+                        chapter.chType = 3
 
-            self.novel.chapters[chId].suppressChapterTitle = False
-            if self.novel.chapters[chId].title is not None:
-                if self.novel.chapters[chId].title.startswith('@'):
-                    self.novel.chapters[chId].suppressChapterTitle = True
+            chapter.suppressChapterTitle = False
+            if chapter.title is not None:
+                if chapter.title.startswith('@'):
+                    chapter.suppressChapterTitle = True
 
             #--- Initialize custom keyword variables.
             for fieldName in self.CHP_KWVAR:
-                self.novel.chapters[chId].kwVar[fieldName] = None
+                chapter.kwVar[fieldName] = None
 
             #--- Read chapter fields.
-            for xmlChapterFields in xmlChapter.findall('Fields'):
-                if xmlChapterFields.find('Field_SuppressChapterTitle') is not None:
-                    if xmlChapterFields.find('Field_SuppressChapterTitle').text == '1':
-                        self.novel.chapters[chId].suppressChapterTitle = True
-                self.novel.chapters[chId].isTrash = False
-                if xmlChapterFields.find('Field_IsTrash') is not None:
-                    if xmlChapterFields.find('Field_IsTrash').text == '1':
-                        self.novel.chapters[chId].isTrash = True
-                self.novel.chapters[chId].suppressChapterBreak = False
-                if xmlChapterFields.find('Field_SuppressChapterBreak') is not None:
-                    if xmlChapterFields.find('Field_SuppressChapterBreak').text == '1':
-                        self.novel.chapters[chId].suppressChapterBreak = True
+            for fields in self._get_fields(record.children.get('Fields', [])):
+                if fields.get('Field_SuppressChapterTitle', None) == '1':
+                    chapter.suppressChapterTitle = True
+                chapter.isTrash = fields.get('Field_IsTrash', None) == '1'
+                chapter.suppressChapterBreak = fields.get('Field_SuppressChapterBreak', None) == '1'
 
                 #--- Read chapter custom fields.
                 for fieldName in self.CHP_KWVAR:
-                    field = xmlChapterFields.find(fieldName)
-                    if field is not None:
-                        self.novel.chapters[chId].kwVar[fieldName] = field.text
+                    if fieldName in fields:
+                        chapter.kwVar[fieldName] = fields[fieldName]
 
             #--- Read chapter's scene list.
-            self.novel.chapters[chId].srtScenes = []
-            if xmlChapter.find('Scenes') is not None:
-                for scn in xmlChapter.find('Scenes').findall('ScID'):
-                    scId = scn.text
-                    if scId in self.novel.scenes:
-                        self.novel.chapters[chId].srtScenes.append(scId)
+            chapter.srtScenes = []
+            for scId in self._get_ids(record, 'Scenes', 'ScID', self.novel.scenes):
+                chapter.srtScenes.append(scId)
+
+    def _analyze_scenes(self, sceneTexts, complete):
+        """Set the scene contents, analyzed by a pool of worker processes.
+        
+        Positional arguments:
+            sceneTexts -- list of (scene ID, scene content) tuples.
+            complete: bool -- True if sceneTexts contains all scenes of the novel.
+        
+        The scene contents are sent to the workers in batches, in order to keep 
+        the interprocess communication overhead low. The results are merged 
+        in the order of the scenes in the file. Word and letter counts are set,
+        the formatted runs are stored in sceneRuns, and if the analysis is
+        complete, the novel's languages are set. 
+        If the worker processes can not be used, analyze the scenes in this process.
+        """
+        batches = []
+        batch = []
+        batchSize = 0
+        for scId, text in sceneTexts:
+            batch.append((scId, text))
+            batchSize += len(text)
+            if batchSize >= BATCH_SIZE:
+                batches.append(batch)
+                batch = []
+                batchSize = 0
+        if batch:
+            batches.append(batch)
+        if len(batches) < 2:
+            results = [analyze_texts([text for __, text in batch]) for batch in batches]
+        else:
+            try:
+                from concurrent.futures import ProcessPoolExecutor
+                # Imported here, because this takes longer than importing the rest of the reader.
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    results = list(executor.map(analyze_texts, [[text for __, text in batch] for batch in batches]))
+            except Exception:
+                # The platform may not support worker processes.
+                results = [analyze_texts([text for __, text in batch]) for batch in batches]
+        languages = []
+        for batch, batchResults in zip(batches, results):
+            for (scId, text), (wordCount, letterCount, sceneLanguages, runs) in zip(batch, batchResults):
+                self.novel.scenes[scId].set_content(text, wordCount, letterCount)
+                self.sceneRuns[scId] = runs
+                for language in sceneLanguages:
+                    if not language in languages:
+                        languages.append(language)
+        if complete:
+            self.novel.languages = languages
+
+    def _get_fields(self, fieldsList):
+        """Return a list of dictionaries with the text of the first field per tag, one per Fields element.
+
+        Positional arguments:
+            fieldsList -- list of the children of each Fields element of a record.
+        """
+        result = []
+        for children in fieldsList:
+            fields = {}
+            for tag, text in children:
+                if not tag in fields:
+                    fields[tag] = text
+            result.append(fields)
+        return result
+
+    def _get_ids(self, record, tag, idTag, validIds):
+        """Return the valid IDs listed in the first child element with a tag.
+
+        Positional arguments:
+            record: Yw7Record -- the record containing the list.
+            tag: str -- tag of the list element, e.g. "Characters".
+            idTag: str -- tag of the ID elements, e.g. "CharID".
+            validIds -- collection of the IDs to be accepted.
+        """
+        lists = record.children.get(tag, None)
+        if not lists:
+            return []
+
+        return [elementId for childTag, elementId in lists[0] if childTag == idTag and elementId in validIds]
+
+    def _get_lazy_source(self, record, tag):
+        """Return the loader of the text referenced by a placeholder element, or None.
+
+        Positional argument:
+            record: Yw7Record -- the record containing the placeholder.
+            tag: str -- SceneContent or Notes.
+        """
+        ref = record.refs.get(tag, None)
+        if ref is None or self._lazySources is None:
+            return None
+
+        return self._lazySources[int(ref)]
 
     def _strip_spaces(self, lines):
         """Local helper method.
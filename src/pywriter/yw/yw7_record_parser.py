@@ -0,0 +1,171 @@
+"""Provide a streaming parser collecting the records of a yWriter 7 project.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from xml.parsers import expat
+
+LIST_TAGS = ('Fields', 'Characters', 'Locations', 'Items', 'Scenes')
+# Tags of child elements whose children are stored even if there are none.
+
+PROJECT = 'PROJECT'
+# Tag of the section that is a record itself.
+
+
+def get_records(root):
+    """Return the records of a yw7 element tree, as Yw7RecordParser collects them from the XML document.
+
+    Positional arguments:
+        root -- root element of the yw7 XML document.
+
+    Return a dict with a list of Yw7Record instances per section (key: section tag).
+    The "ref" attributes are removed from the elements, so the tree is written back without them.
+    """
+    sections = {}
+    for section in root:
+        records = sections.setdefault(section.tag, [])
+        if section.tag == PROJECT:
+            records.append(_get_record(section))
+        else:
+            for element in section:
+                records.append(_get_record(element))
+    return sections
+
+
+def _get_record(element):
+    """Return a Yw7Record with the child elements of an element."""
+    record = Yw7Record()
+    for child in element:
+        tag = child.tag
+        ref = child.get('ref')
+        if ref is not None:
+            # Accessing attrib creates a dictionary for the element, so only do it if needed.
+            del child.attrib['ref']
+            record.refs.setdefault(tag, ref)
+        record.texts.setdefault(tag, child.text or None)
+        if len(child):
+            record.children.setdefault(tag, []).append([(grandchild.tag, grandchild.text or None) for grandchild in child])
+        elif tag in LIST_TAGS:
+            record.children.setdefault(tag, []).append([])
+    return record
+
+
+class Yw7Record:
+    """Child elements of a yw7 XML element such as PROJECT, SCENE, or CHAPTER.
+
+    Public instance variables:
+        texts -- dict: text of the first child element with a tag, or None if empty (key: tag).
+        children -- dict: list of the child elements' children (key: tag of the child element).
+                    The children of each child element are given as a list of (tag, text) tuples.
+        refs -- dict: "ref" attribute of the first child element with a tag having one (key: tag).
+    """
+    __slots__ = ('texts', 'children', 'refs')
+
+    def __init__(self):
+        self.texts = {}
+        self.children = {}
+        self.refs = {}
+
+
+class Yw7RecordParser:
+    """Streaming yw7 XML parser collecting records instead of building an element tree.
+
+    Public methods:
+        feed(data) -- parse a chunk of UTF-8 encoded XML data.
+        close() -- finish parsing and return the records.
+
+    The records are collected by section, e.g. a Yw7Record for each SCENE
+    element of the SCENES element. The PROJECT element itself is a record.
+    Elements nested deeper than the children of a record's child elements are ignored.
+    Like with ElementTree.XMLParser(encoding='utf-8'), the encoding declared
+    in the XML header is overridden.
+    """
+    BUFFER_SIZE = 64 * 1024
+    # Number of characters the expat parser collects before passing them.
+
+    def __init__(self):
+        self._parser = expat.ParserCreate('utf-8')
+        self._parser.buffer_text = True
+        self._parser.buffer_size = self.BUFFER_SIZE
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._chunks = []
+        # Character data of the current element.
+        self._parser.CharacterDataHandler = self._chunks.append
+        self._sections = {}
+        # key: section tag, value: list of Yw7Record instances.
+        self._section = None
+        self._depth = 0
+        self._recordDepth = 0
+        # Element depth of the records in the current section; 0 outside sections.
+        self._record = None
+        self._grandchildren = None
+
+    def feed(self, data):
+        """Parse a chunk of UTF-8 encoded XML data.
+
+        Positional arguments:
+            data: bytes -- next part of the document.
+
+        Raise expat.ExpatError, if the document is not well-formed.
+        """
+        self._parser.Parse(data, False)
+
+    def close(self):
+        """Finish parsing and return the records.
+
+        Return a dict with a list of Yw7Record instances per section (key: section tag).
+        Raise expat.ExpatError, if the document is not well-formed.
+        """
+        self._parser.Parse(b'', True)
+        self._parser = None
+        # Break the reference cycle via the handlers, so the records are freed without garbage collection.
+        return self._sections
+
+    def _start_element(self, tag, attributes):
+        """Begin a record, a record's child element, or a section."""
+        self._chunks.clear()
+        self._depth += 1
+        depth = self._depth - self._recordDepth
+        if not self._recordDepth:
+            if self._depth == 2:
+                self._section = tag
+                self._sections.setdefault(tag, [])
+                if tag == PROJECT:
+                    self._recordDepth = 2
+                    self._record = Yw7Record()
+                else:
+                    self._recordDepth = 3
+        elif depth == 0:
+            self._record = Yw7Record()
+        elif depth == 1:
+            self._grandchildren = None
+            if 'ref' in attributes:
+                self._record.refs.setdefault(tag, attributes['ref'])
+        elif depth == 2:
+            if self._grandchildren is None:
+                self._grandchildren = []
+
+    def _end_element(self, tag):
+        """Store the text of a record's child element, or the completed record."""
+        depth = self._depth - self._recordDepth
+        self._depth -= 1
+        if not self._recordDepth:
+            pass
+        elif depth == 2:
+            self._grandchildren.append((tag, ''.join(self._chunks) or None))
+        elif depth == 1:
+            self._record.texts.setdefault(tag, ''.join(self._chunks) or None)
+            if self._grandchildren is not None:
+                self._record.children.setdefault(tag, []).append(self._grandchildren)
+                self._grandchildren = None
+            elif tag in LIST_TAGS:
+                self._record.children.setdefault(tag, []).append([])
+        elif depth == 0:
+            self._sections[self._section].append(self._record)
+            self._record = None
+        if depth == 0 and self._section == PROJECT or depth < 0:
+            # End of the section.
+            self._recordDepth = 0
+        self._chunks.clear()
@@ -0,0 +1,55 @@
+"""Provide a class for yWriter 7 project import, read with a streaming parser.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.pywriter_globals import *
+from pywriter.model.novel import Novel
+from pywriter.yw.yw7_file import Yw7File
+from pywriter.yw.yw7_record_parser import Yw7RecordParser
+
+
+class Yw7StreamFile(Yw7File):
+    """yWriter 7 project file representation, read without building an element tree.
+
+    Public methods:
+        write() -- write instance variables to the yWriter xml file.
+
+    The XML document is parsed with expat handlers collecting the text of
+    each record's child elements, e.g. the title of a scene, in a dictionary.
+    When the parser has finished, the novel is filled from the records
+    by the methods of Yw7File, which converts its element tree into the same records.
+    Reading takes about as long, but needs less memory, because no Element
+    is created, and the element tree is not kept.
+    """
+
+    def write(self):
+        """Write instance variables to the yWriter xml file.
+
+        The element tree required for writing is read from the file first,
+        using a Yw7File instance, so the novel is not changed.
+        Extends the superclass method.
+        """
+        if self.tree is None:
+            prjFile = Yw7File(self.filePath)
+            prjFile.novel = Novel()
+            prjFile.read()
+            self.tree = prjFile.tree
+        super().write()
+
+    def _get_parser(self):
+        """Return a parser for the UTF-8 encoded XML data, with feed() and close() methods.
+
+        close() returns a dict with a list of records per section.
+        Overrides the superclass method.
+        """
+        return Yw7RecordParser()
+
+    def _read_tree(self, records):
+        """Get the instance variables from the records of the parsed file.
+
+        Overrides the superclass method.
+        """
+        self.tree = None
+        self._read_records(records)
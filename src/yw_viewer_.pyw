@@ -11,15 +11,27 @@ import os
 import sys
 import argparse
 from pathlib import Path
+from pywriter.pywriter_globals import *
 from pywriter.config.configuration import Configuration
+from pywriter.diag.profiler import PROFILER
+from pywriter.model.novel import Novel
+from pywriter.model.concordance import Concordance
+from pywriter.model.phrase_repetitions import find_repeated_phrases
+from pywriter.yw.yw7_stream_file import Yw7StreamFile
 from ywviewerlib.yw7_viewer_tk import Yw7ViewerTk
 
 APPNAME = 'yw-viewer'
 SETTINGS = dict(
     yw_last_open='',
     root_geometry='',
+    profile_dump='',
+    workers='1',
+)
+OPTIONS = dict(
+    profiling=False,
+    memory_profiling=False,
+    paged_reading=False,
 )
-OPTIONS = {}
 
 
 def run(sourcePath='', installDir='.'):
@@ -36,10 +48,23 @@ def run(sourcePath='', installDir='.'):
     if not sourcePath or not os.path.isfile(sourcePath):
         sourcePath = kwargs['yw_last_open']
 
+    #--- Set up profiling.
+    if kwargs['profiling']:
+        PROFILER.enable()
+    if kwargs['memory_profiling']:
+        PROFILER.enable_memory()
+    if kwargs['profile_dump']:
+        PROFILER.start_session()
+
     #--- Instantiate the viewer object.
     viewer = Yw7ViewerTk('yw-viewer @release', **kwargs)
+
+    #--- Show the main window before reading the project.
+    viewer.root.update()
     viewer.open_project(sourcePath)
     viewer.start()
+    if kwargs['profile_dump']:
+        PROFILER.stop_session(kwargs['profile_dump'])
 
     #--- Save project specific configuration
     for keyword in viewer.kwargs:
@@ -50,6 +75,60 @@ def run(sourcePath='', installDir='.'):
     configuration.write(iniFile)
 
 
+def report_repetitions(sourcePath, length):
+    """Print the repeated phrases of a project without starting the GUI.
+    
+    Positional arguments:
+        sourcePath: str -- path of the yWriter project file.
+        length: int -- minimum number of words of a phrase.
+        
+    Return True on success, otherwise return False.
+    """
+    if sys.stdout is None:
+        # Started with pythonw, e.g. by double-clicking, so there is no console to print to.
+        from tkinter import messagebox
+        messagebox.showerror(APPNAME, f'{_("The repeated phrases are printed to the console")}. '
+                             f'{_("Please run")}: python yw-viewer.pyw "{norm_path(sourcePath)}" --repetitions {length}')
+        return False
+
+    prjFile = Yw7StreamFile(sourcePath)
+    prjFile.novel = Novel()
+    try:
+        prjFile.read()
+    except Error as ex:
+        print(str(ex), file=sys.stderr)
+        return False
+
+    novel = prjFile.novel
+    readingOrder = novel.get_reading_order()
+    concordance = Concordance(novel)
+    repetitions = find_repeated_phrases(concordance, length)
+    for words, positions in repetitions:
+        print(f'{words} {_("words")}, {len(positions)} {_("times")}: '
+              f'"{concordance.get_text(positions[0], positions[0] + words)}"')
+        for position in positions:
+            scId, wordPosition = concordance.get_location(position)
+            chId = readingOrder.get_chapter_id(readingOrder.positions[scId])
+            print(f'    {_("chapter")} {chId}, {_("scene")} {scId}, {_("word")} {wordPosition + 1}')
+    print(f'{len(repetitions)} {_("repeated phrases of at least")} {length} {_("words")}.')
+    return True
+
+
+def positive_number(text):
+    """Return the number given by a command line argument, if greater than zero.
+    
+    Raise argparse.ArgumentTypeError otherwise.
+    """
+    try:
+        number = int(text)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{text!r} is not a number greater than zero')
+
+    return number
+
+
 if __name__ == '__main__':
 
     try:
@@ -67,5 +146,12 @@ if __name__ == '__main__':
         parser.add_argument('sourcePath',
                             metavar='Sourcefile',
                             help='The path of the yWriter project file.')
+        parser.add_argument('--repetitions',
+                            type=positive_number,
+                            metavar='WORDS',
+                            help='List the phrases of at least WORDS words occurring more than once, without starting the GUI.')
         args = parser.parse_args()
+        if args.repetitions is not None:
+            sys.exit(0 if report_repetitions(args.sourcePath, args.repetitions) else 1)
+
         run(args.sourcePath, installDir)
@@ -4,6 +4,8 @@ Modules:
 
 yw7_file_view -- Provide a class for yWriter file viewing.
 file_viewer -- provide a tkinter text box class for file viewing.
+file_watcher -- provide a class for watching a yWriter project file.
+tree_viewer -- provide a tkinter tree view class for yWriter project navigation.
 
 Copyright (c) 2022 Peter Triesberger
 For further information see https://github.com/peter88213/yw-viewer
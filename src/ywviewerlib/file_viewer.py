@@ -4,9 +4,16 @@ Copyright (c) 2022 Peter Triesberger
 For further information see https://github.com/peter88213/yw-viewer
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
-import re
 import tkinter as tk
+from bisect import bisect_right
+from collections import OrderedDict
 from pywriter.pywriter_globals import *
+from pywriter.diag.profiler import PROFILER
+from pywriter.model.markup import tokenize
+from pywriter.model.mention_scanner import MentionScanner
+from pywriter.model.concordance import Concordance
+from pywriter.model.phrase_repetitions import find_repeated_phrases
+from pywriter.model.prose_statistics import ProseStatistics
 from pywriter.ui.rich_text_tk import RichTextTk
 
 
@@ -15,7 +22,22 @@ class FileViewer:
     
     Public methods:
         view_text(taggedText) -- load tagged text into the text box.
+        view_contents() -- show the scene contents, or the current chapter in paged mode.
+        view_mentions() -- show the scenes where the tagged characters differ from the mentioned ones.
+        view_frequencies() -- show the most frequent words, and the most overused words per chapter.
+        view_concordance(word) -- show the occurrences of a word with their context.
+        view_repetitions() -- show the phrases occurring more than once.
+        view_statistics() -- show sentence length, dialogue ratio, and reading ease per scene.
+        get_prose_statistics() -- return the prose statistics of the novel.
+        set_paged(paged) -- switch between showing all scene contents and showing one chapter at a time.
+        turn_page(step) -- show the scene contents of another chapter in paged mode.
+        see_index(index) -- show the scene contents, scrolled to index.
+        get_word_offset() -- return the number of words above the scene contents shown.
+        see_word_offset(wordOffset) -- show the scene contents, scrolled to a word offset.
         build_views() -- create tagged text for quick viewing.
+        build_views_stepwise() -- create tagged text for quick viewing, yielding after each chapter.
+        get_status() -- return a string containing the total numbers of chapters, scenes and words.
+        rebuild_views() -- recreate tagged text, keeping the current view and scroll position.
         reset_view() -- clear the text box.
 
     Public instance variables:
@@ -25,9 +47,62 @@ class FileViewer:
         sceneTitles -- list of tuples: Text containing chapter titles and listed scene titles.
         sceneDescriptions -- list of tuples: Text containing chapter titles and scene descriptions.
         sceneContents -- list of tuples: Text containing chapter titles and scene contents.
+        sceneMentions -- list of tuples: Text listing the scenes with untagged or unmentioned characters.
+        wordFrequencies -- list of tuples: Text listing the most frequent and the overused words.
+        concordanceLines -- list of tuples: Text listing the occurrences of a word in context.
+        repeatedPhrases -- list of tuples: Text listing the repeated phrases with their locations.
+        proseStatistics -- list of tuples: Text listing the prose statistics per scene.
+        chapterIndices -- dict: Text box index of each chapter in the scene contents (key: chapter ID).
+        sceneIndices -- dict: Text box index of each scene in the scene contents (key: scene ID).
+        paged -- bool: if True, the scene contents are shown one chapter at a time.
 
     Show titles, descriptions, and contents in a text box.
+    Each view is rendered in a text box of its own, created on first display.
+    Switching to a view shown before only exchanges the text boxes,
+    so the view keeps its scroll position.
+    In paged mode, each chapter's scene contents are shown in a text box of their own.
+    The next and the previous chapter are rendered in advance, when the GUI is idle.
     """
+    HIDDEN_TEXT_LIMIT = 10000000
+    # Number of characters kept in hidden text boxes.
+    # If exceeded, the least recently shown text boxes are destroyed.
+
+    _VIEWS = (
+        'prjDescription',
+        'chapterTitles',
+        'chapterDescriptions',
+        'sceneTitles',
+        'sceneDescriptions',
+        'sceneContents',
+        'sceneMentions',
+        'wordFrequencies',
+        'concordanceLines',
+        'repeatedPhrases',
+        'proseStatistics',
+        )
+    _MARKUP_TAGS = {
+        'i': RichTextTk.ITALIC_TAG,
+        'b': RichTextTk.BOLD_TAG,
+        'c': RichTextTk.CENTER_TAG,
+        'h1': RichTextTk.H1_TAG,
+        'h2': RichTextTk.H2_TAG,
+        'h3': RichTextTk.H3_TAG,
+        }
+    # Text box tags by yWriter markup name.
+    _PAGE_PREFIX = 'page'
+    # Prefix of the text box keys for chapters in paged mode.
+    _FREQUENT_WORDS = 100
+    # Number of words listed by frequency.
+    _OVERUSED_WORDS = 10
+    # Number of overused words listed per chapter.
+    _KWIC_WIDTH = 6
+    # Number of words shown before and after each occurrence in the concordance.
+    _KWIC_LIMIT = 1000
+    # Number of occurrences listed in the concordance.
+    _REPEATED_WORDS = 7
+    # Minimum number of words of a repeated phrase.
+    _REPETITIONS_LIMIT = 500
+    # Number of repeated phrases listed.
 
     def __init__(self, ui):
         """Put a text box to the GUI main window.
@@ -40,60 +115,431 @@ class FileViewer:
         
         Extends the superclass constructor.
         """
+        self._init_state(ui)
+        self.view_text([])
+
+    def _init_state(self, ui):
+        """Initialize the instance variables without creating any widget.
+        
+        Positional arguments:
+            ui -- application providing the novel and the project file.
+        """
         self._ui = ui
-        self._textBox = RichTextTk(self._ui.viewerWindow, height=20, width=60, spacing1=10, spacing2=2, wrap='word', padx=40)
-        self._textBox.pack(expand=True, fill='both')
+        self._textBoxes = OrderedDict()
+        # key: view name, or None for other text, value: RichTextTk instance; the shown text box is the last.
+        self._rendered = {}
+        # key: view name, value: list (tagged text, number of runs inserted, number of characters inserted).
+        self._textBox = None
+        # The shown text box.
+        self.paged = False
+        self._pageIds = []
+        # IDs of the chapters with scene contents, in reading order.
+        self._pageLines = []
+        # First line of each chapter in the scene contents view, ascending.
+        self._pageRuns = []
+        # Tuple (first run, run after the last run) of each chapter in the scene contents.
+        self._pages = {}
+        # key: chapter ID, value: tagged text of a chapter's scene contents.
+        self._currentPage = 0
+        # Index of the chapter last shown in paged mode.
+        self._prefetchPending = False
         self.prjDescription = []
         self.chapterTitles = []
         self.chapterDescriptions = []
         self.sceneTitles = []
         self.sceneDescriptions = []
         self.sceneContents = []
+        self.sceneMentions = []
+        self._mentionsNovel = None
+        # Novel instance the scene mentions were built from.
+        self.wordFrequencies = []
+        self.concordanceLines = []
+        self._concordance = None
+        # Concordance instance of the novel, built on demand.
+        self._concordanceNovel = None
+        # Novel instance the concordance was built from.
+        self._concordanceWord = None
+        # Word the concordance lines were built for.
+        self.repeatedPhrases = []
+        self.proseStatistics = []
+        self._statistics = None
+        # ProseStatistics instance of the novel, built on demand.
+        self._statisticsNovel = None
+        # Novel instance the prose statistics were built from.
+        self.chapterIndices = {}
+        self.sceneIndices = {}
+        self._shownText = None
+        self._shownView = None
+        self._chapterCount = 0
+        self._sceneTexts = {}
+        # key: scene ID, value: tuple (Scene instance, list of formatted scene content runs, number of newlines).
+        self._sceneLines = []
+        # First line of each scene in the scene contents view, ascending.
+        self._lineSceneIds = []
+        # Scene ID for each entry of _sceneLines.
+        self._endLine = 1
+        # Line after the last scene in the scene contents view.
 
     def view_text(self, taggedText):
         """Load tagged text into the text box.
         
         Positional arguments:
-            taggedText -- list of (text, formatting tag) tuples. 
+            taggedText -- list of (text, formatting tags) tuples. 
         
-        Disable text editing.
+        If the text is one of the views, and it was loaded before, show its text box
+        as it was left, inserting only the runs appended since.
+        Otherwise, insert the whole text with a single call, and disable text editing.
         """
-        self._textBox['state'] = 'normal'
-        self._textBox.delete('1.0', tk.END)
-        for text, tag in taggedText:
-            self._textBox.insert(tk.END, text, tag)
-        self._textBox['state'] = 'disabled'
+        viewName = None
+        for name in self._VIEWS:
+            if getattr(self, name) is taggedText:
+                viewName = name
+                break
+        self._show_text(viewName, taggedText)
+
+    def view_contents(self):
+        """Show the scene contents, or the current chapter in paged mode."""
+        if self.paged and self._pageIds:
+            self._show_page(min(self._currentPage, len(self._pageIds) - 1))
+        else:
+            self.view_text(self.sceneContents)
+
+    def view_mentions(self):
+        """Show the scenes where the tagged characters differ from the mentioned ones.
+        
+        The scene contents are searched for the characters' names when shown first after reading.
+        """
+        if self._mentionsNovel is not self._ui.novel:
+            with PROFILER.phase('scan mentions'):
+                self._build_mentions()
+        self.view_text(self.sceneMentions)
+
+    def _build_mentions(self):
+        """Create tagged text listing the scenes with untagged or unmentioned characters."""
+        novel = self._ui.novel
+        matrix = MentionScanner(novel).scan_novel(novel)
+        readingOrder = novel.get_reading_order()
+        sceneMentions = []
+        for chId, (start, stop) in readingOrder.chapterRanges.items():
+            chapter = novel.chapters[chId]
+            if chapter.chType != 0:
+                continue
+
+            chapterHeading = (f'{chapter.title or ""}\n', RichTextTk.H2_TAG)
+            for scId in readingOrder.sceneIds[start:stop]:
+                scene = novel.scenes[scId]
+                if scene.scType != 0 or not scene.sceneContent:
+                    continue
+
+                mentions = matrix.get(scId, {})
+                tagged = scene.characters or []
+                unmentioned = [crId for crId in tagged if not ('characters', crId) in mentions]
+                untagged = [crId for crId in novel.srtCharacters
+                            if ('characters', crId) in mentions and not crId in tagged]
+                if not (unmentioned or untagged):
+                    continue
+
+                if chapterHeading is not None:
+                    sceneMentions.append(chapterHeading)
+                    chapterHeading = None
+                sceneMentions.append((f'{scene.title or scId}\n', RichTextTk.BOLD_TAG))
+                if unmentioned:
+                    names = ', '.join(novel.characters[crId].title or crId for crId in unmentioned)
+                    sceneMentions.append((f'{_("Tagged, but not mentioned")}: {names}\n', ''))
+                if untagged:
+                    names = ', '.join(f'{novel.characters[crId].title or crId} ({mentions[("characters", crId)]})'
+                                      for crId in untagged)
+                    sceneMentions.append((f'{_("Mentioned, but not tagged")}: {names}\n', ''))
+        if not sceneMentions:
+            sceneMentions.append((f'({_("Tagged and mentioned characters match in all scenes")})', RichTextTk.ITALIC_TAG))
+        self._rendered.pop('sceneMentions', None)
+        # Update the list in place, so a shown view is still recognized by rebuild_views().
+        self.sceneMentions[:] = sceneMentions
+        self._mentionsNovel = novel
+
+    def view_frequencies(self):
+        """Show the most frequent words, and the most overused words per chapter."""
+        concordance = self._get_concordance()
+        wordFrequencies = [(f'{_("Most frequent words")}\n', RichTextTk.H2_TAG)]
+        totalWords = len(concordance.tokens)
+        lines = [f'{term}: {count} ({100 * count / totalWords:.2f}%)\n'
+                 for term, count in concordance.get_frequencies(self._FREQUENT_WORDS)]
+        if lines:
+            wordFrequencies.append((''.join(lines), ''))
+        else:
+            wordFrequencies.append((f'({_("No scene contents available")})\n', RichTextTk.ITALIC_TAG))
+        overused = []
+        for chId in concordance.chapterRanges:
+            terms = concordance.get_overused_terms(chId, self._OVERUSED_WORDS)
+            if terms:
+                title = self._ui.novel.chapters[chId].title or chId
+                overused.append((f'{title}\n', RichTextTk.BOLD_TAG))
+                overused.append((f'{", ".join(f"{term} ({count})" for term, count in terms)}\n', ''))
+        if overused:
+            wordFrequencies.append((f'{_("Overused words by chapter")}\n', RichTextTk.H2_TAG))
+            wordFrequencies.extend(overused)
+        self._rendered.pop('wordFrequencies', None)
+        self.wordFrequencies[:] = wordFrequencies
+        self.view_text(self.wordFrequencies)
+
+    def view_concordance(self, word):
+        """Show the occurrences of a word with their context.
+        
+        Positional arguments:
+            word: str -- word to look up, regardless of case and punctuation.
+        """
+        concordance = self._get_concordance()
+        count = concordance.get_count(word)
+        concordanceLines = [(f'{word}: {count} {_("occurrences")}\n', RichTextTk.H2_TAG)]
+        novel = self._ui.novel
+        readingOrder = novel.get_reading_order()
+        chId = None
+        for scId, __, before, keyword, after in concordance.get_kwic(word, self._KWIC_WIDTH, self._KWIC_LIMIT):
+            sceneChapterId = readingOrder.get_chapter_id(readingOrder.positions[scId])
+            if sceneChapterId != chId:
+                chId = sceneChapterId
+                concordanceLines.append((f'{novel.chapters[chId].title or chId}\n', RichTextTk.BOLD_TAG))
+            concordanceLines.append((f'... {before} ', ''))
+            concordanceLines.append((keyword, RichTextTk.BOLD_TAG))
+            concordanceLines.append((f' {after} ...\n', ''))
+        if count > self._KWIC_LIMIT:
+            concordanceLines.append((f'({count - self._KWIC_LIMIT} {_("more occurrences")})', RichTextTk.ITALIC_TAG))
+        self._concordanceWord = word
+        self._rendered.pop('concordanceLines', None)
+        self.concordanceLines[:] = concordanceLines
+        self.view_text(self.concordanceLines)
+
+    def view_repetitions(self):
+        """Show the phrases occurring more than once, the longest first."""
+        concordance = self._get_concordance()
+        with PROFILER.phase('find repeated phrases'):
+            repetitions = find_repeated_phrases(concordance, self._REPEATED_WORDS)
+        repeatedPhrases = [(f'{_("Repeated phrases")}: {len(repetitions)}\n', RichTextTk.H2_TAG)]
+        novel = self._ui.novel
+        readingOrder = novel.get_reading_order()
+        for words, positions in repetitions[:self._REPETITIONS_LIMIT]:
+            repeatedPhrases.append((f'{concordance.get_text(positions[0], positions[0] + words)}\n', RichTextTk.BOLD_TAG))
+            lines = []
+            for position in positions:
+                scId, wordPosition = concordance.get_location(position)
+                chId = readingOrder.get_chapter_id(readingOrder.positions[scId])
+                lines.append(f'{novel.chapters[chId].title or chId} - {novel.scenes[scId].title or scId}, '
+                             f'{_("word")} {wordPosition + 1}\n')
+            repeatedPhrases.append((''.join(lines), ''))
+        if not repetitions:
+            repeatedPhrases.append((f'({_("No repeated phrases found")})', RichTextTk.ITALIC_TAG))
+        elif len(repetitions) > self._REPETITIONS_LIMIT:
+            repeatedPhrases.append((f'({len(repetitions) - self._REPETITIONS_LIMIT} {_("more repeated phrases")})',
+                                    RichTextTk.ITALIC_TAG))
+        self._rendered.pop('repeatedPhrases', None)
+        self.repeatedPhrases[:] = repeatedPhrases
+        self.view_text(self.repeatedPhrases)
+
+    def view_statistics(self):
+        """Show sentence length, dialogue ratio, and reading ease of the novel and of each scene."""
+        statistics = self.get_prose_statistics()
+        proseStatistics = [(f'{_("Prose statistics")}\n', RichTextTk.H2_TAG)]
+        if not statistics.sceneIds:
+            proseStatistics.append((f'({_("No scene contents available")})', RichTextTk.ITALIC_TAG))
+        else:
+            proseStatistics.append((f'{_("Total")}: {self._format_statistics(statistics.totals)}\n', RichTextTk.BOLD_TAG))
+        novel = self._ui.novel
+        readingOrder = novel.get_reading_order()
+        chId = None
+        lines = []
+        for scId in statistics.sceneIds:
+            sceneChapterId = readingOrder.get_chapter_id(readingOrder.positions[scId])
+            if sceneChapterId != chId:
+                if lines:
+                    proseStatistics.append((''.join(lines), ''))
+                    lines = []
+                chId = sceneChapterId
+                proseStatistics.append((f'{novel.chapters[chId].title or chId}\n', RichTextTk.BOLD_TAG))
+            lines.append(f'{novel.scenes[scId].title or scId}: {self._format_statistics(statistics.scenes[scId])}\n')
+        if lines:
+            proseStatistics.append((''.join(lines), ''))
+        self._rendered.pop('proseStatistics', None)
+        self.proseStatistics[:] = proseStatistics
+        self.view_text(self.proseStatistics)
+
+    def _format_statistics(self, statistics):
+        """Return a line of text with the values of a statistics dictionary."""
+        if statistics['readingEase'] is None:
+            readingEase = '-'
+        else:
+            readingEase = f'{statistics["readingEase"]:.0f}'
+        return (f'{statistics["words"]} {_("words")}, {statistics["sentences"]} {_("sentences")}, '
+                f'{statistics["meanSentenceLength"]:.1f} {_("words per sentence")}, '
+                f'{100 * statistics["dialogueRatio"]:.0f}% {_("dialogue")}, '
+                f'{_("reading ease")} {readingEase}')
+
+    def get_prose_statistics(self):
+        """Return the ProseStatistics instance of the novel, computing it when needed first after reading."""
+        if self._statistics is None or self._statisticsNovel is not self._ui.novel:
+            with PROFILER.phase('compute prose statistics'):
+                self._statistics = ProseStatistics(self._ui.novel)
+            self._statisticsNovel = self._ui.novel
+        return self._statistics
+
+    def _get_concordance(self):
+        """Return the concordance of the novel, building it when needed first after reading."""
+        if self._concordance is None or self._concordanceNovel is not self._ui.novel:
+            with PROFILER.phase('build concordance'):
+                self._concordance = Concordance(self._ui.novel)
+            self._concordanceNovel = self._ui.novel
+        return self._concordance
+
+    def set_paged(self, paged):
+        """Switch between showing all scene contents and showing one chapter at a time.
+        
+        Positional arguments:
+            paged: bool -- if True, show one chapter at a time.
+            
+        If the scene contents are shown, keep the position.
+        """
+        topLine = self._get_top_line()
+        self.paged = paged
+        if topLine is not None:
+            self.see_index(f'{topLine}.0')
+
+    def turn_page(self, step):
+        """Show the scene contents of another chapter in paged mode.
+        
+        Positional arguments:
+            step: int -- number of chapters to go forward, or backward if negative.
+            
+        Return True on success, or False if there is no such chapter.
+        """
+        if not self.paged:
+            return False
+
+        if self._shownView is None or not self._shownView.startswith(self._PAGE_PREFIX):
+            # Start with the chapter shown last.
+            step = 0
+        i = self._currentPage + step
+        if not 0 <= i < len(self._pageIds):
+            return False
+
+        self._show_page(i)
+        self._textBox.yview('1.0')
+        return True
+
+    def _show_page(self, i):
+        """Show the scene contents of the i-th chapter, and prefetch its neighbours."""
+        self._currentPage = i
+        self._show_text(f'{self._PAGE_PREFIX}{self._pageIds[i]}', self._get_page(i))
+        if not self._prefetchPending:
+            self._prefetchPending = True
+            self._ui.root.after_idle(self._prefetch_pages)
+
+    def _get_page(self, i):
+        """Return the tagged text of the i-th chapter's scene contents."""
+        chId = self._pageIds[i]
+        page = self._pages.get(chId, None)
+        if page is None:
+            start, stop = self._pageRuns[i]
+            page = self.sceneContents[start:stop]
+            self._pages[chId] = page
+        return page
+
+    def _prefetch_pages(self):
+        """Render the chapters before and after the current one in hidden text boxes."""
+        self._prefetchPending = False
+        if not self.paged:
+            return
+
+        for i in (self._currentPage + 1, self._currentPage - 1):
+            if 0 <= i < len(self._pageIds):
+                self._render(f'{self._PAGE_PREFIX}{self._pageIds[i]}', self._get_page(i))
+                PROFILER.count('pages prefetched')
+        self._limit_hidden_text()
+
+    def _show_text(self, viewName, taggedText):
+        """Show the text box of a view, rendering the tagged text if necessary."""
+        textBox = self._render(viewName, taggedText)
+        self._textBoxes.move_to_end(viewName)
+        if textBox is not self._textBox:
+            if self._textBox is not None:
+                self._textBox.pack_forget()
+            textBox.pack(expand=True, fill='both')
+            self._textBox = textBox
+        self._shownText = taggedText
+        self._shownView = viewName
+        self._show_appended()
+        self._limit_hidden_text()
+
+    def _render(self, viewName, taggedText):
+        """Return the text box of a view, created and filled with the tagged text if necessary."""
+        textBox = self._textBoxes.get(viewName, None)
+        if textBox is None:
+            textBox = RichTextTk(self._ui.viewerWindow, height=20, width=60, spacing1=10, spacing2=2, wrap='word', padx=40)
+            textBox['yscrollcommand'] = lambda first, last: self._on_scroll(textBox, first, last)
+            self._textBoxes[viewName] = textBox
+        rendered = self._rendered.get(viewName, None)
+        if viewName is None or rendered is None or rendered[0] is not taggedText:
+            textBox['state'] = 'normal'
+            textBox.delete('1.0', tk.END)
+            textBox.insert_runs(tk.END, taggedText)
+            textBox['state'] = 'disabled'
+            self._rendered[viewName] = [taggedText, len(taggedText), sum(len(text) for text, __ in taggedText)]
+        return textBox
 
     def build_views(self):
         """Create tagged text for quick viewing.
          
         Return a string containing the total numbers of chapters, scenes and words.
         """
+        for __ in self.build_views_stepwise():
+            pass
+        return self.get_status()
+
+    def build_views_stepwise(self):
+        """Create tagged text for quick viewing, yielding after each chapter.
 
-        def convert_from_yw(text):
-            """Remove yw7 markup from text."""
-            return re.sub(r'\[\/*[i|b|h|c|r|s|u]\d*\]', '', text)
+        The scene contents and their indices grow chapter by chapter.
+        If the scene contents are shown, each chapter is appended to the text box.
+        The other views are updated when the last chapter is processed.
+        """
 
         # Get project description.
-        self.prjDescription = []
+        prjDescription = []
         if self._ui.novel.desc:
-            self.prjDescription.append((self._ui.novel.desc, ''))
+            prjDescription.append((self._ui.novel.desc, ''))
         else:
-            self.prjDescription.append((f'({_("No project description available")})', 'italic'))
-        self.chapterTitles = []
-        self.chapterDescriptions = []
-        self.sceneTitles = []
-        self.sceneDescriptions = []
+            prjDescription.append((f'({_("No project description available")})', 'italic'))
+        chapterTitles = []
+        chapterDescriptions = []
+        sceneTitles = []
+        sceneDescriptions = []
         self.sceneContents = []
+        self.chapterIndices = {}
+        self.sceneIndices = {}
+        self._sceneLines = []
+        self._lineSceneIds = []
+        self._endLine = 1
+        self._pageIds = []
+        self._pageLines = []
+        self._pageRuns = []
+        self._pages = {}
+        for viewName in list(self._rendered):
+            if viewName is not None and viewName.startswith(self._PAGE_PREFIX):
+                self._rendered.pop(viewName)
+        sceneTexts = {}
+        line = 1
+        # Current line number in the scene contents view.
         chapterCount = 0
-        sceneCount = 0
-        wordCount = 0
-        for chId in self._ui.novel.srtChapters:
-            if self._ui.novel.chapters[chId].chType != 0:
+        novel = self._ui.novel
+        readingOrder = novel.get_reading_order()
+        sceneRuns = self._ui.prjFile.sceneRuns
+        self._ui.prjFile.sceneRuns = {}
+        # The runs are discarded when formatted, so the manuscript is not kept twice.
+        for chId, (start, stop) in readingOrder.chapterRanges.items():
+            chapter = novel.chapters[chId]
+            if chapter.chType != 0:
                 continue
 
             chapterCount += 1
-            if self._ui.novel.chapters[chId].chLevel == 0:
+            if chapter.chLevel == 0:
                 headingTag = RichTextTk.H2_TAG
                 listTag = ''
             else:
@@ -101,52 +547,266 @@ class FileViewer:
                 listTag = RichTextTk.BOLD_TAG
 
             # Get chapter titles.
-            if self._ui.novel.chapters[chId].title:
-                self.chapterTitles.append((f'{self._ui.novel.chapters[chId].title}\n', listTag))
-                sceneHeading = (f'{self._ui.novel.chapters[chId].title}\n', headingTag)
-                self.sceneTitles.append(sceneHeading)
+            if chapter.title:
+                chapterTitles.append((f'{chapter.title}\n', listTag))
+                sceneHeading = (f'{chapter.title}\n', headingTag)
+                sceneTitles.append(sceneHeading)
 
             # Get chapter descriptions.
-            if self._ui.novel.chapters[chId].desc:
-                self.chapterDescriptions.append((f'{self._ui.novel.chapters[chId].title}\n', headingTag))
-                self.chapterDescriptions.append((f'{self._ui.novel.chapters[chId].desc}\n', ''))
+            if chapter.desc:
+                chapterDescriptions.append((f'{chapter.title}\n', headingTag))
+                chapterDescriptions.append((f'{chapter.desc}\n', ''))
 
-            for scId in self._ui.novel.chapters[chId].srtScenes:
-                if self._ui.novel.scenes[scId].scType == 0:
-                    sceneCount += 1
+            firstRun = len(self.sceneContents)
+            firstLine = line
+            for scId in readingOrder.sceneIds[start:stop]:
+                scene = novel.scenes[scId]
+                if scene.scType == 0:
 
                     # Get scene titles.
-                    if self._ui.novel.scenes[scId].title:
-                        self.sceneTitles.append((f'{self._ui.novel.scenes[scId].title}\n', ''))
+                    if scene.title:
+                        sceneTitles.append((f'{scene.title}\n', ''))
 
                     # Get scene descriptions.
-                    if self._ui.novel.scenes[scId].desc:
-                        self.sceneDescriptions.append(sceneHeading)
-                        self.sceneDescriptions.append((f'{self._ui.novel.scenes[scId].desc}\n', ''))
+                    if scene.desc:
+                        sceneDescriptions.append(sceneHeading)
+                        sceneDescriptions.append((f'{scene.desc}\n', ''))
 
                     # Get scene contents.
-                    if self._ui.novel.scenes[scId].sceneContent:
+                    if scene.sceneContent:
+                        if not chId in self.chapterIndices:
+                            self.chapterIndices[chId] = f'{line}.0'
+                        self.sceneIndices[scId] = f'{line}.0'
+                        self._sceneLines.append(line)
+                        self._lineSceneIds.append(scId)
                         self.sceneContents.append(sceneHeading)
-                        self.sceneContents.append((convert_from_yw(f'{self._ui.novel.scenes[scId].sceneContent}\n'), ''))
+                        line += sceneHeading[0].count('\n')
+                        cached = self._sceneTexts.get(scId, None)
+                        if cached is None or cached[0] is not scene:
+                            # The scene is new or was changed since the views were built.
+                            if scId in sceneRuns:
+                                # The scene content was analyzed by a worker process.
+                                runs = self._map_runs(sceneRuns.pop(scId))
+                            else:
+                                runs = list(tokenize(scene.sceneContent, self._MARKUP_TAGS))
+                            cached = (scene, runs, sum(text.count('\n') for text, __ in runs))
+                            PROFILER.count('scenes formatted')
+                        sceneTexts[scId] = cached
+                        self.sceneContents.extend(cached[1])
+                        self.sceneContents.append(('\n', ''))
+                        line += cached[2] + 1
                     sceneHeading = ('* * *\n', RichTextTk.CENTER_TAG)
+            if chId in self.chapterIndices:
+                self._pageIds.append(chId)
+                self._pageLines.append(firstLine)
+                self._pageRuns.append((firstRun, len(self.sceneContents)))
+            self._endLine = line
+            self._show_appended()
+            yield
 
-                    # Get scene word count.
-                    if self._ui.novel.scenes[scId].wordCount:
-                        wordCount += self._ui.novel.scenes[scId].wordCount
-        if not self.chapterTitles:
-            self.chapterTitles.append((f'{_("No chapter titles available")})', RichTextTk.ITALIC_TAG))
-        if not self.chapterDescriptions:
-            self.chapterDescriptions.append((f'({_("No chapter descriptions available")})', RichTextTk.ITALIC_TAG))
-        if not self.sceneTitles:
-            self.sceneTitles.append((f'{_("No scene titles available")})', RichTextTk.ITALIC_TAG))
-        if not self.sceneDescriptions:
-            self.sceneDescriptions.append((f'({_("No scene descriptions available")})', RichTextTk.ITALIC_TAG))
+        self._chapterCount = chapterCount
+        self._sceneTexts = sceneTexts
+        if not chapterTitles:
+            chapterTitles.append((f'{_("No chapter titles available")})', RichTextTk.ITALIC_TAG))
+        if not chapterDescriptions:
+            chapterDescriptions.append((f'({_("No chapter descriptions available")})', RichTextTk.ITALIC_TAG))
+        if not sceneTitles:
+            sceneTitles.append((f'{_("No scene titles available")})', RichTextTk.ITALIC_TAG))
+        if not sceneDescriptions:
+            sceneDescriptions.append((f'({_("No scene descriptions available")})', RichTextTk.ITALIC_TAG))
         if not self.sceneContents:
             self.sceneContents.append((f'({_("No scene contents available")})', RichTextTk.ITALIC_TAG))
-        return f'{chapterCount} {_("chapters")}, {sceneCount} {_("scenes")}, {wordCount} {_("words")}'
+            self._show_appended()
 
-    def reset_view(self):
-        """Clear the text box."""
+        # The other views are rendered again when shown next time.
+        for viewName in self._VIEWS:
+            if viewName != 'sceneContents':
+                self._rendered.pop(viewName, None)
+        # Update the lists in place, so a shown view is still recognized by rebuild_views().
+        self.prjDescription[:] = prjDescription
+        self.chapterTitles[:] = chapterTitles
+        self.chapterDescriptions[:] = chapterDescriptions
+        self.sceneTitles[:] = sceneTitles
+        self.sceneDescriptions[:] = sceneDescriptions
+
+    def get_status(self):
+        """Return a string containing the total numbers of chapters, scenes and words."""
+        readingOrder = self._ui.novel.get_reading_order()
+        return f'{self._chapterCount} {_("chapters")}, {readingOrder.sceneCount} {_("scenes")}, {readingOrder.totalWords} {_("words")}'
+
+    def _map_runs(self, runs):
+        """Return formatted runs with yWriter markup names replaced by text box tags."""
+        mappedRuns = []
+        for text, tags in runs:
+            mappedTags = tuple(self._MARKUP_TAGS[tag] for tag in tags if tag in self._MARKUP_TAGS)
+            if mappedRuns and mappedRuns[-1][1] == mappedTags:
+                mappedRuns[-1] = (f'{mappedRuns[-1][0]}{text}', mappedTags)
+            else:
+                mappedRuns.append((text, mappedTags))
+        return mappedRuns
+
+    def see_index(self, index):
+        """Show the scene contents, scrolled to index.
+        
+        Positional arguments:
+            index: str -- text box index, e.g. taken from chapterIndices or sceneIndices.
+        """
+        if self.paged and self._pageIds:
+            line = int(index.split('.')[0])
+            i = max(bisect_right(self._pageLines, line) - 1, 0)
+            if self._shownView != f'{self._PAGE_PREFIX}{self._pageIds[i]}':
+                self._show_page(i)
+            self._textBox.yview(f'{line - self._pageLines[i] + 1}.0')
+            return
+
+        if self._shownText is not self.sceneContents:
+            self.view_text(self.sceneContents)
+        self._textBox.yview(index)
+
+    def get_word_offset(self):
+        """Return the number of words above the scene contents shown.
+        
+        Return None, if another view is shown.
+        The scene at the top of the text box is found by binary search. 
+        Within the scene, the word offset is interpolated by text lines.
+        """
+        topLine = self._get_top_line()
+        if topLine is None or not self._sceneLines:
+            return None
+
+        i = bisect_right(self._sceneLines, topLine) - 1
+        if i < 0:
+            return 0
+
+        scId = self._lineSceneIds[i]
+        readingOrder = self._ui.novel.get_reading_order()
+        wordOffset = readingOrder.wordOffsets[readingOrder.positions[scId]]
+        start, stop = self._get_scene_lines(i)
+        wordCount = self._ui.novel.scenes[scId].wordCount or 0
+        return wordOffset + min(wordCount, wordCount * (topLine - start) // (stop - start))
+
+    def see_word_offset(self, wordOffset):
+        """Show the scene contents, scrolled to a word offset.
+        
+        Positional arguments:
+            wordOffset: int -- number of words above the position to be shown.
+            
+        Within the scene, the text line is interpolated by the scene's word count.
+        Return True on success, or False if there is no scene at the word offset.
+        """
+        readingOrder = self._ui.novel.get_reading_order()
+        scId = readingOrder.get_scene_at_word(wordOffset)
+        if scId is None or not scId in self.sceneIndices:
+            return False
+
+        i = bisect_right(self._sceneLines, int(self.sceneIndices[scId].split('.')[0])) - 1
+        start, stop = self._get_scene_lines(i)
+        wordCount = self._ui.novel.scenes[scId].wordCount
+        wordsBefore = wordOffset - readingOrder.wordOffsets[readingOrder.positions[scId]]
+        self.see_index(f'{start + (stop - start) * wordsBefore // wordCount}.0')
+        return True
+
+    def _get_top_line(self):
+        """Return the scene contents line at the top of the text box, or None if another view is shown."""
+        if self._shownText is self.sceneContents:
+            return int(self._textBox.index('@0,0').split('.')[0])
+
+        if self._shownView is not None and self._shownView.startswith(self._PAGE_PREFIX):
+            firstLine = self._pageLines[self._currentPage]
+            return int(self._textBox.index('@0,0').split('.')[0]) + firstLine - 1
+
+        return None
+
+    def _get_scene_lines(self, i):
+        """Return the first line and the line after the last line of the i-th scene in the scene contents view."""
+        if i + 1 < len(self._sceneLines):
+            return self._sceneLines[i], self._sceneLines[i + 1]
+
+        return self._sceneLines[i], self._endLine
+
+    def _show_appended(self):
+        """Insert the runs appended to the shown text since it was inserted into the text box."""
+        rendered = self._rendered.get(self._shownView, None)
+        if rendered is None or rendered[0] is not self._shownText:
+            return
+
+        taggedText, runCount = rendered[:2]
+        if len(taggedText) == runCount:
+            return
+
+        runs = taggedText[runCount:]
         self._textBox['state'] = 'normal'
-        self._textBox.delete('1.0', tk.END)
+        self._textBox.insert_runs(tk.END, runs)
         self._textBox['state'] = 'disabled'
+        rendered[1] = len(taggedText)
+        rendered[2] += sum(len(text) for text, __ in runs)
+
+    def _limit_hidden_text(self):
+        """Destroy the least recently shown text boxes exceeding HIDDEN_TEXT_LIMIT."""
+        hiddenViews = [viewName for viewName in self._textBoxes if viewName != self._shownView]
+        hiddenText = sum(self._rendered[viewName][2] for viewName in hiddenViews if viewName in self._rendered)
+        for viewName in hiddenViews:
+            if hiddenText <= self.HIDDEN_TEXT_LIMIT:
+                break
+
+            rendered = self._rendered.pop(viewName, None)
+            if rendered is not None:
+                hiddenText -= rendered[2]
+            self._textBoxes.pop(viewName).frame.destroy()
+
+    def _on_scroll(self, textBox, first, last):
+        """Update the scroll bar and the reading progress display."""
+        textBox.vbar.set(first, last)
+        if textBox is self._textBox:
+            self._ui.show_progress()
+
+    def rebuild_views(self):
+        """Recreate tagged text, keeping the current view and scroll position.
+        
+        Return a string containing the total numbers of chapters, scenes and words.
+        """
+        viewName = None
+        for name in self._VIEWS:
+            if getattr(self, name) is self._shownText:
+                viewName = name
+                break
+        topLine = self._get_top_line()
+        topIndex = self._textBox.index('@0,0')
+        status = self.build_views()
+        if topLine is not None:
+            # The scene contents are shown, maybe paged.
+            self.see_index(f'{topLine}.0')
+        elif viewName == 'sceneMentions':
+            self.view_mentions()
+            self._textBox.yview(topIndex)
+        elif viewName == 'wordFrequencies':
+            self.view_frequencies()
+            self._textBox.yview(topIndex)
+        elif viewName == 'concordanceLines':
+            self.view_concordance(self._concordanceWord)
+            self._textBox.yview(topIndex)
+        elif viewName == 'repeatedPhrases':
+            self.view_repetitions()
+            self._textBox.yview(topIndex)
+        elif viewName == 'proseStatistics':
+            self.view_statistics()
+            self._textBox.yview(topIndex)
+        elif viewName is not None:
+            self.view_text(getattr(self, viewName))
+            self._textBox.yview(topIndex)
+        return status
+
+    def reset_view(self):
+        """Destroy all text boxes, and show an empty one."""
+        self._sceneTexts = {}
+        self._mentionsNovel = None
+        self._concordance = None
+        self._concordanceNovel = None
+        self._statistics = None
+        self._statisticsNovel = None
+        for textBox in self._textBoxes.values():
+            textBox.frame.destroy()
+        self._textBoxes.clear()
+        self._rendered.clear()
+        self._textBox = None
+        self.view_text([])
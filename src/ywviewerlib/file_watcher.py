@@ -0,0 +1,198 @@
+"""Provide a class for watching a yWriter project file.
+
+Copyright (c) 2022 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import struct
+import ctypes
+import tkinter as tk
+
+
+class FileWatcher:
+    """Watch a yWriter project file and report changes.
+
+    Public methods:
+        start() -- begin watching the file.
+        stop() -- stop watching the file.
+
+    Public instance variables:
+        filePath -- str: path to the watched file.
+
+    On Linux, the project directory is watched with inotify.
+    On other platforms, or if inotify is not available, the file status is polled.
+    Bursts of write events are collapsed into a single notification.
+    As long as yWriter holds a lock on the project, the notification is deferred.
+    """
+    DEBOUNCE_DELAY = 500
+    # Milliseconds without further events before the change is reported.
+
+    POLL_INTERVAL = 1000
+    # Milliseconds between two file status checks (polling fallback).
+
+    _IN_MODIFY = 0x00000002
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, widget, filePath, onChange, isLocked):
+        """Set up the watcher without starting it.
+
+        Positional arguments:
+            widget -- tk widget providing the event loop.
+            filePath: str -- path of the file to watch.
+            onChange -- callback to be invoked without arguments when the file has changed.
+            isLocked -- callable returning True while the file is locked by yWriter.
+        """
+        self.filePath = filePath
+        self._widget = widget
+        self._onChange = onChange
+        self._isLocked = isLocked
+        self._fileName = os.path.basename(filePath)
+        self._lockName = f'{self._fileName}.lock'
+        self._inotifyFd = None
+        self._pollJob = None
+        self._debounceJob = None
+        self._pending = False
+        self._signature = None
+        self._pollSignature = None
+
+    def start(self):
+        """Begin watching the file.
+
+        Use inotify, if available. Otherwise, fall back to polling.
+        """
+        self.stop()
+        self._signature = self._get_signature()
+        if not self._start_inotify():
+            self._pollSignature = (self._signature, self._isLocked())
+            self._pollJob = self._widget.after(self.POLL_INTERVAL, self._poll)
+
+    def stop(self):
+        """Stop watching the file and discard pending notifications."""
+        if self._debounceJob is not None:
+            self._widget.after_cancel(self._debounceJob)
+            self._debounceJob = None
+        if self._pollJob is not None:
+            self._widget.after_cancel(self._pollJob)
+            self._pollJob = None
+        if self._inotifyFd is not None:
+            try:
+                self._widget.tk.deletefilehandler(self._inotifyFd)
+            except:
+                pass
+            os.close(self._inotifyFd)
+            self._inotifyFd = None
+        self._pending = False
+
+    def _debounce(self):
+        """(Re)start the quiet period after an event."""
+        if self._debounceJob is not None:
+            self._widget.after_cancel(self._debounceJob)
+        self._debounceJob = self._widget.after(self.DEBOUNCE_DELAY, self._notify)
+
+    def _get_signature(self):
+        """Return modification time and size of the file, or None if the file is missing."""
+        try:
+            status = os.stat(self.filePath)
+        except OSError:
+            return None
+
+        return status.st_mtime_ns, status.st_size
+
+    def _notify(self):
+        """Invoke the callback, if the file has changed and is not locked."""
+        self._debounceJob = None
+        if not self._pending:
+            return
+
+        if self._isLocked():
+            # Wait for the lock to be removed; this triggers another event.
+            return
+
+        signature = self._get_signature()
+        if signature is None:
+            # The file is being replaced; wait for it to reappear.
+            return
+
+        self._pending = False
+        if signature == self._signature:
+            return
+
+        self._signature = signature
+        self._onChange()
+
+    def _on_inotify_event(self, fd, mask):
+        """Read the pending inotify events and debounce the relevant ones."""
+        try:
+            data = os.read(self._inotifyFd, 4096)
+        except BlockingIOError:
+            return
+
+        relevant = False
+        offset = 0
+        headerSize = self._IN_EVENT_HEADER.size
+        while offset + headerSize <= len(data):
+            __, __, __, nameLength = self._IN_EVENT_HEADER.unpack_from(data, offset)
+            offset += headerSize
+            name = data[offset:offset + nameLength].rstrip(b'\0').decode(sys.getfilesystemencoding(), 'replace')
+            offset += nameLength
+            if name == self._fileName:
+                self._pending = True
+                relevant = True
+            elif name == self._lockName:
+                relevant = True
+        if relevant:
+            self._debounce()
+
+    def _poll(self):
+        """Check the file status and debounce changes (polling fallback)."""
+        pollSignature = (self._get_signature(), self._isLocked())
+        if pollSignature != self._pollSignature:
+            if pollSignature[0] != self._pollSignature[0]:
+                self._pending = True
+            self._pollSignature = pollSignature
+            self._debounce()
+        self._pollJob = self._widget.after(self.POLL_INTERVAL, self._poll)
+
+    def _start_inotify(self):
+        """Watch the file's directory with inotify.
+
+        Return True on success, otherwise return False.
+        The directory is watched rather than the file, because yWriter
+        may replace the file, and the lock file is created and deleted there.
+        """
+        if not sys.platform.startswith('linux'):
+            return False
+
+        try:
+            from ctypes.util import find_library
+            # Imported here, because this takes much longer than importing ctypes.
+            libc = ctypes.CDLL(find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except:
+            return False
+
+        if fd < 0:
+            return False
+
+        dirPath = os.path.dirname(os.path.abspath(self.filePath))
+        mask = (self._IN_MODIFY | self._IN_CLOSE_WRITE | self._IN_MOVED_FROM | self._IN_MOVED_TO
+                | self._IN_CREATE | self._IN_DELETE)
+        if libc.inotify_add_watch(fd, os.fsencode(dirPath), mask) < 0:
+            os.close(fd)
+            return False
+
+        try:
+            self._widget.tk.createfilehandler(fd, tk.READABLE, self._on_inotify_event)
+        except:
+            os.close(fd)
+            return False
+
+        self._inotifyFd = fd
+        return True
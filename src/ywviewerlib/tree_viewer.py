@@ -0,0 +1,149 @@
+"""Provide a tkinter tree view class for yWriter project navigation.
+
+Copyright (c) 2022 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from tkinter import ttk
+from pywriter.pywriter_globals import *
+
+
+class TreeViewer:
+    """A tkinter tree view class for yWriter project navigation.
+
+    Public methods:
+        build_tree() -- insert the chapters of the open project.
+        reset_tree() -- clear the tree.
+
+    Show an outline with the chapters and scenes of the scene contents view,
+    followed by the characters, locations, and items with the scenes referring to them.
+    The scenes of a chapter or an element are only inserted when the node is expanded,
+    so the tree is built in time proportional to the number of chapters and elements.
+    An element's scenes are listed in reading order, looked up in the novel's cross reference index.
+    Selecting a node scrolls the scene contents view to the chapter or scene.
+    """
+    _CHAPTER_PREFIX = 'ch'
+    _SCENE_PREFIX = 'sc'
+    _PLACEHOLDER_PREFIX = 'pl'
+    _WORLD_PREFIX = 'wd'
+    _CHARACTER_PREFIX = 'cr'
+    _LOCATION_PREFIX = 'lc'
+    _ITEM_PREFIX = 'it'
+
+    def __init__(self, ui):
+        """Put a tree view to the GUI tree window.
+
+        Positional arguments:
+            ui -- the viewer's main window, providing the novel and the navigation methods.
+        """
+        self._ui = ui
+        self._tree = ttk.Treeview(self._ui.treeWindow, selectmode='browse', show='tree')
+        scrollbar = ttk.Scrollbar(self._ui.treeWindow, orient='vertical', command=self._tree.yview)
+        self._tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y')
+        self._tree.pack(side='left', expand=True, fill='both')
+        self._tree.bind('<<TreeviewOpen>>', self._open_node)
+        self._tree.bind('<<TreeviewSelect>>', self._select_node)
+
+    def build_tree(self):
+        """Insert the chapters of the open project.
+
+        Chapters and elements that were expanded before are expanded again.
+        """
+        expanded = []
+        for node in self._tree.get_children(''):
+            if self._tree.item(node, 'open'):
+                expanded.append(node)
+                if node.startswith(self._WORLD_PREFIX):
+                    for child in self._tree.get_children(node):
+                        if self._tree.item(child, 'open'):
+                            expanded.append(child)
+        self.reset_tree()
+        for chId in self._ui.novel.srtChapters:
+            chapter = self._ui.novel.chapters[chId]
+            if chapter.chType != 0:
+                continue
+
+            node = f'{self._CHAPTER_PREFIX}{chId}'
+            self._tree.insert('', 'end', node, text=self._get_title(chapter.title, chId))
+            if chapter.srtScenes:
+                self._tree.insert(node, 'end', f'{self._PLACEHOLDER_PREFIX}{node}')
+        crossReferences = self._ui.novel.get_cross_references()
+        for prefix, title, srtIds, elements, index in (
+                (self._CHARACTER_PREFIX, _('Characters'), self._ui.novel.srtCharacters, self._ui.novel.characters,
+                 crossReferences.characters),
+                (self._LOCATION_PREFIX, _('Locations'), self._ui.novel.srtLocations, self._ui.novel.locations,
+                 crossReferences.locations),
+                (self._ITEM_PREFIX, _('Items'), self._ui.novel.srtItems, self._ui.novel.items,
+                 crossReferences.items),
+                ):
+            if not srtIds:
+                continue
+
+            parent = f'{self._WORLD_PREFIX}{prefix}'
+            self._tree.insert('', 'end', parent, text=title)
+            for elemId in srtIds:
+                node = f'{prefix}{elemId}'
+                self._tree.insert(parent, 'end', node, text=self._get_title(elements[elemId].title, elemId))
+                if elemId in index:
+                    self._tree.insert(node, 'end', f'{self._PLACEHOLDER_PREFIX}{node}')
+        for node in expanded:
+            if self._tree.exists(node):
+                self._insert_scenes(node)
+                self._tree.item(node, open=True)
+
+    def reset_tree(self):
+        """Clear the tree."""
+        self._tree.delete(*self._tree.get_children(''))
+
+    def _get_title(self, title, elementId):
+        """Return a title to be displayed for a chapter, scene, or element."""
+        if title:
+            return title
+
+        return f'({_("Untitled")} {elementId})'
+
+    def _insert_scenes(self, node):
+        """Replace the placeholder of a chapter or element node with the scenes.
+
+        The scene nodes of an element are named after the element node and the scene,
+        because a scene may refer to several elements.
+        """
+        placeholder = f'{self._PLACEHOLDER_PREFIX}{node}'
+        if not self._tree.exists(placeholder):
+            return
+
+        self._tree.delete(placeholder)
+        novel = self._ui.novel
+        if node.startswith(self._CHAPTER_PREFIX):
+            sceneIds = novel.chapters[node[len(self._CHAPTER_PREFIX):]].srtScenes
+            prefix = ''
+        else:
+            crossReferences = novel.get_cross_references()
+            for prefix, getScenes in (
+                    (self._CHARACTER_PREFIX, crossReferences.get_character_scenes),
+                    (self._LOCATION_PREFIX, crossReferences.get_location_scenes),
+                    (self._ITEM_PREFIX, crossReferences.get_item_scenes),
+                    ):
+                if node.startswith(prefix):
+                    sceneIds = getScenes(node[len(prefix):], novel.get_reading_order())
+                    break
+            prefix = node
+        for scId in sceneIds:
+            scene = novel.scenes[scId]
+            if scene.scType == 0:
+                self._tree.insert(node, 'end', f'{prefix}{self._SCENE_PREFIX}{scId}', text=self._get_title(scene.title, scId))
+
+    def _open_node(self, event=None):
+        """Insert the scenes of the chapter or element being expanded."""
+        node = self._tree.focus()
+        if self._tree.exists(f'{self._PLACEHOLDER_PREFIX}{node}'):
+            self._insert_scenes(node)
+
+    def _select_node(self, event=None):
+        """Scroll the scene contents view to the selected chapter or scene."""
+        for node in self._tree.selection():
+            if node.startswith(self._CHAPTER_PREFIX):
+                self._ui.show_chapter(node[len(self._CHAPTER_PREFIX):])
+            elif self._SCENE_PREFIX in node:
+                self._ui.show_scene(node.rpartition(self._SCENE_PREFIX)[2])
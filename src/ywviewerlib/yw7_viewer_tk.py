@@ -5,11 +5,20 @@ For further information see https://github.com/peter88213/yw-viewer
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
+import threading
 import tkinter as tk
+from tkinter import ttk
+from tkinter import simpledialog
+from tkinter import filedialog
 from pywriter.pywriter_globals import *
 from pywriter.ui.main_tk import MainTk
+from pywriter.model.novel import Novel
+from pywriter.yw.yw7_stream_file import Yw7StreamFile
+from pywriter.diag.profiler import PROFILER
 from pywriter.ui.set_icon_tk import *
 from ywviewerlib.file_viewer import FileViewer
+from ywviewerlib.file_watcher import FileWatcher
+from ywviewerlib.tree_viewer import TreeViewer
 
 
 class Yw7ViewerTk(MainTk):
@@ -18,14 +27,29 @@ class Yw7ViewerTk(MainTk):
     Public methods:
         disable_menu() -- disable menu entries when no project is open.
         enable_menu() -- enable menu entries when a project is open.
-        open_project(fileName) -- create a yWriter project instance and read the file. 
+        open_project(fileName) -- create a yWriter project instance and load the file progressively. 
+        reload_project() -- re-read the project file, keeping the current view.
+        show_chapter(chId) -- scroll the scene contents to a chapter.
+        show_scene(scId) -- scroll the scene contents to a scene.
+        show_word(wordOffset) -- scroll the scene contents to a word offset.
+        show_position(position) -- scroll the scene contents to a percentage or a word number.
+        show_progress() -- show the position of the scene contents in words.
+        turn_page(step) -- show another chapter in paged reading mode.
         close_project() -- close the yWriter project without saving and reset the user interface.
 
     Public instance variables:
         treeWindow -- tk window for the project tree.
+        viewerWindow -- tk window for the text box.
 
     Show titles, descriptions, and contents in a text box.
     """
+    _KEY_GO_TO = ('<Control-g>', 'Ctrl-G')
+    _KEY_NEXT_CHAPTER = ('<Control-Next>', 'Ctrl-PgDn')
+    _KEY_PREVIOUS_CHAPTER = ('<Control-Prior>', 'Ctrl-PgUp')
+    _LOADING_POLL_INTERVAL = 50
+    # Milliseconds between checks whether the project is read.
+    _YW_CLASS = Yw7StreamFile
+    # The viewer does not need the XML element tree.
 
     def __init__(self, title, **kwargs):
         """Put a text box to the GUI main window.
@@ -35,15 +59,33 @@ class Yw7ViewerTk(MainTk):
          
         Required keyword arguments:
             yw_last_open -- str: initial file.
+            
+        Optional keyword arguments:
+            paged_reading -- bool: if True, show the scene contents one chapter at a time.
         
         Extends the superclass constructor.
         """
         self.kwargs = kwargs
+        self._pagedReading = tk.BooleanVar(value=bool(kwargs.get('paged_reading', False)))
         super().__init__(title, **kwargs)
         set_icon(self.root, icon='vLogo32')
-        self.viewerWindow = tk.Frame(self.mainWindow)
-        self.viewerWindow.pack(expand=True, fill='both')
+        self._panes = ttk.PanedWindow(self.mainWindow, orient='horizontal')
+        self._panes.pack(expand=True, fill='both')
+        self.treeWindow = ttk.Frame(self._panes)
+        self._panes.add(self.treeWindow, weight=1)
+        self.viewerWindow = tk.Frame(self._panes)
+        self._panes.add(self.viewerWindow, weight=3)
+        self._progressBar = tk.Label(self.viewerWindow, text='', anchor='e', padx=5)
+        self._progressBar.pack(side='bottom', fill='x')
+        self._tv = TreeViewer(self)
         self._fv = FileViewer(self)
+        self._fv.paged = self._pagedReading.get()
+        self._watcher = None
+        self._loading = False
+        # True while the scene contents are being loaded.
+        self.root.bind(self._KEY_GO_TO[0], self._go_to)
+        self.root.bind(self._KEY_NEXT_CHAPTER[0], lambda event: self.turn_page(1))
+        self.root.bind(self._KEY_PREVIOUS_CHAPTER[0], lambda event: self.turn_page(-1))
 
     def _build_main_menu(self):
         """Add main menu entries.
@@ -65,9 +107,31 @@ class Yw7ViewerTk(MainTk):
         self._quickViewMenu.add_command(label=_('Scene descriptions'),
                                        command=lambda: self._fv.view_text(self._fv.sceneDescriptions))
         self._quickViewMenu.add_command(label=_('Scene contents'),
-                                        command=lambda: self._fv.view_text(self._fv.sceneContents))
+                                        command=lambda: self._fv.view_contents())
+        self._quickViewMenu.add_command(label=_('Character mentions'),
+                                        command=lambda: self._fv.view_mentions())
+        self._quickViewMenu.add_command(label=_('Word frequency'),
+                                        command=lambda: self._fv.view_frequencies())
+        self._quickViewMenu.add_command(label=_('Concordance...'),
+                                        command=self._show_concordance)
+        self._quickViewMenu.add_command(label=_('Repeated phrases'),
+                                        command=lambda: self._fv.view_repetitions())
+        self._quickViewMenu.add_command(label=_('Prose statistics'),
+                                        command=lambda: self._fv.view_statistics())
+        self._quickViewMenu.add_command(label=_('Export statistics...'),
+                                        command=self._export_statistics)
         self._quickViewMenu.insert_separator(1)
         self._quickViewMenu.insert_separator(4)
+        self._quickViewMenu.add_separator()
+        self._quickViewMenu.add_command(label=_('Go to position...'), accelerator=self._KEY_GO_TO[1],
+                                        command=self._go_to)
+        self._quickViewMenu.add_separator()
+        self._quickViewMenu.add_checkbutton(label=_('Chapter by chapter'), variable=self._pagedReading,
+                                            command=self._set_paged)
+        self._quickViewMenu.add_command(label=_('Next chapter'), accelerator=self._KEY_NEXT_CHAPTER[1],
+                                        command=lambda: self.turn_page(1))
+        self._quickViewMenu.add_command(label=_('Previous chapter'), accelerator=self._KEY_PREVIOUS_CHAPTER[1],
+                                        command=lambda: self.turn_page(-1))
 
     def disable_menu(self):
         """Disable menu entries when no project is open.
@@ -84,28 +148,309 @@ class Yw7ViewerTk(MainTk):
         """
         super().enable_menu()
         self.mainMenu.entryconfig(_('Quick view'), state='normal')
+        self._enable_contents_menu(not self._loading)
+
+    def _enable_contents_menu(self, enable):
+        """Enable or disable the menu entries that need the scene contents."""
+        if enable:
+            state = 'normal'
+        else:
+            state = 'disabled'
+        self._quickViewMenu.entryconfig(_('Scene contents'), state=state)
+        self._quickViewMenu.entryconfig(_('Character mentions'), state=state)
+        self._quickViewMenu.entryconfig(_('Word frequency'), state=state)
+        self._quickViewMenu.entryconfig(_('Concordance...'), state=state)
+        self._quickViewMenu.entryconfig(_('Repeated phrases'), state=state)
+        self._quickViewMenu.entryconfig(_('Prose statistics'), state=state)
+        self._quickViewMenu.entryconfig(_('Export statistics...'), state=state)
+        self._quickViewMenu.entryconfig(_('Go to position...'), state=state)
+        self._enable_page_menu(enable)
+
+    def _enable_page_menu(self, enable):
+        """Enable or disable the menu entries for paged reading."""
+        if enable and self._pagedReading.get():
+            state = 'normal'
+        else:
+            state = 'disabled'
+        self._quickViewMenu.entryconfig(_('Next chapter'), state=state)
+        self._quickViewMenu.entryconfig(_('Previous chapter'), state=state)
 
     def open_project(self, fileName):
-        """Create a yWriter project instance and prepare the content for viewing.
+        """Create a yWriter project instance and load the file progressively.
 
         Positional arguments:
             fileName -- str: project file path.
             
+        The project description, the titles and the descriptions are shown first,
+        peeking into the file. Then the project is read in a background thread,
+        and the scene contents are built chapter by chapter between the GUI events.
         Display the total numbers of chapters, scenes and words.
         Return True on success, otherwise return False.
         Extends the superclass method.
         """
+        PROFILER.reset()
         if not super().open_project(fileName):
             return False
 
-        self.show_status(self._fv.build_views())
+        with PROFILER.phase('build views'):
+            status = self._fv.build_views()
+        self.show_status(f'{status} | {_("Loading scene contents")}...')
+        self._tv.build_tree()
         self._fv.view_text(self._fv.prjDescription)
+        self._load_project()
+        return True
+
+    def _read_project(self):
+        """Read the project's metadata, chapters and scene titles only.
+        
+        The whole project is read by _load_project() afterwards.
+        Overrides the superclass method.
+        """
+        self._loading = True
+        self.prjFile.peek()
+
+    def _load_project(self):
+        """Read the whole project in a background thread."""
+        prjFile = self.prjFile
+        novel = Novel()
+        errors = []
+
+        def read():
+            prjFile.novel = novel
+            try:
+                prjFile.read()
+            except Error as ex:
+                errors.append(ex)
+
+        thread = threading.Thread(target=read, daemon=True)
+        thread.start()
+        self.root.after(self._LOADING_POLL_INTERVAL, self._check_loading, thread, prjFile, novel, errors)
+
+    def _check_loading(self, thread, prjFile, novel, errors):
+        """Start building the scene contents when the project is read."""
+        if prjFile is not self.prjFile:
+            # The project was closed while being read.
+            return
+
+        if thread.is_alive():
+            self.root.after(self._LOADING_POLL_INTERVAL, self._check_loading, thread, prjFile, novel, errors)
+            return
+
+        if errors:
+            self.close_project()
+            self.set_info_how(f'!{str(errors[0])}')
+            return
+
+        self.novel = novel
+        self.set_title()
+        self.root.after_idle(self._build_chapter, prjFile, self._fv.build_views_stepwise())
+
+    def _build_chapter(self, prjFile, steps):
+        """Build the scene contents of the next chapter, and finish loading after the last one."""
+        if prjFile is not self.prjFile:
+            return
+
+        try:
+            with PROFILER.phase('build views'):
+                next(steps)
+        except StopIteration:
+            self._loading = False
+            self._enable_contents_menu(True)
+            self.show_status(self._get_status(self._fv.get_status()))
+            self._tv.build_tree()
+            self._watcher = FileWatcher(self.root, self.prjFile.filePath, self.reload_project, self.prjFile.is_locked)
+            self._watcher.start()
+            return
+
+        if self._fv.sceneContents:
+            self._quickViewMenu.entryconfig(_('Scene contents'), state='normal')
+            self._enable_page_menu(True)
+        self.root.after(1, self._build_chapter, prjFile, steps)
+
+    def reload_project(self):
+        """Re-read the project file, keeping the current view and scroll position.
+        
+        This is called by the file watcher when yWriter has saved the project.
+        Return True on success, otherwise return False.
+        """
+        if self.prjFile is None:
+            return False
+
+        PROFILER.reset()
+        novel = Novel()
+        self.prjFile.novel = novel
+        try:
+            self.prjFile.read()
+        except Error as ex:
+            self.prjFile.novel = self.novel
+            self.set_info_how(f'!{str(ex)}')
+            return False
+
+        self.novel = novel
+        self.set_title()
+        with PROFILER.phase('build views'):
+            status = self._fv.rebuild_views()
+        self.show_status(self._get_status(status))
+        self._tv.build_tree()
+        return True
+
+    def show_chapter(self, chId):
+        """Scroll the scene contents to a chapter.
+        
+        Positional arguments:
+            chId: str -- chapter ID.
+        """
+        index = self._fv.chapterIndices.get(chId, None)
+        if index is not None:
+            self._fv.see_index(index)
+
+    def show_scene(self, scId):
+        """Scroll the scene contents to a scene.
+        
+        Positional arguments:
+            scId: str -- scene ID.
+        """
+        index = self._fv.sceneIndices.get(scId, None)
+        if index is not None:
+            self._fv.see_index(index)
+
+    def show_word(self, wordOffset):
+        """Scroll the scene contents to a word offset.
+        
+        Positional arguments:
+            wordOffset: int -- number of words before the word to be shown.
+
+        Return True on success, otherwise return False.
+        """
+        return self._fv.see_word_offset(wordOffset)
+
+    def show_position(self, position):
+        """Scroll the scene contents to a percentage or a word number.
+        
+        Positional arguments:
+            position: str -- percentage like "30%", or word number like "120431".
+
+        Return True on success, otherwise return False.
+        """
+        totalWords = self.novel.get_reading_order().totalWords
+        position = position.strip().replace(',', '')
+        try:
+            if position.endswith('%'):
+                wordOffset = int(totalWords * float(position[:-1]) / 100)
+            else:
+                wordOffset = int(position) - 1
+        except ValueError:
+            self.set_info_how(f'!{_("Invalid position")}: "{position}".')
+            return False
+
+        wordOffset = min(max(wordOffset, 0), totalWords - 1)
+        if not self.show_word(wordOffset):
+            self.set_info_how(f'!{_("No scene contents available")}.')
+            return False
+
+        self.restore_status()
         return True
 
+    def turn_page(self, step):
+        """Show another chapter in paged reading mode.
+        
+        Positional arguments:
+            step: int -- number of chapters to go forward, or backward if negative.
+
+        Return True on success, otherwise return False.
+        """
+        if self.prjFile is None:
+            return False
+
+        return self._fv.turn_page(step)
+
+    def show_progress(self):
+        """Show the position of the scene contents in words, e.g. "Word 120,431 of 402,118 (30%)"."""
+        wordOffset = None
+        if self.prjFile is not None:
+            wordOffset = self._fv.get_word_offset()
+        if wordOffset is None:
+            self._progressBar.config(text='')
+            return
+
+        totalWords = self.novel.get_reading_order().totalWords
+        wordNumber = min(wordOffset + 1, totalWords)
+        percentage = 0
+        if totalWords:
+            percentage = wordOffset * 100 // totalWords
+        self._progressBar.config(text=f'{_("Word")} {wordNumber:,} {_("of")} {totalWords:,} ({percentage}%)')
+
     def close_project(self, event=None):
         """Clear the text box.
         
         Extends the superclass method.
         """
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self._loading = False
         super().close_project()
+        self._tv.reset_tree()
         self._fv.reset_view()
+        self._progressBar.config(text='')
+
+    def _set_paged(self):
+        """Switch the paged reading mode according to the menu."""
+        paged = self._pagedReading.get()
+        self.kwargs['paged_reading'] = paged
+        self._fv.set_paged(paged)
+        self._enable_page_menu(self.prjFile is not None and not self._loading)
+
+    def _go_to(self, event=None):
+        """Ask for a position and scroll the scene contents there."""
+        if self.prjFile is None or self._loading:
+            return
+
+        position = simpledialog.askstring(
+            self.title,
+            _('Go to percentage (e.g. 30%) or word number:'),
+            parent=self.root,
+            )
+        if position:
+            self.show_position(position)
+
+    def _show_concordance(self):
+        """Ask for a word and show its occurrences with their context."""
+        if self.prjFile is None or self._loading:
+            return
+
+        word = simpledialog.askstring(
+            self.title,
+            _('Show the occurrences of the word:'),
+            parent=self.root,
+            )
+        if word and word.strip():
+            self._fv.view_concordance(word.strip())
+
+    def _export_statistics(self):
+        """Ask for a file name and write the prose statistics per scene to a CSV file."""
+        if self.prjFile is None or self._loading:
+            return
+
+        fileName = filedialog.asksaveasfilename(
+            filetypes=[(_('CSV file'), '.csv')],
+            defaultextension='.csv',
+            initialfile=f'{os.path.splitext(os.path.basename(self.prjFile.filePath))[0]}_statistics.csv',
+            initialdir=os.path.dirname(self.prjFile.filePath),
+            )
+        if not fileName:
+            return
+
+        try:
+            self._fv.get_prose_statistics().write_csv(fileName)
+        except Error as ex:
+            self.set_info_how(f'!{str(ex)}')
+        else:
+            self.set_info_how(f'{_("File written")}: "{norm_path(fileName)}".')
+
+    def _get_status(self, status):
+        """Return the status bar text, with the profiling summary if profiling is enabled."""
+        if PROFILER.enabled:
+            return f'{status} | {PROFILER.get_summary()}'
+
+        return status
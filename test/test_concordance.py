@@ -0,0 +1,94 @@
+"""Tests for the word frequency and key word in context index of a novel.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pywriter.model.novel import Novel
+from pywriter.model.chapter import Chapter
+from pywriter.model.scene import Scene
+from pywriter.model.concordance import Concordance
+
+CHAPTERS = {
+    '1': (('1', 0, 'The cat sat. The cat ran.'),
+          ('2', 0, 'A dog barked at the cat.')),
+    '2': (('3', 0, 'The dog, the dog! [i]It[/i] barked /* at the cat */ at a well-known - dog.'),
+          ('4', 1, 'Cat cat cat.'),
+          ('5', 0, 'Well-known dog days.')),
+    }
+# Scenes (scene ID, scene type, scene content) by chapter ID.
+# Scene 4 is a "Notes" scene and is not indexed.
+
+
+def get_novel():
+    """Return a novel with the chapters and scenes of CHAPTERS."""
+    novel = Novel()
+    for chId, scenes in CHAPTERS.items():
+        chapter = Chapter()
+        chapter.chType = 0
+        novel.chapters[chId] = chapter
+        novel.srtChapters.append(chId)
+        for scId, scType, sceneContent in scenes:
+            scene = Scene()
+            scene.scType = scType
+            scene.sceneContent = sceneContent
+            novel.scenes[scId] = scene
+            chapter.srtScenes.append(scId)
+    return novel
+
+
+class ConcordanceTest(unittest.TestCase):
+    """The index counts the words like the word counter, and the queries return the expected results."""
+
+    def setUp(self):
+        self._novel = get_novel()
+        self._concordance = Concordance(self._novel)
+
+    def test_words_per_scene(self):
+        concordance = self._concordance
+        self.assertEqual(concordance.sceneIds, ['1', '2', '3', '5'])
+        wordCounts = [concordance.sceneOffsets[i + 1] - concordance.sceneOffsets[i]
+                      for i in range(len(concordance.sceneIds))]
+        self.assertEqual(wordCounts, [6, 6, 10, 3])
+        self.assertEqual(wordCounts, [self._novel.scenes[scId].wordCount for scId in concordance.sceneIds])
+
+    def test_frequencies(self):
+        self.assertEqual(self._concordance.get_frequencies(3), [('the', 5), ('dog', 5), ('cat', 3)])
+        self.assertEqual(self._concordance.get_count('Cat!'), 3)
+        self.assertEqual(self._concordance.get_count('cats'), 0)
+
+    def test_kwic(self):
+        # The context ends at the scene boundaries.
+        self.assertEqual(self._concordance.get_kwic('CAT', 3), [
+            ('1', 1, 'The', 'cat', 'sat. The cat'),
+            ('1', 4, 'cat sat. The', 'cat', 'ran.'),
+            ('2', 5, 'barked at the', 'cat.', ''),
+            ])
+        self.assertEqual(self._concordance.get_kwic('dog', 2, limit=4), [
+            ('2', 1, 'A', 'dog', 'barked at'),
+            ('3', 1, 'The', 'dog,', 'the dog!'),
+            ('3', 3, 'dog, the', 'dog!', 'It barked'),
+            ('3', 9, 'a well-known', 'dog.', ''),
+            ])
+        self.assertEqual(self._concordance.get_kwic('dog', 2)[-1], ('5', 1, 'Well-known', 'dog', 'days.'))
+
+    def test_overused_terms(self):
+        # Chapter 2 has 13 of the 25 words. G2 of "well-known" (2 of 2 occurrences) is 2.62,
+        # of "dog" (4 of 5) 1.70, of "days" and "it" (1 of 1) 1.31.
+        # "the" (2 of 5) occurs less often than expected.
+        self.assertEqual(self._concordance.get_overused_terms('2', 2), [('well-known', 2), ('dog', 4)])
+        self.assertNotIn('the', [term for term, __ in self._concordance.get_overused_terms('2', 10)])
+        # Chapter 1: G2 of "cat" (3 of 3) is 4.40, of "ran" (1 of 1) 1.47, of "the" (3 of 5) 0.29.
+        self.assertEqual(self._concordance.get_overused_terms('1', 1), [('cat', 3)])
+        terms = [term for term, __ in self._concordance.get_overused_terms('1', 10)]
+        self.assertLess(terms.index('ran'), terms.index('the'))
+        self.assertEqual(self._concordance.get_overused_terms('3', 10), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Regression tests for control characters and pipe characters in yw7 scene contents.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from pywriter.model.novel import Novel
+from pywriter.yw.yw7_file import Yw7File
+from pywriter.yw.yw7_stream_file import Yw7StreamFile
+from yw7_generator import ProjectGenerator
+from yw7_generator import cdata
+
+RAW_CONTENT = 'Left|right\x00\x01\x08 a\x0bb\x0cc\x0e\x1f. |\tTab\nNext | line'
+# Scene content with all control characters not allowed in XML 1.0, besides tabs and line breaks.
+
+CONTENT = 'Left|right abc. |\tTab\nNext | line'
+# The scene content as read.
+
+class ControlCharsTest(unittest.TestCase):
+    """Pipe characters are kept, illegal control characters are removed, with each reader."""
+
+    def setUp(self):
+        self._workDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._workDir)
+
+    def _write_project(self, encoding='utf-8'):
+        filePath = os.path.join(self._workDir, 'pipes.yw7')
+        xml = ProjectGenerator(chapters=1, scenes=1, texts=[RAW_CONTENT]).get_xml()
+        with open(filePath, 'wb') as f:
+            f.write(xml.replace(cdata('Scene 1'), cdata('Pipe|scene')).encode(encoding))
+        return filePath
+
+    def _read_scene(self, fileClass, filePath, mmapThreshold=None):
+        prjFile = fileClass(filePath)
+        if mmapThreshold is not None:
+            prjFile.MMAP_THRESHOLD = mmapThreshold
+        prjFile.novel = Novel()
+        prjFile.read()
+        return prjFile.novel.scenes['1']
+
+    def _check_scene(self, scene):
+        self.assertEqual(scene.sceneContent, CONTENT)
+        self.assertEqual(scene.title, 'Pipe|scene')
+        # The letter count excludes line breaks only.
+        self.assertEqual(scene.letterCount, len(CONTENT.replace('\n', '')))
+        self.assertEqual(scene.wordCount, 7)
+
+    def test_read(self):
+        self._check_scene(self._read_scene(Yw7File, self._write_project()))
+
+    def test_read_utf16(self):
+        self._check_scene(self._read_scene(Yw7File, self._write_project(encoding='utf-16')))
+
+    def test_read_mapped(self):
+        # The counts stored by the generator are not used.
+        self._check_scene(self._read_scene(Yw7File, self._write_project(), mmapThreshold=0))
+
+    def test_read_stream(self):
+        self._check_scene(self._read_scene(Yw7StreamFile, self._write_project()))
+
+
+if __name__ == '__main__':
+    unittest.main()
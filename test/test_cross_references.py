@@ -0,0 +1,72 @@
+"""Tests for the reverse index of the scenes referring to characters, locations, and items.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pywriter.model.novel import Novel
+from pywriter.model.chapter import Chapter
+from pywriter.model.scene import Scene
+
+
+class CrossReferencesTest(unittest.TestCase):
+    """The index fits the scenes after any change of their references."""
+
+    def setUp(self):
+        self._novel = Novel()
+        chapter = Chapter()
+        chapter.chType = 0
+        self._novel.chapters['1'] = chapter
+        self._novel.srtChapters = ['1']
+        for scId, characters in (('1', ['1']), ('2', ['1', '2']), ('3', None)):
+            self._add_scene(scId, characters)
+
+    def _add_scene(self, scId, characters):
+        scene = Scene()
+        scene.scType = 0
+        scene.characters = characters
+        self._novel.scenes[scId] = scene
+        self._novel.chapters['1'].srtScenes.append(scId)
+        return scene
+
+    def _get_character_scenes(self, crId):
+        crossReferences = self._novel.get_cross_references()
+        return crossReferences.get_character_scenes(crId, self._novel.get_reading_order())
+
+    def test_lookup(self):
+        self.assertEqual(self._get_character_scenes('1'), ['1', '2'])
+        self.assertEqual(self._get_character_scenes('2'), ['2'])
+        self.assertEqual(self._get_character_scenes('3'), [])
+
+    def test_list_changed_in_place(self):
+        self.assertEqual(self._get_character_scenes('2'), ['2'])
+        self._novel.scenes['1'].characters.append('2')
+        self._novel.scenes['2'].characters.remove('1')
+        self.assertEqual(self._get_character_scenes('1'), ['1'])
+        self.assertEqual(self._get_character_scenes('2'), ['1', '2'])
+
+    def test_list_replaced(self):
+        self.assertEqual(self._get_character_scenes('1'), ['1', '2'])
+        self._novel.scenes['3'].characters = ['1']
+        self._novel.scenes['2'].characters = None
+        self.assertEqual(self._get_character_scenes('1'), ['1', '3'])
+        self.assertEqual(self._get_character_scenes('2'), [])
+
+    def test_scene_added_and_removed(self):
+        self.assertEqual(self._get_character_scenes('1'), ['1', '2'])
+        self._add_scene('4', ['1'])
+        self.assertEqual(self._get_character_scenes('1'), ['1', '2', '4'])
+        del self._novel.scenes['2']
+        self._novel.chapters['1'].srtScenes.remove('2')
+        self.assertEqual(self._get_character_scenes('1'), ['1', '4'])
+        self.assertEqual(self._get_character_scenes('2'), [])
+        self.assertNotIn('2', self._novel.get_cross_references().characters)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Regression tests for scene texts read from memory-mapped yw7 files.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from pywriter.pywriter_globals import Error
+from pywriter.model.novel import Novel
+from pywriter.model.lazy_scene import LazyScene
+from pywriter.yw.yw7_file import Yw7File
+from pywriter.yw.yw7_stream_file import Yw7StreamFile
+from yw7_generator import ProjectGenerator
+
+CHAPTERS = 3
+SCENES = 4
+WORDS = 300
+LAST_SCENE = str(CHAPTERS * SCENES)
+
+TRUNCATE_SCRIPT = '''
+import os, sys
+sys.path.insert(0, sys.argv[1])
+from pywriter.pywriter_globals import Error
+from pywriter.model.novel import Novel
+from pywriter.yw.yw7_file import Yw7File
+from pywriter.yw.yw7_stream_file import Yw7StreamFile
+prjFile = {fileClass}(sys.argv[2])
+prjFile.MMAP_THRESHOLD = 0
+prjFile.novel = Novel()
+prjFile.read()
+os.truncate(sys.argv[2], 1000)
+try:
+    prjFile.novel.scenes[sys.argv[3]].notes
+except Error:
+    print('Error')
+'''
+
+
+class LazyScenesTest(unittest.TestCase):
+    """Scene notes not yet accessed survive changes of the memory-mapped file, or raise Error."""
+
+    def setUp(self):
+        self._workDir = tempfile.mkdtemp()
+        self._filePath = os.path.join(self._workDir, 'lazy.yw7')
+        self._write_project()
+
+    def tearDown(self):
+        shutil.rmtree(self._workDir)
+
+    def _write_project(self, seed=1):
+        ProjectGenerator(chapters=CHAPTERS, scenes=SCENES, words=WORDS, seed=seed).write(self._filePath)
+
+    def _read(self, fileClass, mmapThreshold=0):
+        prjFile = fileClass(self._filePath)
+        if mmapThreshold is not None:
+            prjFile.MMAP_THRESHOLD = mmapThreshold
+        prjFile.novel = Novel()
+        prjFile.read()
+        return prjFile
+
+    def test_lazy_reading(self):
+        expected = self._read(Yw7File, mmapThreshold=None).novel.scenes['3']
+        for fileClass in (Yw7File, Yw7StreamFile):
+            with self.subTest(fileClass=fileClass.__name__):
+                scene = self._read(fileClass).novel.scenes['3']
+                self.assertIsInstance(scene, LazyScene)
+                self.assertTrue(scene.has_pending_sources())
+                self.assertEqual(scene.sceneContent, expected.sceneContent)
+                self.assertEqual(scene.wordCount, WORDS)
+                self.assertEqual(scene.notes, expected.notes)
+                self.assertFalse(scene.has_pending_sources())
+
+    def test_counts(self):
+        # The counts are determined from the scene contents, not taken from the file.
+        with open(self._filePath, encoding='utf-8') as f:
+            xml = f.read()
+        with open(self._filePath, 'w', encoding='utf-8') as f:
+            f.write(xml.replace(f'<WordCount>{WORDS}</WordCount>', '<WordCount>7</WordCount>'))
+        for fileClass in (Yw7File, Yw7StreamFile):
+            for mmapThreshold in (None, 0):
+                with self.subTest(fileClass=fileClass.__name__, mmapThreshold=mmapThreshold):
+                    novel = self._read(fileClass, mmapThreshold).novel
+                    self.assertEqual([scene.wordCount for scene in novel.scenes.values()],
+                                     [WORDS] * CHAPTERS * SCENES)
+                    self.assertEqual(novel.get_reading_order().totalWords, WORDS * CHAPTERS * SCENES)
+
+    def test_file_replaced(self):
+        # yWriter saving the project replaces the file; the notes are read from the former file.
+        expected = self._read(Yw7File, mmapThreshold=None).novel.scenes[LAST_SCENE].notes
+        for fileClass in (Yw7File, Yw7StreamFile):
+            with self.subTest(fileClass=fileClass.__name__):
+                prjFile = self._read(fileClass)
+                newPath = f'{self._filePath}.new'
+                ProjectGenerator(chapters=CHAPTERS, scenes=SCENES, words=WORDS, seed=2).write(newPath)
+                os.replace(newPath, self._filePath)
+                self.assertEqual(prjFile.novel.scenes[LAST_SCENE].notes, expected)
+                self._write_project()
+
+    def test_file_truncated(self):
+        # Reading a text from a truncated memory mapping would kill the process with SIGBUS,
+        # so the notes are read in a child process.
+        for fileClass in ('Yw7File', 'Yw7StreamFile'):
+            with self.subTest(fileClass=fileClass):
+                self._write_project()
+                script = TRUNCATE_SCRIPT.format(fileClass=fileClass)
+                result = subprocess.run([sys.executable, '-c', script, SOURCE_PATH, self._filePath, LAST_SCENE],
+                                        capture_output=True, text=True, timeout=60)
+                self.assertEqual(result.returncode, 0, result.stderr)
+                self.assertEqual(result.stdout.split(), ['Error'])
+
+    def test_file_changed_in_place(self):
+        prjFile = self._read(Yw7File)
+        with open(self._filePath, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        with self.assertRaises(Error):
+            prjFile.novel.scenes['1'].notes
+
+
+if __name__ == '__main__':
+    unittest.main()
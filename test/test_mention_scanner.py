@@ -0,0 +1,54 @@
+"""Tests for finding the names of characters, locations, and items in the scene contents.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pywriter.model.novel import Novel
+from pywriter.model.character import Character
+from pywriter.model.world_element import WorldElement
+from pywriter.model.mention_scanner import MentionScanner
+
+ANNA = ('characters', '1')
+SMITH = ('characters', '2')
+HARBOUR = ('locations', '1')
+
+
+class MentionScannerTest(unittest.TestCase):
+    """Names are counted as whole words, outside of comments."""
+
+    def setUp(self):
+        novel = Novel()
+        for crId, title, fullName in (('1', 'Anna', 'Anna Smith'), ('2', 'Smith', None)):
+            character = Character()
+            character.title = title
+            character.fullName = fullName
+            novel.characters[crId] = character
+            novel.srtCharacters.append(crId)
+        location = WorldElement()
+        location.title = 'Harbour'
+        novel.locations['1'] = location
+        novel.srtLocations.append('1')
+        self._scanner = MentionScanner(novel)
+
+    def test_names(self):
+        self.assertEqual(self._scanner.scan('Anna met Smith at the HARBOUR.'), {ANNA: 1, SMITH: 1, HARBOUR: 1})
+
+    def test_whole_words(self):
+        self.assertEqual(self._scanner.scan('Annabel Smithson, harbours'), {})
+
+    def test_longest_name(self):
+        self.assertEqual(self._scanner.scan('Anna Smith waved.'), {ANNA: 1})
+
+    def test_comments(self):
+        self.assertEqual(self._scanner.scan('/* Anna */ Smith left. /* The\nHarbour */'), {SMITH: 1})
+        self.assertEqual(self._scanner.scan('Anna/* comment */left.'), {ANNA: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
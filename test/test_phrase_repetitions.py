@@ -0,0 +1,80 @@
+"""Tests for finding repeated phrases in a novel.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pywriter.model.novel import Novel
+from pywriter.model.chapter import Chapter
+from pywriter.model.scene import Scene
+from pywriter.model.concordance import Concordance
+from pywriter.model.phrase_repetitions import find_repeated_phrases
+
+
+def get_repetitions(sceneContents, length):
+    """Return a list of (phrase, [(scene ID, word position) of each occurrence]) tuples."""
+    novel = Novel()
+    chapter = Chapter()
+    chapter.chType = 0
+    novel.chapters['1'] = chapter
+    novel.srtChapters = ['1']
+    for i, sceneContent in enumerate(sceneContents, 1):
+        scene = Scene()
+        scene.scType = 0
+        scene.sceneContent = sceneContent
+        novel.scenes[str(i)] = scene
+        chapter.srtScenes.append(str(i))
+    concordance = Concordance(novel)
+    return [(concordance.get_text(positions[0], positions[0] + words),
+             [concordance.get_location(position) for position in positions])
+            for words, positions in find_repeated_phrases(concordance, length)]
+
+
+class PhraseRepetitionsTest(unittest.TestCase):
+    """Repeated phrases are reported with their full length and without overlapping occurrences."""
+
+    def test_full_length(self):
+        repetitions = get_repetitions(['Once upon a time there was a king.',
+                                       'Yes, once upon a time there was a queen.'], 3)
+        self.assertEqual(repetitions, [('Once upon a time there was a', [('1', 0), ('2', 1)])])
+
+    def test_part_occurring_more_often(self):
+        # The shorter phrase is reported with all of its occurrences, not as fragments.
+        repetitions = get_repetitions(['First the cat sat on the mat.',
+                                       'Then the cat sat on the mat.',
+                                       'A cat sat on the mat.'], 3)
+        self.assertEqual(repetitions, [
+            ('the cat sat on the mat.', [('1', 1), ('2', 1)]),
+            ('cat sat on the mat.', [('1', 2), ('2', 2), ('3', 1)]),
+            ])
+
+    def test_overlapping_occurrences(self):
+        repetitions = get_repetitions(['go go go go go go'], 2)
+        self.assertEqual(repetitions, [
+            ('go go go', [('1', 0), ('1', 3)]),
+            ('go go', [('1', 0), ('1', 2), ('1', 4)]),
+            ])
+
+    def test_overlapping_extensions(self):
+        # The phrases extended by a word overlap, e.g. "go no go go" at words 1 and 4.
+        repetitions = get_repetitions(['no go no go go no go go no'], 3)
+        self.assertEqual(repetitions, [
+            ('go no go', [('1', 1), ('1', 4)]),
+            ('no go go', [('1', 2), ('1', 5)]),
+            ('go go no', [('1', 3), ('1', 6)]),
+            ])
+
+    def test_phrases_within_scenes(self):
+        self.assertEqual(get_repetitions(['It was late.', 'It was late.', 'It was'], 3),
+                         [('It was late.', [('1', 0), ('2', 0)])])
+        self.assertEqual(get_repetitions(['So it goes', 'on. So it goes on.'], 1),
+                         [('So it goes', [('1', 0), ('2', 1)]), ('on.', [('2', 0), ('2', 4)])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests for the per-scene prose statistics.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pywriter.model.novel import Novel
+from pywriter.model.chapter import Chapter
+from pywriter.model.scene import Scene
+from pywriter.model.prose_statistics import ProseStatistics
+from pywriter.model.prose_statistics import get_numpy
+
+SCENE_CONTENTS = (
+    '"Hello," she said. "Are you there?" He nodded.',
+    'Mr. Smith waited\nfor "a while',
+    'One “two\nthree” four',
+    '[i]Italic[/i] /* A comment. */ well-known - x -- y—z.',
+    'Émile naïve 🙂 ÉTÉ. İstanbul?! Yes…',
+    '   ',
+    )
+COUNTS = (
+    (8, 3, 12, 18, 35),
+    (6, 2, 8, 6, 23),
+    (4, 1, 5, 7, 15),
+    )
+# words, sentences, syllables, dialogue letters, letters of the first scenes.
+
+
+def get_novel():
+    """Return a novel with a scene per entry of SCENE_CONTENTS."""
+    novel = Novel()
+    chapter = Chapter()
+    chapter.chType = 0
+    novel.chapters['1'] = chapter
+    novel.srtChapters = ['1']
+    for i, sceneContent in enumerate(SCENE_CONTENTS, 1):
+        scene = Scene()
+        scene.scType = 0
+        scene.sceneContent = sceneContent
+        novel.scenes[str(i)] = scene
+        chapter.srtScenes.append(str(i))
+    return novel
+
+
+class ProseStatisticsTest(unittest.TestCase):
+    """The statistics are counted as documented, with and without NumPy."""
+
+    def test_counts(self):
+        novel = get_novel()
+        statistics = ProseStatistics(novel, vectorized=False)
+        for scId, counts in zip(('1', '2', '3'), COUNTS):
+            self.assertEqual(statistics.scenes[scId], statistics.get_statistics(*counts))
+        for scId in novel.scenes:
+            self.assertEqual(statistics.scenes[scId]['words'], novel.scenes[scId].wordCount)
+
+    @unittest.skipIf(get_numpy() is None, 'NumPy is not installed')
+    def test_vectorized(self):
+        novel = get_novel()
+        expected = ProseStatistics(novel, vectorized=False)
+        for batchSize in (1, 40, ProseStatistics.BATCH_SIZE):
+            with self.subTest(batchSize=batchSize):
+                with mock.patch.object(ProseStatistics, 'BATCH_SIZE', batchSize):
+                    statistics = ProseStatistics(novel, vectorized=True)
+                self.assertEqual(statistics.scenes, expected.scenes)
+                self.assertEqual(statistics.totals, expected.totals)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Parity tests for the element tree reader and the streaming yw7 reader.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+from pywriter.pywriter_globals import Error
+from pywriter.model.novel import Novel
+from pywriter.yw.yw7_file import Yw7File
+from pywriter.yw.yw7_stream_file import Yw7StreamFile
+from compare_readers import SPECIAL_CASES
+from compare_readers import read
+from compare_readers import get_state
+from compare_readers import get_differences
+from compare_readers import make_variants
+from yw7_generator import ProjectGenerator
+
+
+class ReadersTest(unittest.TestCase):
+    """Both readers return the same, expected results."""
+
+    def setUp(self):
+        self._workDir = tempfile.mkdtemp()
+        self._specialPath = os.path.join(self._workDir, 'special.yw7')
+        with open(self._specialPath, 'w', encoding='utf-8') as f:
+            f.write(SPECIAL_CASES)
+        self._smallPath = os.path.join(self._workDir, 'small.yw7')
+        ProjectGenerator(chapters=3, scenes=4, words=100).write(self._smallPath)
+
+    def tearDown(self):
+        shutil.rmtree(self._workDir)
+
+    def _read(self, fileClass, filePath, peek=False, mmapThreshold=None):
+        prjFile = fileClass(filePath)
+        if mmapThreshold is not None:
+            prjFile.MMAP_THRESHOLD = mmapThreshold
+        prjFile.novel = Novel()
+        if peek:
+            prjFile.peek()
+        else:
+            prjFile.read()
+        return get_state(prjFile.novel)
+
+    def _assert_parity(self, filePath, **kwargs):
+        expected = self._read(Yw7File, filePath, **kwargs)
+        self.assertEqual(get_differences(expected, self._read(Yw7StreamFile, filePath, **kwargs)), [])
+        return expected
+
+    def test_special_cases(self):
+        state = self._assert_parity(self._specialPath)
+        self.assertEqual(state['title'], 'Special & cases')
+        self.assertEqual(state['wordCountStart'], 1000)
+        self.assertEqual(state['wordTarget'], 0)
+        self.assertEqual((state['languageCode'], state['countryCode']), ('en', 'GB'))
+        self.assertEqual(state['languages'], ['fr-FR'])
+        self.assertEqual(state['kwVar'], {'Field_LanguageCode': 'de', 'Field_CountryCode': 'DE'})
+        self.assertEqual(state['locations']['1']['tags'], ['sea', 'water'])
+        self.assertTrue(state['characters']['1']['isMajor'])
+        self.assertEqual(state['items']['1']['kwVar'], {'Field_Link': 'a'})
+
+        scenes = state['scenes']
+        self.assertEqual([scenes[scId]['scType'] for scId in '12345'], [0, 1, 2, 2, 1])
+        self.assertEqual(scenes['1']['sceneContent'],
+                         'Hello [i]world[/i] & <friends>.\n/* A comment */ Second line|pipe.')
+        self.assertEqual(scenes['1']['wordCount'], 6)
+        self.assertEqual(scenes['1']['characters'], ['2', '1'])
+        self.assertEqual(scenes['1']['items'], ['1'])
+        self.assertEqual((scenes['1']['date'], scenes['1']['time']), ('2023-01-02', '03:04:05'))
+        self.assertEqual((scenes['1']['scnMode'], scenes['1']['scnArcs']), (2, 'A;B'))
+        self.assertTrue(scenes['1']['isReactionScene'])
+        self.assertEqual((scenes['2']['day'], scenes['2']['time']), ('3', '07:00:00'))
+        self.assertTrue(scenes['2']['appendToPrev'])
+        self.assertIsNone(scenes['2']['sceneContent'])
+
+        chapters = state['chapters']
+        self.assertEqual([chapters[chId]['chType'] for chId in '12345'], [0, 0, 1, 3, 2])
+        self.assertEqual(chapters['1']['chLevel'], 1)
+        self.assertEqual(chapters['2']['srtScenes'], ['1', '2', '3', '4'])
+        self.assertTrue(chapters['2']['suppressChapterBreak'])
+        self.assertTrue(chapters['5']['isTrash'])
+        self.assertEqual(state['crossReferences']['characters'], {'1': ['1'], '2': ['1']})
+
+    def test_synthetic_project(self):
+        state = self._assert_parity(self._smallPath)
+        self.assertEqual(len(state['scenes']), 12)
+
+    def test_variants(self):
+        for name, variantPath in make_variants('special', self._specialPath, self._workDir) + \
+                make_variants('small', self._smallPath, self._workDir):
+            with self.subTest(variant=name):
+                self._assert_parity(variantPath)
+
+    def test_mapped(self):
+        for filePath in (self._specialPath, self._smallPath):
+            with self.subTest(filePath=filePath):
+                mapped = self._assert_parity(filePath, mmapThreshold=0)
+                self.assertEqual(get_differences(self._assert_parity(filePath), mapped), [])
+
+    def test_peek(self):
+        for filePath in (self._specialPath, self._smallPath):
+            with self.subTest(filePath=filePath):
+                self._assert_parity(filePath, peek=True)
+
+    def test_locked(self):
+        with open(f'{self._smallPath}.lock', 'w'):
+            pass
+        for fileClass in (Yw7File, Yw7StreamFile):
+            for peek in (False, True):
+                with self.subTest(fileClass=fileClass.__name__, peek=peek):
+                    with self.assertRaises(Error):
+                        self._read(fileClass, self._smallPath, peek=peek)
+
+    def test_write(self):
+        states = []
+        for fileClass in (Yw7File, Yw7StreamFile):
+            copyPath = os.path.join(self._workDir, f'{fileClass.__name__}.yw7')
+            shutil.copyfile(self._specialPath, copyPath)
+            read(fileClass, copyPath).write()
+            states.append(get_state(read(Yw7File, copyPath).novel))
+        self.assertEqual(get_differences(*states), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,409 @@
+"""Run the yw-viewer benchmark suite on synthetic yWriter 7 projects.
+
+usage: benchmark.py [-h] [--chapters N] [--scenes N] [--words N] [--characters N] [--locations N]
+                    [--tags N] [--markup DENSITY] [--repeat N] [--label LABEL]
+                    [--history FILE] [--threshold PERCENT] [--memory] [--workers N]
+                    [--startup]
+
+Run this script from the tools directory.
+
+The results are appended to a JSON history file. Each run is compared
+with the latest run of the history that used the same project parameters,
+and benchmarks that became slower by more than the threshold are reported.
+With the --memory option, the peak of traced memory per reading and view building 
+phase is recorded as well, and phases needing more memory than the threshold 
+are reported. The top allocation sites by module are printed for each phase.
+With the --startup option, the viewer is started in a new Python process 
+per run, and the times until the main window is painted, until the 
+project is shown, and until the scene contents are loaded are recorded.
+This requires a display.
+The exit code is 1 if a regression was detected, so the suite can be
+used in a release script.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+from time import time
+from types import SimpleNamespace
+
+sys.path.insert(0, f'{os.getcwd()}/../src')
+from pywriter.diag.profiler import PROFILER
+from pywriter.model.novel import Novel
+from pywriter.model.scene import Scene
+from pywriter.model.mention_scanner import MentionScanner
+from pywriter.model.concordance import Concordance
+from pywriter.model.phrase_repetitions import find_repeated_phrases
+from pywriter.model.prose_statistics import get_numpy
+from pywriter.model.prose_statistics import ProseStatistics
+from pywriter.yw.yw7_file import Yw7File
+from ywviewerlib.file_viewer import FileViewer
+from yw7_generator import ProjectGenerator
+
+HISTORY_FILE = 'benchmark_history.json'
+STARTUP_SCRIPT = '''
+import sys
+from time import time
+sys.path.insert(0, {srcPath!r})
+from ywviewerlib.yw7_viewer_tk import Yw7ViewerTk
+viewer = Yw7ViewerTk('yw-viewer benchmark')
+viewer.root.update()
+firstPaint = time()
+viewer.open_project({filePath!r})
+viewer.root.update()
+firstContent = time()
+while viewer._loading:
+    viewer.root.update()
+loaded = time()
+viewer.root.destroy()
+print(firstPaint, firstContent, loaded)
+'''
+# Startup steps of yw_viewer_.pyw, without configuration file, printing the wall clock times.
+
+
+class HeadlessViewer(FileViewer):
+    """FileViewer without text box, for timing the view building without a display."""
+
+    def __init__(self, prjFile):
+        self._init_state(SimpleNamespace(novel=prjFile.novel, prjFile=prjFile))
+
+
+def time_it(function, repeat):
+    """Run function repeat times and return the minimum and the median duration in seconds.
+
+    The setup work of each run is done by function itself, and returns the
+    callable to be timed.
+    """
+    durations = []
+    for __ in range(repeat):
+        timedFunction = function()
+        start = perf_counter()
+        timedFunction()
+        durations.append(perf_counter() - start)
+    return min(durations), median(durations)
+
+
+def read_project(filePath, workers=1):
+    """Return a Yw7File instance with the project read from filePath."""
+    prjFile = Yw7File(filePath, workers=workers)
+    prjFile.novel = Novel()
+    prjFile.read()
+    return prjFile
+
+
+def run_benchmarks(filePath, workDir, repeat, workers):
+    """Return a dictionary with the results of all benchmarks.
+
+    Positional arguments:
+        filePath: str -- path of the project to be read.
+        workDir: str -- directory for written files.
+        repeat: int -- number of runs per benchmark.
+        workers: int -- number of worker processes for an additional parallel reading benchmark.
+    """
+    results = {}
+
+    def read():
+        prjFile = Yw7File(filePath)
+        prjFile.novel = Novel()
+        return prjFile.read
+
+    def read_parallel():
+        prjFile = Yw7File(filePath, workers=workers)
+        prjFile.novel = Novel()
+        return prjFile.read
+
+    def peek():
+        prjFile = Yw7File(filePath)
+        prjFile.novel = Novel()
+        return prjFile.peek
+
+    def reread():
+        # The scene cache is filled by the first reading.
+        prjFile = read_project(filePath)
+        prjFile.novel = Novel()
+        return prjFile.read
+
+    writePath = os.path.join(workDir, 'write.yw7')
+
+    def write():
+        prjFile = read_project(filePath)
+        prjFile.filePath = writePath
+        return prjFile.write
+
+    prjFile = read_project(filePath)
+    novel = prjFile.novel
+    texts = [scene.sceneContent for scene in novel.scenes.values()]
+
+    def build_views():
+        return HeadlessViewer(prjFile).build_views
+
+    def rebuild_views():
+        viewer = HeadlessViewer(prjFile)
+        viewer.build_views()
+        return viewer.build_views
+
+    def count_words():
+
+        def set_contents():
+            for text in texts:
+                Scene().sceneContent = text
+
+        return set_contents
+
+    def get_languages():
+        return novel.get_languages
+
+    def scan_mentions():
+
+        def scan():
+            MentionScanner(novel).scan_novel(novel)
+
+        return scan
+
+    def build_concordance():
+
+        def build():
+            Concordance(novel)
+
+        return build
+
+    concordance = Concordance(novel)
+
+    def query_concordance():
+
+        def query():
+            concordance.get_frequencies(100)
+            for chId in concordance.chapterRanges:
+                concordance.get_overused_terms(chId, 10)
+            concordance.get_kwic('the', 6, 1000)
+
+        return query
+
+    def find_repetitions():
+
+        def find():
+            find_repeated_phrases(concordance, 7)
+
+        return find
+
+    def compute_statistics():
+
+        def compute():
+            ProseStatistics(novel, vectorized=False)
+
+        return compute
+
+    def compute_statistics_vectorized():
+
+        def compute():
+            ProseStatistics(novel, vectorized=True)
+
+        return compute
+
+    benchmarks = [
+            ('Yw7File.read', read),
+            ('Yw7File.read (unchanged file)', reread),
+            ('Yw7File.peek', peek),
+            ('Yw7File.write', write),
+            ('FileViewer.build_views', build_views),
+            ('FileViewer.build_views (cached scenes)', rebuild_views),
+            ('Scene.sceneContent counting', count_words),
+            ('Novel.get_languages', get_languages),
+            ('MentionScanner.scan_novel', scan_mentions),
+            ('Concordance build', build_concordance),
+            ('Concordance queries', query_concordance),
+            ('find_repeated_phrases', find_repetitions),
+            ('ProseStatistics (Python)', compute_statistics),
+            ]
+    if get_numpy() is not None:
+        benchmarks.append(('ProseStatistics (NumPy)', compute_statistics_vectorized))
+    if workers > 1:
+        benchmarks.insert(1, (f'Yw7File.read ({workers} workers)', read_parallel))
+    for name, function in benchmarks:
+        minimum, middle = time_it(function, repeat)
+        results[name] = {'min': minimum, 'median': middle}
+        print(f'    {name:45}{minimum * 1000:10.1f} ms  (median {middle * 1000:.1f} ms)')
+    return results
+
+
+def run_memory_profile(filePath):
+    """Return a dictionary with the peak of traced memory in bytes per phase.
+
+    Positional arguments:
+        filePath: str -- path of the project to be read.
+    """
+    PROFILER.enable_memory()
+    PROFILER.reset()
+    try:
+        prjFile = read_project(filePath)
+        with PROFILER.phase('build views'):
+            HeadlessViewer(prjFile).build_views()
+        print(PROFILER.get_memory_report())
+        return {name: record['peak'] for name, record in PROFILER.memory.items()}
+
+    finally:
+        PROFILER.disable_memory()
+        PROFILER.disable()
+
+
+def run_startup_benchmark(filePath, repeat):
+    """Return a dictionary with the results of the cold start benchmarks.
+
+    Positional arguments:
+        filePath: str -- path of the project to be opened.
+        repeat: int -- number of viewer starts.
+
+    Return an empty dictionary if the viewer can not be started, e.g. without a display.
+    """
+    script = STARTUP_SCRIPT.format(srcPath=os.path.abspath('../src'), filePath=filePath)
+    firstPaint = []
+    firstContent = []
+    loaded = []
+    for __ in range(repeat):
+        start = time()
+        process = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True)
+        if process.returncode != 0:
+            print(f'    Cold start skipped: {process.stderr.strip().splitlines()[-1]}')
+            return {}
+
+        paintTime, contentTime, loadedTime = (float(value) for value in process.stdout.split())
+        firstPaint.append(paintTime - start)
+        firstContent.append(contentTime - start)
+        loaded.append(loadedTime - start)
+    results = {}
+    for name, durations in (
+            ('Cold start: first paint', firstPaint),
+            ('Cold start: first content', firstContent),
+            ('Cold start: scene contents loaded', loaded),
+            ):
+        results[name] = {'min': min(durations), 'median': median(durations)}
+        print(f'    {name:45}{results[name]["min"] * 1000:10.1f} ms  (median {results[name]["median"] * 1000:.1f} ms)')
+    return results
+
+
+def get_version():
+    """Return a description of the checked out source code version."""
+    try:
+        return subprocess.run(['git', 'describe', '--tags', '--always', '--dirty'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except:
+        return 'unknown'
+
+
+def load_history(historyPath):
+    """Return the list of runs stored in the history file."""
+    try:
+        with open(historyPath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    except FileNotFoundError:
+        return []
+
+
+def find_regressions(history, run, threshold):
+    """Return a list of messages about benchmarks that became slower.
+
+    Positional arguments:
+        history -- list of previous runs.
+        run -- dict: the current run.
+        threshold -- float: tolerated slowdown in percent.
+    """
+    for previous in reversed(history):
+        if previous['parameters'] == run['parameters']:
+            break
+
+    else:
+        return []
+
+    messages = []
+    for name, result in run['results'].items():
+        if not name in previous['results']:
+            continue
+
+        before = previous['results'][name]['min']
+        if before and (result['min'] - before) / before * 100 > threshold:
+            messages.append(f'{name}: {before * 1000:.1f} ms ({previous["version"]}) -> {result["min"] * 1000:.1f} ms')
+    for name, peak in run.get('memory', {}).items():
+        before = previous.get('memory', {}).get(name, None)
+        if before and (peak - before) / before * 100 > threshold:
+            messages.append(f'{name} (memory): {before / 1e6:.1f} MB ({previous["version"]}) -> {peak / 1e6:.1f} MB')
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the yw-viewer benchmark suite.')
+    parser.add_argument('--chapters', type=int, default=50, help='number of chapters')
+    parser.add_argument('--scenes', type=int, default=10, help='number of scenes per chapter')
+    parser.add_argument('--words', type=int, default=1500, help='number of words per scene')
+    parser.add_argument('--characters', type=int, default=20, help='number of characters')
+    parser.add_argument('--locations', type=int, default=10, help='number of locations')
+    parser.add_argument('--tags', type=int, default=10, help='number of different scene tags')
+    parser.add_argument('--markup', type=float, default=0.02, help='markup density (0 ... 1)')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs per benchmark')
+    parser.add_argument('--label', default=None, help='version label (default: git describe)')
+    parser.add_argument('--history', default=HISTORY_FILE, help='JSON history file')
+    parser.add_argument('--threshold', type=float, default=10.0, help='tolerated slowdown in percent')
+    parser.add_argument('--memory', action='store_true', help='record the peak memory per phase')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes for parallel reading')
+    parser.add_argument('--startup', action='store_true', help='measure the time to first paint and first content')
+    args = parser.parse_args()
+    parameters = {
+        'chapters': args.chapters,
+        'scenes': args.scenes,
+        'words': args.words,
+        'characters': args.characters,
+        'locations': args.locations,
+        'tags': args.tags,
+        'markup': args.markup,
+        }
+    workDir = tempfile.mkdtemp()
+    try:
+        filePath = os.path.join(workDir, 'benchmark.yw7')
+        ProjectGenerator(**parameters).write(filePath)
+        print(f'{args.chapters} chapters, {args.scenes} scenes per chapter, {args.words} words per scene '
+              f'({os.path.getsize(filePath) / 1e6:.1f} MB):')
+        results = run_benchmarks(filePath, workDir, args.repeat, args.workers)
+        if args.startup:
+            results.update(run_startup_benchmark(filePath, args.repeat))
+        if args.memory:
+            memory = run_memory_profile(filePath)
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+    run = {
+        'version': args.label or get_version(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': parameters,
+        'results': results,
+        }
+    if args.memory:
+        run['memory'] = memory
+    history = load_history(args.history)
+    regressions = find_regressions(history, run, args.threshold)
+    history.append(run)
+    with open(args.history, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    if regressions:
+        print(f'Worse by more than {args.threshold}%:')
+        for message in regressions:
+            print(f'    {message}')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Compare the markup stripping of the viewer with the former regular expression.
+
+usage: benchmark_markup.py [scenes] [words]
+
+Run this script from the tools directory.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import re
+import sys
+import random
+from timeit import repeat
+sys.path.insert(0, f'{os.getcwd()}/../src')
+from pywriter.model.markup import strip_markup
+from pywriter.model.markup import tokenize
+
+WORDS = ['The', 'quick', 'brown', 'fox', 'jumps', 'over', 'the', 'lazy', 'dog.', 'And', 'then', 'some', 'more', 'text,']
+TAGS = ['[i]{}[/i]', '[b]{}[/b]', '[lang=de-DE]{}[/lang=de-DE]', '[u]{}[/u]']
+COMMENTS = ['/* {} */']
+
+
+def convert_from_yw(text):
+    """Remove yw7 markup from text (former FileViewer implementation)."""
+    return re.sub(r'\[\/*[i|b|h|c|r|s|u]\d*\]', '', text)
+
+
+def tokenize_runs(text):
+    """Return the formatted runs of text as a list."""
+    return list(tokenize(text))
+
+
+def make_scenes(sceneCount, wordCount, markup, seed=1):
+    """Return a list of scene texts with random markup."""
+    rnd = random.Random(seed)
+    scenes = []
+    for __ in range(sceneCount):
+        words = []
+        for __ in range(wordCount):
+            word = rnd.choice(WORDS)
+            if rnd.random() < 0.05:
+                word = rnd.choice(markup).format(word)
+            words.append(word)
+        scenes.append(' '.join(words))
+    return scenes
+
+
+def main(sceneCount=2000, wordCount=1000):
+    for title, markup in (('Tags', TAGS), ('Tags and comments', TAGS + COMMENTS)):
+        print(f'{title} ({sceneCount} scenes, {wordCount} words each):')
+        scenes = make_scenes(sceneCount, wordCount, markup)
+        for name, function in (('former regex', convert_from_yw), ('strip_markup', strip_markup), ('tokenize', tokenize_runs)):
+            timing = min(repeat(lambda: [function(text) for text in scenes], number=1, repeat=5))
+            print(f'    {name:15}{timing * 1000:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
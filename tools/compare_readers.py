@@ -0,0 +1,289 @@
+"""Compare the streaming yw7 reader with the element tree reader.
+
+usage: compare_readers.py [-h] [--chapters N] [--scenes N] [--words N] [--repeat N]
+
+Run this script from the tools directory.
+
+Each test project is read with Yw7File and with Yw7StreamFile, and all
+instance variables of the novel, the chapters, scenes, characters,
+locations, items, and project notes are compared. The test projects are:
+- a project with special cases like custom fields, project notes,
+  dates and times, and chapter and scene types,
+- a synthetic project, also UTF-16 encoded, with byte order mark,
+  with Windows line breaks, and read via memory mapping.
+Then a written and re-read copy is compared, as well as the results of
+peeking into the projects. Finally, the reading time
+and the peak of traced memory is measured for the synthetic project.
+The exit code is 1 if the results differ.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, f'{os.getcwd()}/../src')
+from pywriter.model.novel import Novel
+from pywriter.yw.yw7_file import Yw7File
+from pywriter.yw.yw7_stream_file import Yw7StreamFile
+from yw7_generator import ProjectGenerator
+
+SPECIAL_CASES = '''<?xml version="1.0" encoding="utf-8"?>
+<YWRITER7>
+<PROJECT>
+<Ver>7</Ver>
+<Title><![CDATA[Special & cases]]></Title>
+<AuthorName><![CDATA[yw-viewer]]></AuthorName>
+<Bio><![CDATA[Author's bio]]></Bio>
+<Desc><![CDATA[Line 1
+Line 2]]></Desc>
+<FieldTitle1><![CDATA[Lead]]></FieldTitle1>
+<FieldTitle2><![CDATA[]]></FieldTitle2>
+<WordCountStart>1000</WordCountStart>
+<WordTarget>x</WordTarget>
+<Fields>
+<Field_LanguageCode>de</Field_LanguageCode>
+<Field_CountryCode>DE</Field_CountryCode>
+</Fields>
+</PROJECT>
+<LOCATIONS>
+<LOCATION><ID>1</ID><Title><![CDATA[Harbour]]></Title><ImageFile><![CDATA[harbour.png]]></ImageFile>
+<Desc><![CDATA[By the sea]]></Desc><AKA><![CDATA[Port]]></AKA><Tags><![CDATA[ sea ;water;sea]]></Tags>
+<Fields><Field_Link><![CDATA[https://example.com]]></Field_Link></Fields></LOCATION>
+<LOCATION><ID>2</ID><Title/><Tags/></LOCATION>
+</LOCATIONS>
+<ITEMS>
+<ITEM><ID>1</ID><Title><![CDATA[Letter]]></Title><Fields/><Fields><Field_Link>a</Field_Link></Fields></ITEM>
+</ITEMS>
+<CHARACTERS>
+<CHARACTER><ID>1</ID><Title><![CDATA[Anna]]></Title><FullName><![CDATA[Anna Miller]]></FullName>
+<Desc><![CDATA[Tall]]></Desc><Notes><![CDATA[Note]]></Notes><Bio><![CDATA[Born]]></Bio>
+<Goals><![CDATA[Win]]></Goals><Major>-1</Major><Tags><![CDATA[a;b]]></Tags>
+<Fields><Field_BirthDate>1990-01-01</Field_BirthDate><Field_Link/></Fields></CHARACTER>
+<CHARACTER><ID>2</ID><Title><![CDATA[Ben]]></Title></CHARACTER>
+</CHARACTERS>
+<PROJECTVARS>
+<PROJECTVAR><ID>1</ID><Title>Language</Title><Desc><![CDATA[en]]></Desc></PROJECTVAR>
+<PROJECTVAR><ID>2</ID><Title>Country</Title><Desc><![CDATA[GB]]></Desc></PROJECTVAR>
+<PROJECTVAR><ID>3</ID><Title>lang=fr-FR</Title><Desc><![CDATA[<HTM <SPAN LANG="fr-FR"> /HTM>]]></Desc></PROJECTVAR>
+<PROJECTVAR><ID>4</ID><Title>lang=a=b</Title></PROJECTVAR>
+</PROJECTVARS>
+<PROJECTNOTES>
+<PROJECTNOTE><ID>1</ID><Title><![CDATA[Research]]></Title><Desc><![CDATA[Read more]]></Desc></PROJECTNOTE>
+<PROJECTNOTE><ID>2</ID><Title><![CDATA[Ideas]]></Title></PROJECTNOTE>
+</PROJECTNOTES>
+<SCENES>
+<SCENE><ID>1</ID><Title><![CDATA[Normal]]></Title><Desc><![CDATA[Scene & desc]]></Desc>
+<SceneContent><![CDATA[Hello [i]world[/i] & <friends>.
+/* A comment */ Second line|pipe.]]></SceneContent><WordCount>7</WordCount>
+<Status>2</Status><Notes><![CDATA[Scene notes]]></Notes><Tags><![CDATA[x; y]]></Tags>
+<Field1>3</Field1><Field2>4</Field2><Field3>5</Field3><Field4>6</Field4>
+<SpecificDateTime>2023-01-02 03:04:05</SpecificDateTime><LastsDays>1</LastsDays><LastsHours>2</LastsHours>
+<LastsMinutes>3</LastsMinutes><ReactionScene>-1</ReactionScene><Goal><![CDATA[Goal]]></Goal>
+<Conflict><![CDATA[Conflict]]></Conflict><Outcome><![CDATA[Outcome]]></Outcome><ImageFile><![CDATA[a.png]]></ImageFile>
+<Characters><CharID>2</CharID><CharID>1</CharID><CharID>9</CharID></Characters>
+<Locations><LocID>1</LocID></Locations><Items><ItemID>1</ItemID><ItemID>7</ItemID></Items>
+<Fields><Field_SceneArcs><![CDATA[A;B]]></Field_SceneArcs><Field_SceneMode>2</Field_SceneMode></Fields></SCENE>
+<SCENE><ID>2</ID><Title><![CDATA[Notes scene]]></Title><SceneContent><![CDATA[]]></SceneContent>
+<Fields><Field_SceneType>1</Field_SceneType></Fields><Unused>-1</Unused><ExportCondSpecific>-1</ExportCondSpecific>
+<Day>3</Day><Hour>7</Hour><AppendToPrev>-1</AppendToPrev><SubPlot>-1</SubPlot><Characters/></SCENE>
+<SCENE><ID>3</ID><Title><![CDATA[Unused scene]]></Title><Unused>-1</Unused><ExportCondSpecific>-1</ExportCondSpecific>
+<ExportWhenRTF>-1</ExportWhenRTF><Day>x</Day><Minute>5</Minute><SpecificDateTime>invalid</SpecificDateTime>
+<Fields><Field_SceneType>0</Field_SceneType><Field_SceneMode>x</Field_SceneMode></Fields>
+<Fields><Field_SceneType>2</Field_SceneType></Fields></SCENE>
+<SCENE><ID>4</ID><Title><![CDATA[Todo scene]]></Title><Fields><Field_SceneType>2</Field_SceneType></Fields>
+<SceneContent><![CDATA[[lang=fr-FR]Bonjour[/lang=fr-FR] tout le monde.]]></SceneContent></SCENE>
+<SCENE><ID>5</ID><Title><![CDATA[In a notes chapter]]></Title><SceneContent><![CDATA[Text]]></SceneContent></SCENE>
+</SCENES>
+<CHAPTERS>
+<CHAPTER><ID>1</ID><Title><![CDATA[Part one]]></Title><SectionStart>-1</SectionStart><Type>0</Type><ChapterType>0</ChapterType>
+<Fields><Field_SuppressChapterTitle>1</Field_SuppressChapterTitle></Fields><Scenes/></CHAPTER>
+<CHAPTER><ID>2</ID><Title><![CDATA[@Chapter one]]></Title><Desc><![CDATA[Chapter desc]]></Desc><Type>0</Type>
+<Fields><Field_IsTrash>0</Field_IsTrash><Field_SuppressChapterBreak>1</Field_SuppressChapterBreak></Fields>
+<Scenes><ScID>1</ScID><ScID>2</ScID><ScID>3</ScID><ScID>4</ScID><ScID>99</ScID></Scenes></CHAPTER>
+<CHAPTER><ID>3</ID><Title><![CDATA[Notes]]></Title><Type>1</Type><Fields/><Scenes><ScID>5</ScID></Scenes></CHAPTER>
+<CHAPTER><ID>4</ID><Title><![CDATA[Unused]]></Title><Type>0</Type><ChapterType>0</ChapterType><Unused>-1</Unused></CHAPTER>
+<CHAPTER><ID>5</ID><Title><![CDATA[Trash]]></Title><ChapterType>2</ChapterType>
+<Fields><Field_IsTrash>1</Field_IsTrash></Fields></CHAPTER>
+</CHAPTERS>
+</YWRITER7>
+'''
+
+
+def read(fileClass, filePath, peek=False):
+    """Return a fileClass instance with the project read from filePath."""
+    prjFile = fileClass(filePath)
+    prjFile.novel = Novel()
+    if peek:
+        prjFile.peek()
+    else:
+        prjFile.read()
+    return prjFile
+
+
+def get_state(novel):
+    """Return a dictionary with all instance variables of the novel and its elements."""
+
+    def element_state(element):
+        state = {name: value for name, value in vars(element).items() if not name.startswith('_')}
+        for name in ('sceneContent', 'notes'):
+            if hasattr(element, name):
+                state[name] = getattr(element, name)
+        return state
+
+    state = {name: value for name, value in vars(novel).items() if not name.startswith('_') and not isinstance(value, dict)}
+    state['kwVar'] = novel.kwVar
+    for name in ('chapters', 'scenes', 'characters', 'locations', 'items', 'projectNotes'):
+        state[name] = {elementId: element_state(element) for elementId, element in getattr(novel, name).items()}
+    crossReferences = novel.get_cross_references()
+    readingOrder = novel.get_reading_order()
+    state['crossReferences'] = {
+        'characters': {crId: crossReferences.get_character_scenes(crId, readingOrder) for crId in novel.srtCharacters},
+        'locations': {lcId: crossReferences.get_location_scenes(lcId, readingOrder) for lcId in novel.srtLocations},
+        'items': {itId: crossReferences.get_item_scenes(itId, readingOrder) for itId in novel.srtItems},
+        }
+    return state
+
+
+def get_differences(expected, actual, path=''):
+    """Return a list of messages about the differences between two states."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        messages = []
+        for key in expected.keys() | actual.keys():
+            messages.extend(get_differences(expected.get(key, '(missing)'), actual.get(key, '(missing)'), f'{path}/{key}'))
+        return messages
+
+    if expected != actual:
+        return [f'{path}: {expected!r} != {actual!r}']
+
+    return []
+
+
+def check_parity(name, filePath, peek=False):
+    """Compare the results of both readers, print the differences, and return True if there are none."""
+    expected = get_state(read(Yw7File, filePath, peek).novel)
+    actual = get_state(read(Yw7StreamFile, filePath, peek).novel)
+    differences = get_differences(expected, actual)
+    if differences:
+        print(f'    {name}: {len(differences)} differences')
+        for message in differences[:10]:
+            print(f'        {message}')
+        return False
+
+    print(f'    {name}: same results')
+    return True
+
+
+def check_write(name, filePath, workDir):
+    """Write the project read by both readers, compare the re-read copies, and return True if they are equal."""
+    states = []
+    for fileClass in (Yw7File, Yw7StreamFile):
+        copyPath = os.path.join(workDir, f'{fileClass.__name__}.yw7')
+        shutil.copyfile(filePath, copyPath)
+        prjFile = read(fileClass, copyPath)
+        prjFile.write()
+        states.append(get_state(read(Yw7File, prjFile.filePath).novel))
+    differences = get_differences(*states)
+    if differences:
+        print(f'    {name}, written and re-read: {len(differences)} differences')
+        for message in differences[:10]:
+            print(f'        {message}')
+        return False
+
+    print(f'    {name}, written and re-read: same results')
+    return True
+
+
+def measure(fileClass, filePath, repeat):
+    """Return the minimum reading time in seconds and the peak of traced memory in bytes."""
+    durations = []
+    for __ in range(repeat):
+        prjFile = fileClass(filePath)
+        prjFile.novel = Novel()
+        start = perf_counter()
+        prjFile.read()
+        durations.append(perf_counter() - start)
+    tracemalloc.start()
+    try:
+        prjFile = read(fileClass, filePath)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(durations), peak, current
+
+
+def make_variants(prefix, filePath, workDir):
+    """Return a list of (name, path) tuples of encoding and line break variants of a project file."""
+    with open(filePath, 'r', encoding='utf-8') as f:
+        text = f.read()
+    variants = []
+    for name, data in (
+            ('UTF-16', text.encode('utf-16')),
+            ('UTF-16-LE without byte order mark', text.encode('utf-16-le')),
+            ('UTF-8 with byte order mark', text.encode('utf-8-sig')),
+            ('Windows line breaks', text.replace('\n', '\r\n').encode('utf-8')),
+            ('control characters', text.replace('Chapter', 'Chap\x01ter').encode('utf-8')),
+            ):
+        variantPath = os.path.join(workDir, f'{prefix}, {name}.yw7')
+        with open(variantPath, 'wb') as f:
+            f.write(data)
+        variants.append((f'{prefix}, {name}', variantPath))
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the streaming yw7 reader with the element tree reader.')
+    parser.add_argument('--chapters', type=int, default=50, help='number of chapters of the synthetic project')
+    parser.add_argument('--scenes', type=int, default=10, help='number of scenes per chapter')
+    parser.add_argument('--words', type=int, default=1500, help='number of words per scene')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs for the time measurement')
+    args = parser.parse_args()
+    workDir = tempfile.mkdtemp()
+    try:
+        specialPath = os.path.join(workDir, 'special.yw7')
+        with open(specialPath, 'w', encoding='utf-8') as f:
+            f.write(SPECIAL_CASES)
+        smallPath = os.path.join(workDir, 'small.yw7')
+        ProjectGenerator(chapters=5, scenes=5, words=300).write(smallPath)
+        filePath = os.path.join(workDir, 'benchmark.yw7')
+        ProjectGenerator(chapters=args.chapters, scenes=args.scenes, words=args.words).write(filePath)
+
+        print('Parity:')
+        ok = check_parity('special cases', specialPath)
+        ok = check_parity('synthetic project', smallPath) and ok
+        for name, variantPath in make_variants('special cases', specialPath, workDir) + make_variants('synthetic project', smallPath, workDir):
+            ok = check_parity(name, variantPath) and ok
+        threshold = Yw7File.MMAP_THRESHOLD
+        Yw7File.MMAP_THRESHOLD = 0
+        try:
+            ok = check_parity('memory-mapped special cases', specialPath) and ok
+            ok = check_parity('memory-mapped synthetic project', smallPath) and ok
+        finally:
+            Yw7File.MMAP_THRESHOLD = threshold
+        ok = check_write('special cases', specialPath, workDir) and ok
+        ok = check_parity('special cases, peeked', specialPath, peek=True) and ok
+        ok = check_parity('synthetic project, peeked', smallPath, peek=True) and ok
+
+        print(f'{args.chapters} chapters, {args.scenes} scenes per chapter, {args.words} words per scene '
+              f'({os.path.getsize(filePath) / 1e6:.1f} MB):')
+        ok = check_parity('synthetic project', filePath) and ok
+        for fileClass in (Yw7File, Yw7StreamFile):
+            duration, peak, current = measure(fileClass, filePath, args.repeat)
+            print(f'    {fileClass.__name__:15}{duration * 1000:10.1f} ms, '
+                  f'peak {peak / 1e6:.1f} MB, kept {current / 1e6:.1f} MB')
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+    if not ok:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
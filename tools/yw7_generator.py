@@ -0,0 +1,253 @@
+"""Generate synthetic yWriter 7 projects for benchmarking.
+
+usage: yw7_generator.py [-h] [--chapters N] [--scenes N] [--words N] [--characters N]
+                        [--locations N] [--tags N] [--markup DENSITY] [--seed N] filePath
+
+The generated projects are reproducible: the same parameters and seed
+always produce the same file.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-viewer
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import argparse
+import random
+import re
+
+VOCABULARY = [
+    'the', 'the', 'the', 'a', 'a', 'of', 'of', 'and', 'and', 'to', 'in', 'was', 'he', 'she', 'it', 'that', 'had',
+    'with', 'her', 'his', 'on', 'at', 'for', 'not', 'but', 'they', 'all', 'from', 'were', 'been', 'would', 'could',
+    'said', 'looked', 'turned', 'walked', 'thought', 'knew', 'door', 'room', 'night', 'house', 'street', 'window',
+    'hand', 'face', 'voice', 'moment', 'light', 'dark', 'old', 'little', 'long', 'quiet', 'again', 'never', 'before',
+    'through', 'nothing', 'something', 'letter', 'train', 'rain', 'morning', 'evening', 'answer', 'question',
+    'slowly', 'suddenly', 'almost', 'well-known', 'twenty-one', "didn't", "wasn't", 'rose', 'fell', 'asked', 'smiled',
+    ]
+PUNCTUATION = ['.', '.', '.', ',', ',', ',', ';', '?', '!', ' -']
+FORMATTING = ['[i]{}[/i]', '[i]{}[/i]', '[b]{}[/b]', '[u]{}[/u]', '[s]{}[/s]']
+LANGUAGES = ['de-DE', 'fr-FR', 'en-GB']
+FIRST_NAMES = ['Anna', 'Ben', 'Clara', 'David', 'Emma', 'Felix', 'Grace', 'Henry', 'Ida', 'Jonas', 'Kate', 'Leo']
+LAST_NAMES = ['Miller', 'Smith', 'Walker', 'Young', 'Baker', 'Clark', 'Hall', 'Wright', 'Green', 'Adams']
+PLACES = ['Harbour', 'Station', 'Market', 'Tower', 'Garden', 'Bridge', 'Library', 'Chapel', 'Inn', 'Mill']
+WORDS_PER_PARAGRAPH = 80
+NON_LETTERS = re.compile(r'\[.+?\]|\/\*.+?\*\/|\n|\r')
+
+
+def cdata(text):
+    """Return text as an XML CDATA section."""
+    return f'<![CDATA[{text}]]>'
+
+
+class ProjectGenerator:
+    """Synthetic yWriter 7 project generator.
+
+    Public methods:
+        write(filePath) -- write the project to a .yw7 file.
+        get_xml() -- return the project as XML text.
+
+    Public instance variables:
+        chapters -- int: number of chapters.
+        scenes -- int: number of scenes per chapter.
+        words -- int: number of words per scene.
+        characters -- int: number of characters.
+        locations -- int: number of locations.
+        tags -- int: number of different scene tags.
+        markup -- float: probability of a word being formatted, commented, or language tagged.
+        texts -- list of str: scene contents used in turn instead of random texts, or None.
+    """
+
+    def __init__(self, chapters=10, scenes=10, words=1000, characters=20, locations=10, tags=10, markup=0.02, seed=1,
+                 texts=None):
+        """Set the project parameters.
+
+        Optional arguments:
+            chapters: int -- number of chapters.
+            scenes: int -- number of scenes per chapter.
+            words: int -- number of words per scene.
+            characters: int -- number of characters.
+            locations: int -- number of locations.
+            tags: int -- number of different scene tags.
+            markup: float -- probability of a word being formatted, commented, or language tagged.
+            seed: int -- random seed.
+            texts: list of str -- scene contents used in turn instead of random texts.
+        """
+        self.chapters = chapters
+        self.scenes = scenes
+        self.words = words
+        self.characters = characters
+        self.locations = locations
+        self.tags = tags
+        self.markup = markup
+        self.texts = texts
+        self._random = random.Random(seed)
+        self._characterNames = []
+        self._locationNames = []
+
+    def write(self, filePath):
+        """Write the project to a .yw7 file.
+
+        Positional arguments:
+            filePath: str -- path of the file to create.
+        """
+        with open(filePath, 'w', encoding='utf-8') as f:
+            f.write(self.get_xml())
+
+    def get_xml(self):
+        """Return the project as XML text."""
+        self._characterNames = self._make_names(self.characters, FIRST_NAMES, LAST_NAMES)
+        self._locationNames = self._make_names(self.locations, ['Old', 'North', 'Grey', 'Little', 'High'], PLACES)
+        lines = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            '<YWRITER7>',
+            '<PROJECT>',
+            '<Ver>7</Ver>',
+            f'<Title>{cdata("Synthetic novel")}</Title>',
+            f'<AuthorName>{cdata("yw-viewer benchmark")}</AuthorName>',
+            f'<Desc>{cdata(self._make_sentence(40))}</Desc>',
+            '</PROJECT>',
+            ]
+        lines.extend(self._make_locations())
+        lines.extend(self._make_items())
+        lines.extend(self._make_characters())
+        lines.extend(self._make_projectvars())
+        lines.extend(self._make_scenes_and_chapters())
+        lines.append('</YWRITER7>')
+        return '\n'.join(lines)
+
+    def _make_names(self, count, firstParts, lastParts):
+        """Return a list of count unique names."""
+        names = []
+        for i in range(count):
+            name = f'{firstParts[i % len(firstParts)]} {lastParts[(i // len(firstParts)) % len(lastParts)]}'
+            if i >= len(firstParts) * len(lastParts):
+                name = f'{name} {i}'
+            names.append(name)
+        return names
+
+    def _make_sentence(self, wordCount):
+        """Return a plain sentence of wordCount words."""
+        words = [self._random.choice(VOCABULARY) for __ in range(wordCount)]
+        words[0] = words[0].capitalize()
+        return f'{" ".join(words)}.'
+
+    def _make_text(self):
+        """Return a scene text with paragraphs, punctuation, and yWriter markup."""
+        paragraphs = []
+        words = []
+        for i in range(self.words):
+            word = self._random.choice(VOCABULARY)
+            if self._characterNames and self._random.random() < 0.01:
+                word = self._random.choice(self._characterNames).split(' ')[0]
+            if self._random.random() < 0.12:
+                word = f'{word}{self._random.choice(PUNCTUATION)}'
+            if self._random.random() < self.markup:
+                kind = self._random.random()
+                if kind < 0.7:
+                    word = self._random.choice(FORMATTING).format(word)
+                elif kind < 0.85:
+                    language = self._random.choice(LANGUAGES)
+                    word = f'[lang={language}]{word}[/lang={language}]'
+                else:
+                    word = f'{word} /* {self._make_sentence(5)} */'
+            words.append(word)
+            if len(words) == WORDS_PER_PARAGRAPH or i == self.words - 1:
+                paragraphs.append(' '.join(words))
+                words = []
+        return '\n'.join(paragraphs)
+
+    def _make_locations(self):
+        lines = ['<LOCATIONS>']
+        for i, name in enumerate(self._locationNames):
+            lines.append(f'<LOCATION><ID>{i + 1}</ID><Title>{cdata(name)}</Title>'
+                         f'<Desc>{cdata(self._make_sentence(20))}</Desc><AKA>{cdata(name.split(" ")[-1])}</AKA></LOCATION>')
+        lines.append('</LOCATIONS>')
+        return lines
+
+    def _make_items(self):
+        return ['<ITEMS>', f'<ITEM><ID>1</ID><Title>{cdata("letter")}</Title></ITEM>', '</ITEMS>']
+
+    def _make_characters(self):
+        lines = ['<CHARACTERS>']
+        for i, name in enumerate(self._characterNames):
+            major = '<Major>-1</Major>' if i < 3 else ''
+            lines.append(f'<CHARACTER><ID>{i + 1}</ID><Title>{cdata(name.split(" ")[0])}</Title>'
+                         f'<FullName>{cdata(name)}</FullName><Desc>{cdata(self._make_sentence(20))}</Desc>'
+                         f'<Notes>{cdata(self._make_sentence(10))}</Notes>{major}</CHARACTER>')
+        lines.append('</CHARACTERS>')
+        return lines
+
+    def _make_projectvars(self):
+        lines = ['<PROJECTVARS>']
+        for i, language in enumerate(LANGUAGES):
+            htmlTag = f'<HTM <SPAN LANG="{language}"> /HTM>'
+            lines.append(f'<PROJECTVAR><ID>{i + 1}</ID><Title>lang={language}</Title>'
+                         f'<Desc>{cdata(htmlTag)}</Desc>'
+                         f'<Tags>{cdata("0")}</Tags></PROJECTVAR>')
+            lines.append(f'<PROJECTVAR><ID>{i + 1 + len(LANGUAGES)}</ID><Title>/lang={language}</Title>'
+                         f'<Desc>{cdata("<HTM </SPAN> /HTM>")}</Desc>'
+                         f'<Tags>{cdata("0")}</Tags></PROJECTVAR>')
+        lines.append('</PROJECTVARS>')
+        return lines
+
+    def _make_scenes_and_chapters(self):
+        tagNames = [f'tag{i + 1}' for i in range(self.tags)]
+        scenes = ['<SCENES>']
+        chapters = ['<CHAPTERS>']
+        scId = 0
+        for chNumber in range(1, self.chapters + 1):
+            scIds = []
+            for __ in range(self.scenes):
+                scId += 1
+                scIds.append(f'<ScID>{scId}</ScID>')
+                if self.texts:
+                    text = self.texts[(scId - 1) % len(self.texts)]
+                    wordCount = len(NON_LETTERS.sub(' ', text).split())
+                else:
+                    text = self._make_text()
+                    wordCount = self.words
+                sceneTags = ''
+                if tagNames:
+                    sceneTags = f'<Tags>{cdata(";".join(self._random.sample(tagNames, min(2, len(tagNames)))))}</Tags>'
+                characters = ''
+                if self._characterNames:
+                    crIds = self._random.sample(range(1, len(self._characterNames) + 1), min(3, len(self._characterNames)))
+                    characters = f'<Characters>{"".join(f"<CharID>{crId}</CharID>" for crId in crIds)}</Characters>'
+                locations = ''
+                if self._locationNames:
+                    locations = f'<Locations><LocID>{self._random.randint(1, len(self._locationNames))}</LocID></Locations>'
+                scenes.append(f'<SCENE><ID>{scId}</ID><Title>{cdata(f"Scene {scId}")}</Title>'
+                              f'<Desc>{cdata(self._make_sentence(30))}</Desc><Status>{self._random.randint(1, 5)}</Status>'
+                              f'<Notes>{cdata(self._make_sentence(10))}</Notes>{sceneTags}'
+                              f'{characters}{locations}<Items><ItemID>1</ItemID></Items>'
+                              f'<SceneContent>{cdata(text)}</SceneContent>'
+                              f'<WordCount>{wordCount}</WordCount>'
+                              f'<LetterCount>{len(NON_LETTERS.sub("", text))}</LetterCount></SCENE>')
+            if chNumber == 1:
+                chapterType = '<SectionStart>-1</SectionStart><Type>0</Type><ChapterType>0</ChapterType>'
+            else:
+                chapterType = '<Type>0</Type><ChapterType>0</ChapterType>'
+            chapters.append(f'<CHAPTER><ID>{chNumber}</ID><Title>{cdata(f"Chapter {chNumber}")}</Title>'
+                            f'<Desc>{cdata(self._make_sentence(30))}</Desc>{chapterType}'
+                            f'<Scenes>{"".join(scIds)}</Scenes></CHAPTER>')
+        scenes.append('</SCENES>')
+        chapters.append('</CHAPTERS>')
+        return scenes + chapters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic yWriter 7 project.')
+    parser.add_argument('filePath', help='path of the .yw7 file to create')
+    parser.add_argument('--chapters', type=int, default=10, help='number of chapters')
+    parser.add_argument('--scenes', type=int, default=10, help='number of scenes per chapter')
+    parser.add_argument('--words', type=int, default=1000, help='number of words per scene')
+    parser.add_argument('--characters', type=int, default=20, help='number of characters')
+    parser.add_argument('--locations', type=int, default=10, help='number of locations')
+    parser.add_argument('--tags', type=int, default=10, help='number of different scene tags')
+    parser.add_argument('--markup', type=float, default=0.02, help='markup density (0 ... 1)')
+    parser.add_argument('--seed', type=int, default=1, help='random seed')
+    args = parser.parse_args()
+    ProjectGenerator(args.chapters, args.scenes, args.words, args.characters, args.locations, args.tags,
+                     args.markup, args.seed).write(args.filePath)
+
+
+if __name__ == '__main__':
+    main()